@@ -0,0 +1,66 @@
+import asyncio
+import queue
+import threading
+
+_LOOP = None
+_LOOP_LOCK = threading.Lock()
+_ITERATION_DONE = object()
+
+
+def get_event_loop():
+    """
+    Returns the process-wide event loop that runs on a daemon thread.
+    Streamlit script threads submit coroutines here instead of blocking on each call.
+    """
+    global _LOOP
+    if _LOOP is None:
+        with _LOOP_LOCK:
+            if _LOOP is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever,
+                    name="fg-async-bridge",
+                    daemon=True,
+                ).start()
+                _LOOP = loop
+    return _LOOP
+
+
+def submit(coro):
+    """Schedules a coroutine on the bridge loop. Returns a concurrent.futures.Future."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+
+def run(coro, timeout=None):
+    """Blocks the calling thread until the coroutine finishes on the bridge loop."""
+    return submit(coro).result(timeout=timeout)
+
+
+def iterate(async_iterable, timeout=None):
+    """
+    Drives an async iterator on the bridge loop and yields its items on the calling thread.
+    Lets st.write_stream consume async token streams unchanged.
+    """
+    items = queue.Queue()
+
+    async def _pump():
+        try:
+            async for item in async_iterable:
+                items.put((item, None))
+        except Exception as exc:
+            items.put((_ITERATION_DONE, exc))
+        else:
+            items.put((_ITERATION_DONE, None))
+
+    future = submit(_pump())
+    try:
+        while True:
+            item, error = items.get(timeout=timeout)
+            if item is _ITERATION_DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        if not future.done():
+            future.cancel()
@@ -0,0 +1,181 @@
+import io
+import os
+import time
+import wave
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TARGET_SAMPLE_RATE = 16000
+VAD_FRAME_MS = 30
+VAD_PADDING_MS = 200
+VAD_MIN_RMS = 0.01
+VAD_NOISE_FACTOR = 3.0
+VAD_NOISE_PERCENTILE = 10
+VAD_PEAK_FRACTION = 0.5
+MIN_SPEECH_MS = 300
+SEGMENT_TARGET_SECONDS = 6.0
+SEGMENT_SEARCH_SECONDS = 2.0
+SEGMENT_MIN_SECONDS = 3.0
+WAV_MIME_TYPES = {"audio/wav", "audio/x-wav", "audio/wave", "audio/vnd.wave"}
+
+
+def _preprocess_enabled():
+    return np is not None and os.getenv("FG_AUDIO_PREPROCESS", "").strip() != "0"
+
+
+def _decode_wav(audio_bytes):
+    """PCM WAV -> (float32 samples in [-1, 1] with shape (frames, channels), sample_rate)."""
+    with wave.open(io.BytesIO(audio_bytes), "rb") as reader:
+        channels = reader.getnchannels()
+        sample_width = reader.getsampwidth()
+        sample_rate = reader.getframerate()
+        raw = reader.readframes(reader.getnframes())
+
+    if sample_width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        packed = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = packed[:, 0] | (packed[:, 1] << 8) | (packed[:, 2] << 16)
+        values = np.where(values >= 1 << 23, values - (1 << 24), values)
+        samples = values.astype(np.float32) / float(1 << 23)
+    elif sample_width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {sample_width} bytes.")
+    return samples.reshape(-1, channels), sample_rate
+
+
+def _encode_wav(samples, sample_rate):
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def _resample(samples, sample_rate, target_rate):
+    """Band-limited FFT resampling (downsampling only; lower rates are left alone)."""
+    if sample_rate <= target_rate or samples.size == 0:
+        return samples, sample_rate
+    target_length = max(1, int(round(samples.size * target_rate / sample_rate)))
+    spectrum = np.fft.rfft(samples)[: target_length // 2 + 1]
+    resampled = np.fft.irfft(spectrum, n=target_length) * (target_length / samples.size)
+    return resampled.astype(np.float32), target_rate
+
+
+def _speech_bounds(samples, sample_rate):
+    """
+    Energy VAD over fixed frames.
+    A frame is speech when its RMS clears both an absolute floor and a multiple of the
+    clip's own noise floor; returns (start, end) sample indices or None when nothing qualifies.
+    The relative threshold is capped at VAD_PEAK_FRACTION of the loudest frame: in a clip with no
+    leading or trailing silence the "noise floor" percentile is speech, not noise.
+    """
+    frame_length = max(1, int(sample_rate * VAD_FRAME_MS / 1000))
+    frame_count = samples.size // frame_length
+    if frame_count == 0:
+        return None
+
+    frames = samples[: frame_count * frame_length].reshape(frame_count, frame_length)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    noise_floor = float(np.percentile(rms, VAD_NOISE_PERCENTILE))
+    relative_threshold = min(noise_floor * VAD_NOISE_FACTOR, VAD_PEAK_FRACTION * float(rms.max()))
+    voiced = np.flatnonzero(rms > max(VAD_MIN_RMS, relative_threshold))
+    if voiced.size * VAD_FRAME_MS < MIN_SPEECH_MS:
+        return None
+
+    padding = int(sample_rate * VAD_PADDING_MS / 1000)
+    start = max(0, int(voiced[0]) * frame_length - padding)
+    end = min(samples.size, (int(voiced[-1]) + 1) * frame_length + padding)
+    return start, end
+
+
+def _segment_bounds(samples, sample_rate):
+    """
+    Splits long speech into ~SEGMENT_TARGET_SECONDS pieces, cutting at the quietest frame within
+    SEGMENT_SEARCH_SECONDS of each target so words are not split. Returns [(start, end)] sample ranges.
+    """
+    frame_length = max(1, int(sample_rate * VAD_FRAME_MS / 1000))
+    frame_count = samples.size // frame_length
+    frames_per_second = 1000.0 / VAD_FRAME_MS
+    target = int(SEGMENT_TARGET_SECONDS * frames_per_second)
+    search = int(SEGMENT_SEARCH_SECONDS * frames_per_second)
+    minimum = int(SEGMENT_MIN_SECONDS * frames_per_second)
+    if frame_count <= target + minimum:
+        return [(0, samples.size)]
+
+    frames = samples[: frame_count * frame_length].reshape(frame_count, frame_length)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    cuts = [0]
+    while frame_count - cuts[-1] > target + minimum:
+        low = cuts[-1] + target - search
+        high = min(cuts[-1] + target + search, frame_count - minimum)
+        cuts.append(low + int(np.argmin(rms[low:high])))
+
+    # Cut mid-frame so the quietest frame is shared by both neighbours.
+    edges = [0] + [cut * frame_length + frame_length // 2 for cut in cuts[1:]] + [samples.size]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def preprocess_voice_clip(audio_bytes, mime_type="audio/wav"):
+    """
+    Shrinks a recorded WAV before upload: downmix to mono, resample to 16 kHz, trim silence.
+    Returns a dict with the (possibly unchanged) audio_bytes / mime_type, before/after sizes,
+    has_speech=False when the clip is near-silent so callers can skip the model call, and
+    segments: silence-aligned WAV pieces of the processed clip for incremental transcription.
+    Non-WAV input, decode failures and FG_AUDIO_PREPROCESS=0 pass the original bytes through.
+    """
+    started = time.perf_counter()
+    result = {
+        "audio_bytes": audio_bytes,
+        "mime_type": mime_type,
+        "original_bytes": len(audio_bytes or b""),
+        "processed_bytes": len(audio_bytes or b""),
+        "has_speech": True,
+        "processed": False,
+        "segments": [audio_bytes] if audio_bytes else [],
+    }
+    if not audio_bytes or not _preprocess_enabled():
+        return result
+    if (mime_type or "audio/wav").split(";")[0].strip().lower() not in WAV_MIME_TYPES:
+        return result
+
+    try:
+        samples, original_rate = _decode_wav(audio_bytes)
+        mono = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+        mono, sample_rate = _resample(mono, original_rate, TARGET_SAMPLE_RATE)
+        bounds = _speech_bounds(mono, sample_rate)
+    except Exception as e:
+        print(f"AUDIO PREPROCESS ERROR: {e}")
+        return result
+
+    result["original_seconds"] = round(samples.shape[0] / max(original_rate, 1), 2)
+    if bounds is None:
+        result["has_speech"] = False
+        result["speech_seconds"] = 0.0
+        result["segments"] = []
+    else:
+        trimmed = mono[bounds[0]: bounds[1]]
+        processed_bytes = _encode_wav(trimmed, sample_rate)
+        segment_bounds = _segment_bounds(trimmed, sample_rate)
+        segments = [processed_bytes]
+        if len(segment_bounds) > 1:
+            segments = [_encode_wav(trimmed[start:end], sample_rate) for start, end in segment_bounds]
+        result.update(
+            audio_bytes=processed_bytes,
+            mime_type="audio/wav",
+            processed_bytes=len(processed_bytes),
+            speech_seconds=round(trimmed.size / sample_rate, 2),
+            processed=True,
+            segments=segments,
+        )
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
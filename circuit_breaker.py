@@ -0,0 +1,178 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+import async_bridge
+
+CIRCUIT_WINDOW_SECONDS = 60
+CIRCUIT_MIN_CALLS = 8
+CIRCUIT_FAILURE_RATE = 0.5
+CIRCUIT_CONSECUTIVE_FAILURES = 5
+CIRCUIT_OPEN_SECONDS = 15
+CIRCUIT_MAX_OPEN_SECONDS = 120
+CIRCUIT_PROBE_TIMEOUT_SECONDS = 10
+CIRCUIT_PROBE_TASK = "judgment"
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+def _env_float(name, default_value):
+    try:
+        return max(0.0, float(os.getenv(name, "") or default_value))
+    except ValueError:
+        return default_value
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the model while the breaker is open."""
+
+
+async def _default_probe():
+    """One tiny call on CIRCUIT_PROBE_TASK's primary model, queued behind the shared rate limiter."""
+    from llm_backend import get_llm_provider
+    from model_router import primary_model
+    from rate_limit import Deadline, get_rate_limiter
+
+    await get_rate_limiter().acquire_async(Deadline(CIRCUIT_PROBE_TIMEOUT_SECONDS))
+    await get_llm_provider().agenerate(primary_model(CIRCUIT_PROBE_TASK), "Reply with the single word: ok")
+
+
+class CircuitBreaker:
+    """
+    Failure-rate breaker around the model backend.
+    - closed: calls flow; outcomes are tracked over a sliding window
+    - open: calls are rejected instantly so callers can serve degraded responses
+    - half_open: one background probe decides between closing and re-opening (with longer waits)
+    """
+
+    def __init__(self, probe=None, window_seconds=None, failure_rate=None, open_seconds=None):
+        self.probe = probe or _default_probe
+        self.window_seconds = window_seconds or _env_float("FG_CIRCUIT_WINDOW_SECONDS", CIRCUIT_WINDOW_SECONDS)
+        self.failure_rate = failure_rate or _env_float("FG_CIRCUIT_FAILURE_RATE", CIRCUIT_FAILURE_RATE)
+        self.base_open_seconds = open_seconds or _env_float("FG_CIRCUIT_OPEN_SECONDS", CIRCUIT_OPEN_SECONDS)
+        self.state = STATE_CLOSED
+        self._outcomes = deque()
+        self._consecutive_failures = 0
+        self._open_seconds = self.base_open_seconds
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+        self.stats = {
+            "opened": 0,
+            "rejected": 0,
+            "probes": 0,
+            "probe_failures": 0,
+            "last_opened_at": None,
+            "last_error": "",
+        }
+
+    def _trim(self, now):
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _window_failure_rate(self):
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for _, ok in self._outcomes if not ok) / len(self._outcomes)
+
+    def _open(self, now, reason):
+        self.state = STATE_OPEN
+        self._open_until = now + self._open_seconds
+        self.stats["opened"] += 1
+        self.stats["last_opened_at"] = time.time()
+        self.stats["last_error"] = reason[:200]
+        print(f"CIRCUIT OPEN: {reason[:200]} (probe in {self._open_seconds:.0f}s)")
+        async_bridge.submit(self._probe_after(self._open_seconds))
+
+    def allow_request(self):
+        """True when the backend may be called; open and half-open both reject instantly."""
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def is_closed(self):
+        return self.state == STATE_CLOSED
+
+    def check(self):
+        if not self.allow_request():
+            raise CircuitOpenError(f"Model backend circuit is {self.state}.")
+
+    async def _probe_after(self, delay_seconds):
+        await asyncio.sleep(delay_seconds)
+        with self._lock:
+            if self.state != STATE_OPEN:
+                return
+            self.state = STATE_HALF_OPEN
+            self.stats["probes"] += 1
+
+        try:
+            await asyncio.wait_for(self.probe(), CIRCUIT_PROBE_TIMEOUT_SECONDS)
+        except Exception as e:
+            with self._lock:
+                self.stats["probe_failures"] += 1
+                self._open_seconds = min(self._open_seconds * 2, CIRCUIT_MAX_OPEN_SECONDS)
+                self._open(time.monotonic(), f"probe failed: {e}")
+            return
+
+        with self._lock:
+            self.state = STATE_CLOSED
+            self._outcomes.clear()
+            self._consecutive_failures = 0
+            self._open_seconds = self.base_open_seconds
+        print("CIRCUIT CLOSED: probe succeeded.")
+
+    def record_success(self):
+        with self._lock:
+            now = time.monotonic()
+            self._outcomes.append((now, True))
+            self._trim(now)
+            self._consecutive_failures = 0
+
+    def record_failure(self, error):
+        """Counts a backend failure (transient errors only; callers filter bad requests)."""
+        with self._lock:
+            now = time.monotonic()
+            self._outcomes.append((now, False))
+            self._trim(now)
+            self._consecutive_failures += 1
+            if self.state != STATE_CLOSED:
+                return
+            tripped_by_rate = (
+                len(self._outcomes) >= CIRCUIT_MIN_CALLS and self._window_failure_rate() >= self.failure_rate
+            )
+            if tripped_by_rate or self._consecutive_failures >= CIRCUIT_CONSECUTIVE_FAILURES:
+                self._open(now, str(error))
+
+    def get_stats(self):
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            return dict(
+                self.stats,
+                state=self.state,
+                window_calls=len(self._outcomes),
+                window_failure_rate=round(self._window_failure_rate(), 3),
+                open_remaining_s=round(max(0.0, self._open_until - now), 1) if self.state == STATE_OPEN else 0.0,
+            )
+
+
+_BREAKER = None
+_BREAKER_LOCK = threading.Lock()
+
+
+def get_circuit_breaker():
+    global _BREAKER
+    if _BREAKER is None:
+        with _BREAKER_LOCK:
+            if _BREAKER is None:
+                _BREAKER = CircuitBreaker()
+    return _BREAKER
+
+
+def get_circuit_stats():
+    return get_circuit_breaker().get_stats()
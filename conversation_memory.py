@@ -0,0 +1,236 @@
+import os
+import re
+import threading
+import time
+
+import async_bridge
+from llm_backend import get_llm_provider
+from model_router import routed_call_async
+from prompt_budget import (
+    PRIORITY_HISTORY,
+    PRIORITY_INSTRUCTIONS,
+    assemble_prompt,
+    estimate_tokens,
+    prompt_section,
+)
+from rate_limit import call_with_retry_async
+
+MEMORY_VERBATIM_TURNS = 6
+MEMORY_TOKEN_CEILING = 1200
+MEMORY_SUMMARY_MAX_WORDS = 120
+MEMORY_COMPACT_LINE_CHARS = 160
+LEVEL_SUMMARY_WAIT_SECONDS = 6
+
+
+def _env_int(name, default_value):
+    try:
+        return max(0, int(os.getenv(name, "") or default_value))
+    except ValueError:
+        return default_value
+
+
+def _format_line(msg):
+    return f"{msg['role'].upper()}: {msg['content']}"
+
+
+def _compact_line(msg):
+    content = re.sub(r"\s+", " ", str(msg.get("content", ""))).strip()
+    if len(content) > MEMORY_COMPACT_LINE_CHARS:
+        content = content[: MEMORY_COMPACT_LINE_CHARS - 3].rstrip() + "..."
+    return f"{msg['role'].upper()}: {content}"
+
+
+def _local_summary(messages, previous_summary=""):
+    """Extractive fallback used until (or instead of) the model summary."""
+    parts = [previous_summary] if previous_summary else []
+    for msg in messages:
+        if msg.get("role") == "system":
+            continue
+        first_sentence = re.split(r"(?<=[.!?])\s+", str(msg.get("content", "")).strip(), maxsplit=1)[0]
+        if first_sentence:
+            parts.append(f"{msg['role'].upper()}: {first_sentence[:MEMORY_COMPACT_LINE_CHARS]}")
+    words = " ".join(parts).split()
+    return " ".join(words[-MEMORY_SUMMARY_MAX_WORDS * 2 :])
+
+
+def _build_summary_prompt(previous_summary, messages):
+    instructions = f"""
+    You maintain a running summary of a startup pitch roleplay between a FOUNDER (USER) and an INVESTOR (AI).
+
+    RULES:
+    - Return an updated summary of at most {MEMORY_SUMMARY_MAX_WORDS} words.
+    - Keep concrete claims, numbers, commitments, and unanswered investor objections.
+    - Plain text only, no preamble.
+    """
+    return assemble_prompt(
+        "summary",
+        [
+            prompt_section("instructions", instructions, PRIORITY_INSTRUCTIONS),
+            prompt_section(
+                "previous_summary",
+                previous_summary or "(none yet)",
+                PRIORITY_INSTRUCTIONS,
+                header="EXISTING SUMMARY:",
+            ),
+            prompt_section(
+                "new_messages",
+                "\n".join(_format_line(msg) for msg in messages),
+                PRIORITY_HISTORY,
+                header="NEW MESSAGES TO FOLD IN:",
+                keep="tail",
+            ),
+        ],
+    )
+
+
+async def _summarize_async(previous_summary, messages):
+    summary_prompt = _build_summary_prompt(previous_summary, messages)
+    text = await call_with_retry_async(
+        "summary",
+        lambda: routed_call_async("summary", lambda model: get_llm_provider().agenerate(model, summary_prompt)),
+    )
+    summary = re.sub(r"\s+", " ", text).strip()
+    if not summary:
+        raise ValueError("Empty summary.")
+    return summary
+
+
+class ConversationMemory:
+    """
+    Per-session rolling memory for prompt history.
+    - the last N messages stay verbatim
+    - older messages are folded into a summary on the async bridge, after the turn finishes
+    - a token ceiling bounds the rendered history regardless of summary progress
+    - closed levels keep one summary each for the post-mortem
+    """
+
+    def __init__(self, verbatim_turns=None, token_ceiling=None):
+        if verbatim_turns is None:
+            verbatim_turns = _env_int("FG_MEMORY_VERBATIM_TURNS", MEMORY_VERBATIM_TURNS)
+        if token_ceiling is None:
+            token_ceiling = _env_int("FG_MEMORY_TOKEN_CEILING", MEMORY_TOKEN_CEILING)
+        self.verbatim_turns = verbatim_turns
+        self.token_ceiling = token_ceiling
+        self.summary = ""
+        self.folded_count = 0
+        self.level_summaries = {}
+        self._generation = 0
+        self._fold_pending = False
+        self._level_futures = {}
+        self._lock = threading.Lock()
+
+    def _split(self, chat_history):
+        history = list(chat_history)
+        keep = min(len(history), self.verbatim_turns)
+        return history[: len(history) - keep], history[len(history) - keep :]
+
+    def render(self, chat_history):
+        """Returns the history block for a prompt: summary + compacted backlog + verbatim tail."""
+        older, verbatim = self._split(chat_history)
+        with self._lock:
+            summary = self.summary
+            folded_count = self.folded_count
+        if folded_count > len(older):
+            summary, folded_count = "", 0
+
+        lines = [f"EARLIER CONVERSATION SUMMARY: {summary}"] if summary else []
+        lines.extend(_compact_line(msg) for msg in older[folded_count:])
+        lines.extend(_format_line(msg) for msg in verbatim)
+        return self._enforce_ceiling(lines, has_summary=bool(summary))
+
+    def _enforce_ceiling(self, lines, has_summary):
+        if not self.token_ceiling:
+            return "\n".join(lines)
+
+        first_droppable = 1 if has_summary else 0
+        while len(lines) - first_droppable > 1 and estimate_tokens("\n".join(lines)) > self.token_ceiling:
+            del lines[first_droppable]
+
+        text = "\n".join(lines)
+        max_chars = self.token_ceiling * 4
+        if len(text) > max_chars:
+            text = text[-max_chars:]
+        return text
+
+    def schedule_fold(self, chat_history):
+        """Folds messages that left the verbatim window into the summary, off the critical path."""
+        older, _ = self._split(chat_history)
+        with self._lock:
+            if self._fold_pending or len(older) <= self.folded_count:
+                return
+            self._fold_pending = True
+            generation = self._generation
+            previous_summary = self.summary
+            new_messages = older[self.folded_count :]
+            target_count = len(older)
+
+        future = async_bridge.submit(_summarize_async(previous_summary, new_messages))
+
+        def _apply(done_future):
+            try:
+                summary = done_future.result()
+            except Exception as e:
+                print(f"MEMORY SUMMARY ERROR: {e}")
+                summary = _local_summary(new_messages, previous_summary)
+            with self._lock:
+                self._fold_pending = False
+                if generation == self._generation:
+                    self.summary = summary
+                    self.folded_count = target_count
+
+        future.add_done_callback(_apply)
+
+    def close_level(self, level, chat_history):
+        """Stores a summary for a finished level and starts fresh for the next one."""
+        messages = list(chat_history)
+        with self._lock:
+            previous_summary = self.summary
+            unsummarized = messages[self.folded_count :] if self.folded_count <= len(messages) else messages
+            self.level_summaries[level] = _local_summary(unsummarized, previous_summary)
+            self.summary = ""
+            self.folded_count = 0
+            self._generation += 1
+
+        future = async_bridge.submit(_summarize_async(previous_summary, unsummarized))
+
+        def _apply(done_future):
+            try:
+                summary = done_future.result()
+            except Exception as e:
+                print(f"LEVEL SUMMARY ERROR (Level {level}): {e}")
+                return
+            with self._lock:
+                self.level_summaries[level] = summary
+
+        future.add_done_callback(_apply)
+        self._level_futures[level] = future
+
+    def render_for_post_mortem(self, full_chat_history, current_chat_history, current_level=None):
+        """
+        Per-level summaries for closed levels plus the rendered in-progress level.
+        Returns None when no level summaries exist, so callers fall back to the raw transcript.
+        Model summaries get LEVEL_SUMMARY_WAIT_SECONDS in total; levels still pending keep their
+        extractive summary.
+        """
+        if not self.level_summaries:
+            return None
+
+        wait_until = time.monotonic() + LEVEL_SUMMARY_WAIT_SECONDS
+        for future in list(self._level_futures.values()):
+            try:
+                future.result(timeout=max(0.0, wait_until - time.monotonic()))
+            except Exception:
+                continue
+
+        with self._lock:
+            level_summaries = dict(self.level_summaries)
+
+        sections = [
+            f"LEVEL {level} SUMMARY: {level_summaries[level]}" for level in sorted(level_summaries)
+        ]
+        system_notes = [_format_line(msg) for msg in full_chat_history if msg.get("role") == "system"]
+        if system_notes:
+            sections.append("GAME EVENTS:\n" + "\n".join(system_notes))
+        if current_chat_history and current_level not in level_summaries:
+            sections.append(f"LEVEL {current_level} TRANSCRIPT:\n{self.render(current_chat_history)}")
+        return "\n\n".join(sections)
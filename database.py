@@ -421,3 +421,64 @@ def fetch_clan_leaderboard(limit=10):
                 return list(cur.fetchall())
     except Exception:
         return []
+
+
+def iter_runs_for_post_mortem(after_id=0, fetch_size=200, limit=None, run_ids=None):
+    """
+    Streams runs (id, outcome, theme, transcript) in id order through a server-side cursor,
+    so the batch regeneration job never holds the whole table in memory.
+    run_ids restricts the scan to those runs (e.g. a retry of earlier failures).
+    Raises DatabaseConnectionError when the database is unavailable.
+    """
+    safe_after_id = max(0, int(after_id or 0))
+    id_clause = "AND id = ANY(%s)" if run_ids is not None else ""
+    limit_clause = "LIMIT %s" if limit else ""
+    params = [safe_after_id]
+    if run_ids is not None:
+        params.append([int(run_id) for run_id in run_ids])
+    if limit:
+        params.append(int(limit))
+
+    with _connect_to_database(row_factory=dict_row) as conn:
+        with conn.cursor(name="fg_post_mortem_regen") as cur:
+            cur.itersize = max(1, int(fetch_size))
+            cur.execute(
+                f"""
+                SELECT id, outcome, theme, transcript
+                FROM runs
+                WHERE id > %s {id_clause}
+                ORDER BY id ASC
+                {limit_clause};
+                """,
+                tuple(params),
+            )
+            for row in cur:
+                yield row
+
+
+def update_run_post_mortems(updates):
+    """
+    Writes regenerated post-mortems in one transaction.
+    updates: list of (run_id, post_mortem_dict)
+    Returns: (updated_count, error_message)
+    """
+    if not updates:
+        return 0, None
+
+    try:
+        with _connect_to_database() as conn:
+            with conn.cursor() as cur:
+                cur.executemany(
+                    """
+                    UPDATE runs
+                    SET post_mortem = %s::jsonb
+                    WHERE id = %s;
+                    """,
+                    [(json.dumps(post_mortem), run_id) for run_id, post_mortem in updates],
+                )
+            conn.commit()
+        return len(updates), None
+    except DatabaseConnectionError as exc:
+        return 0, str(exc)
+    except Exception as exc:
+        return 0, str(exc).splitlines()[0].strip()
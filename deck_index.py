@@ -0,0 +1,170 @@
+import heapq
+import math
+import re
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+RETRIEVAL_NUMERIC_BONUS = 0.5
+RETRIEVAL_TOKEN_RE = re.compile(r"[a-z0-9]{3,}")
+RETRIEVAL_STOPWORDS = {
+    "about",
+    "after",
+    "again",
+    "being",
+    "below",
+    "could",
+    "first",
+    "founder",
+    "from",
+    "have",
+    "into",
+    "just",
+    "level",
+    "more",
+    "next",
+    "only",
+    "other",
+    "same",
+    "that",
+    "their",
+    "there",
+    "these",
+    "they",
+    "this",
+    "through",
+    "under",
+    "until",
+    "what",
+    "when",
+    "where",
+    "which",
+    "while",
+    "with",
+    "would",
+    "your",
+}
+
+
+def tokenize_for_retrieval(text):
+    raw_tokens = RETRIEVAL_TOKEN_RE.findall((text or "").lower())
+    return [token for token in raw_tokens if token not in RETRIEVAL_STOPWORDS]
+
+
+class DeckIndex:
+    """
+    BM25 index over one deck's chunks, built once and reused for every query.
+    - postings: term -> [(chunk_index, term_frequency)]
+    - per-chunk lengths (in retrieval tokens) and the average length for BM25 normalization
+    - chunks containing digits get a small bonus so metric-heavy slides win ties
+    - with numpy, the BM25 weights are also packed into a term-major sparse matrix so a query is
+      one gather + bincount over the matching postings and top-k uses argpartition
+    """
+
+    def __init__(self, chunks):
+        self.chunks = tuple(chunks)
+        self.postings = {}
+        self.doc_lengths = []
+        self.has_digits = []
+        for chunk_index, chunk in enumerate(self.chunks):
+            term_counts = Counter(tokenize_for_retrieval(chunk))
+            self.doc_lengths.append(sum(term_counts.values()))
+            self.has_digits.append(any(char.isdigit() for char in chunk))
+            for term, frequency in term_counts.items():
+                self.postings.setdefault(term, []).append((chunk_index, frequency))
+
+        chunk_count = len(self.chunks)
+        self.average_length = (sum(self.doc_lengths) / chunk_count) if chunk_count else 0.0
+        self.idf = {
+            term: math.log(1.0 + (chunk_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+        self.term_ids = {}
+        if np is not None and chunk_count:
+            self._build_matrix()
+
+    def _build_matrix(self):
+        """CSC layout: term i's postings are chunk_ids / weights[term_ptr[i]:term_ptr[i + 1]]."""
+        terms = list(self.postings)
+        self.term_ids = {term: term_id for term_id, term in enumerate(terms)}
+        posting_counts = np.array([len(self.postings[term]) for term in terms], dtype=np.int64)
+        self.term_ptr = np.concatenate(([0], np.cumsum(posting_counts)))
+        flat = [posting for term in terms for posting in self.postings[term]]
+        self.chunk_ids = np.array([chunk_index for chunk_index, _ in flat], dtype=np.int64)
+        frequencies = np.array([frequency for _, frequency in flat], dtype=np.float64)
+        idf = np.repeat(np.array([self.idf[term] for term in terms], dtype=np.float64), posting_counts)
+
+        doc_lengths = np.asarray(self.doc_lengths, dtype=np.float64)
+        length_norm = BM25_K1 * (1.0 - BM25_B + BM25_B * doc_lengths[self.chunk_ids] / (self.average_length or 1.0))
+        self.weights = idf * frequencies * (BM25_K1 + 1.0) / (frequencies + length_norm)
+        self.digit_bonus = np.where(np.asarray(self.has_digits), RETRIEVAL_NUMERIC_BONUS, 0.0)
+
+    def score(self, query_tokens):
+        """Returns {chunk_index: score} for chunks sharing at least one query term."""
+        scores = {}
+        average_length = self.average_length or 1.0
+        for term in set(query_tokens):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf[term]
+            for chunk_index, frequency in postings:
+                length_norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self.doc_lengths[chunk_index] / average_length)
+                scores[chunk_index] = scores.get(chunk_index, 0.0) + idf * frequency * (BM25_K1 + 1.0) / (
+                    frequency + length_norm
+                )
+        for chunk_index in scores:
+            if self.has_digits[chunk_index]:
+                scores[chunk_index] += RETRIEVAL_NUMERIC_BONUS
+        return scores
+
+    def _score_vector(self, query_tokens):
+        """Scores every chunk at once; None when no query term is in the deck."""
+        term_ids = [self.term_ids[term] for term in set(query_tokens) if term in self.term_ids]
+        if not term_ids:
+            return None
+        positions = np.concatenate([np.arange(self.term_ptr[i], self.term_ptr[i + 1]) for i in term_ids])
+        matched_chunks = self.chunk_ids[positions]
+        chunk_count = len(self.chunks)
+        scores = np.bincount(matched_chunks, weights=self.weights[positions], minlength=chunk_count)
+        matched = np.bincount(matched_chunks, minlength=chunk_count) > 0
+        scores[matched] += self.digit_bonus[matched]
+        scores[~matched] = -np.inf
+        return scores
+
+    def score_vector(self, query_tokens):
+        """Dense BM25 scores for every chunk (-inf where no query term matches); None without numpy or a match."""
+        return self._score_vector(query_tokens) if self.term_ids else None
+
+    def top_chunks(self, query_tokens, top_k):
+        """Best-scoring chunks in score order (earlier chunks win ties); empty when nothing matches."""
+        if not self.term_ids:
+            scores = self.score(query_tokens)
+            best = heapq.nsmallest(top_k, scores.items(), key=lambda item: (-item[1], item[0]))
+            return [self.chunks[chunk_index] for chunk_index, _ in best]
+
+        scores = self._score_vector(query_tokens)
+        if scores is None:
+            return []
+        return [self.chunks[chunk_index] for chunk_index in top_indices(scores, top_k)]
+
+
+def top_indices(scores, top_k):
+    """
+    Indices of the top_k finite scores, best first, via argpartition.
+    Everything tied with the k-th best survives the partition, so ties still resolve by index.
+    """
+    if top_k <= 0 or scores.size == 0:
+        return []
+    if top_k < scores.size:
+        kth_score = scores[np.argpartition(-scores, top_k - 1)[top_k - 1]]
+        candidates = np.flatnonzero(scores >= kth_score)
+    else:
+        candidates = np.arange(scores.size)
+    candidates = candidates[np.isfinite(scores[candidates])]
+    return [int(index) for index in candidates[np.lexsort((candidates, -scores[candidates]))][:top_k]]
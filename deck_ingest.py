@@ -0,0 +1,277 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    from pypdf import generic as pdf_generic
+except ImportError:
+    pdf_generic = None
+
+DECK_MAX_CHARS = 120_000
+DECK_PARALLEL_MIN_PAGES = 24
+DECK_EXTRACT_BATCH_PAGES = 8
+DECK_PAGE_SEPARATOR = "\n\n"
+
+_EXTRACT_STATS = {
+    "decks": 0,
+    "pages": 0,
+    "seconds": 0.0,
+    "page_cache_hits": 0,
+    "early_stops": 0,
+    "pool_failures": 0,
+    "last_pages_per_sec": 0.0,
+    "last_mode": "",
+}
+_STATS_LOCK = threading.Lock()
+_POOL = None
+_POOL_LOCK = threading.Lock()
+# Worker-process state: the last PDF each worker opened, so consecutive batches skip re-parsing it.
+_WORKER_READER = None
+
+
+def extract_workers():
+    """FG_DECK_EXTRACT_WORKERS (default: CPU count, capped at 4); 1 or less extracts in-thread."""
+    default_workers = min(4, os.cpu_count() or 1)
+    try:
+        return max(1, int(os.getenv("FG_DECK_EXTRACT_WORKERS", "") or default_workers))
+    except ValueError:
+        return default_workers
+
+
+def _open_reader(pdf_source):
+    try:
+        from pypdf import PdfReader
+    except ImportError as exc:
+        raise RuntimeError("pypdf is not installed. Add `pypdf` to requirements and install it.") from exc
+    return PdfReader(pdf_source if isinstance(pdf_source, str) else io.BytesIO(pdf_source))
+
+
+def _hash_pdf_object(digest, obj, seen):
+    """
+    Feeds obj into digest, following indirect references (each object once; /Parent links skipped).
+    Stream data is included except for images, whose pixels never reach extract_text.
+    """
+    if isinstance(obj, pdf_generic.IndirectObject):
+        reference = (obj.idnum, obj.generation)
+        if reference in seen:
+            digest.update(f"<ref {seen[reference]}>".encode("utf-8"))
+            return
+        seen[reference] = len(seen)
+        obj = obj.get_object()
+
+    if isinstance(obj, pdf_generic.DictionaryObject):
+        digest.update(b"<<")
+        for key in sorted(obj):
+            if key == "/Parent":
+                continue
+            digest.update(str(key).encode("utf-8"))
+            _hash_pdf_object(digest, obj.raw_get(key), seen)
+        digest.update(b">>")
+        if isinstance(obj, pdf_generic.StreamObject) and obj.get("/Subtype") != "/Image":
+            digest.update(obj.get_data())
+    elif isinstance(obj, pdf_generic.ArrayObject):
+        digest.update(b"[")
+        for item in obj:
+            _hash_pdf_object(digest, item, seen)
+        digest.update(b"]")
+    else:
+        digest.update(repr(obj).encode("utf-8"))
+
+
+def _page_fingerprint(page):
+    """
+    Content stream bytes plus everything reachable from the page's resources: fonts (encodings,
+    ToUnicode maps) and Form XObjects with their own resources, since decks often wrap each slide
+    in an XObject drawn by an identical `q /X0 Do Q` stream.
+    Identical slides in a revised deck (or another deck) share a fingerprint and skip extraction.
+    """
+    digest = hashlib.sha256()
+    contents = page.get_contents()
+    digest.update(contents.get_data() if contents is not None else b"")
+    node = page
+    while node is not None and "/Resources" not in node:
+        node = node.get("/Parent")
+    if node is not None:
+        _hash_pdf_object(digest, node.raw_get("/Resources"), {})
+    return digest.hexdigest()
+
+
+def _extract_page(page, page_cache_dir):
+    """Returns (text, cache_hit). The page cache is plain files so pool workers can share it."""
+    cache_path = None
+    if page_cache_dir:
+        try:
+            cache_path = os.path.join(page_cache_dir, f"{_page_fingerprint(page)}.txt")
+            with open(cache_path, "r", encoding="utf-8") as handle:
+                text = handle.read()
+            os.utime(cache_path)
+            return text, True
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"DECK PAGE CACHE ERROR (read): {e}")
+            cache_path = None
+
+    text = (page.extract_text() or "").strip()
+    if cache_path:
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as handle:
+                handle.write(text)
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            print(f"DECK PAGE CACHE ERROR (write): {e}")
+    return text, False
+
+
+def _extract_page_batch(pdf_path, start, end, page_cache_dir):
+    """Pool task: [(text, cache_hit)] for pages start..end-1 of the PDF at pdf_path."""
+    global _WORKER_READER
+    if _WORKER_READER is None or _WORKER_READER[0] != pdf_path:
+        _WORKER_READER = (pdf_path, _open_reader(pdf_path))
+    reader = _WORKER_READER[1]
+    return [_extract_page(reader.pages[index], page_cache_dir) for index in range(start, end)]
+
+
+def get_extract_pool():
+    """Lazy process pool shared by every session; spawn keeps workers clear of the app's threads."""
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ProcessPoolExecutor(
+                    max_workers=extract_workers(), mp_context=multiprocessing.get_context("spawn")
+                )
+    return _POOL
+
+
+def _reset_extract_pool():
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _iter_pages_pooled(pdf_bytes, page_count, page_cache_dir, workers):
+    """
+    Yields pages in order while keeping 2 batches per worker in flight.
+    Closing the generator (early stop) cancels batches that have not started.
+    """
+    # The digest in the name keeps a worker's cached reader from outliving a reused temp path.
+    pdf_digest = hashlib.sha256(pdf_bytes).hexdigest()[:32]
+    with tempfile.NamedTemporaryFile(prefix=f"fg_deck_{pdf_digest}_", suffix=".pdf", delete=False) as handle:
+        handle.write(pdf_bytes)
+        pdf_path = handle.name
+    pool = get_extract_pool()
+    pending = deque()
+    next_start = 0
+    try:
+        while next_start < page_count or pending:
+            while next_start < page_count and len(pending) < workers * 2:
+                end = min(next_start + DECK_EXTRACT_BATCH_PAGES, page_count)
+                pending.append(pool.submit(_extract_page_batch, pdf_path, next_start, end, page_cache_dir))
+                next_start = end
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        try:
+            os.remove(pdf_path)
+        except OSError:
+            pass
+
+
+def _iter_pages(reader, pdf_bytes, page_cache_dir, workers):
+    """(text, cache_hit) per page in order; a broken pool resumes in-thread from the first missing page."""
+    page_count = len(reader.pages)
+    pages_done = 0
+    if workers > 1 and page_count >= DECK_PARALLEL_MIN_PAGES:
+        pooled_pages = _iter_pages_pooled(pdf_bytes, page_count, page_cache_dir, workers)
+        try:
+            for page in pooled_pages:
+                pages_done += 1
+                yield page
+            return
+        except BrokenProcessPool as e:
+            print(f"DECK EXTRACT ERROR (process pool): {e}. Continuing in-thread.")
+            _reset_extract_pool()
+            with _STATS_LOCK:
+                _EXTRACT_STATS["pool_failures"] += 1
+        finally:
+            pooled_pages.close()
+    for index in range(pages_done, page_count):
+        yield _extract_page(reader.pages[index], page_cache_dir)
+
+
+def extract_pitch_deck(pdf_bytes, on_text=None, on_progress=None, page_cache_dir=None, workers=None):
+    """
+    Extracts deck text page by page, in page order.
+    - PDFs with DECK_PARALLEL_MIN_PAGES+ pages are split into batches across a process pool
+    - each page's text is handed to on_text as soon as it is in order, so chunking overlaps extraction
+    - stops requesting pages once DECK_MAX_CHARS is reached; on_progress(pages_done, page_count)
+    Returns: (text, page_count, page_map) where page_map holds (page_number, start_char, end_char).
+    """
+    started = time.perf_counter()
+    reader = _open_reader(pdf_bytes)
+    page_count = len(reader.pages)
+    workers = extract_workers() if workers is None else workers
+    pooled = workers > 1 and page_count >= DECK_PARALLEL_MIN_PAGES
+
+    pieces = []
+    page_map = []
+    length = 0
+    pages_done = 0
+    cache_hits = 0
+    stopped_early = False
+    pages = _iter_pages(reader, pdf_bytes, page_cache_dir, workers)
+    try:
+        for page_number, (text, cache_hit) in enumerate(pages, start=1):
+            pages_done = page_number
+            cache_hits += int(cache_hit)
+            if text:
+                separator = DECK_PAGE_SEPARATOR if pieces else ""
+                text = text[: max(0, DECK_MAX_CHARS - length - len(separator))]
+            if text:
+                start = length + len(separator)
+                pieces.append(separator + text)
+                page_map.append((page_number, start, start + len(text)))
+                length = start + len(text)
+                if on_text is not None:
+                    on_text(text)
+            if on_progress is not None:
+                on_progress(page_number, page_count)
+            if length >= DECK_MAX_CHARS and page_number < page_count:
+                stopped_early = True
+                break
+    finally:
+        pages.close()
+
+    combined = "".join(pieces)
+    if not combined:
+        raise ValueError("No readable text found in this PDF.")
+
+    elapsed = time.perf_counter() - started
+    with _STATS_LOCK:
+        _EXTRACT_STATS["decks"] += 1
+        _EXTRACT_STATS["pages"] += pages_done
+        _EXTRACT_STATS["seconds"] += elapsed
+        _EXTRACT_STATS["page_cache_hits"] += cache_hits
+        _EXTRACT_STATS["early_stops"] += int(stopped_early)
+        _EXTRACT_STATS["last_pages_per_sec"] = round(pages_done / elapsed, 1) if elapsed else 0.0
+        _EXTRACT_STATS["last_mode"] = f"pool x{workers}" if pooled else "serial"
+    return combined, page_count, tuple(page_map)
+
+
+def get_extract_stats():
+    with _STATS_LOCK:
+        stats = dict(_EXTRACT_STATS)
+    stats["pages_per_sec"] = round(stats["pages"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+    return stats
@@ -0,0 +1,286 @@
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+DECK_STORE_FORMAT_VERSION = 1
+DECK_STORE_MAX_MB = 256
+DECK_STORE_DISK_MAX_MB = 1024
+DECK_STORE_APP_DIR = "founders-gauntlet"
+DECK_STORE_ALIAS_LIMIT = 4096
+DECK_STORE_RESCAN_PUTS = 32
+
+
+def _env_int(name, default_value):
+    try:
+        return max(0, int(os.getenv(name, "") or default_value))
+    except ValueError:
+        return default_value
+
+
+def _default_disk_dir():
+    """Per-user cache directory ($XDG_CACHE_HOME or ~/.cache), not the shared working directory."""
+    cache_home = os.getenv("XDG_CACHE_HOME", "").strip() or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, DECK_STORE_APP_DIR, "deck_store")
+
+
+def _disk_dir_from_env():
+    """FG_DECK_STORE_DIR overrides the directory; "0" turns the disk tier off."""
+    value = os.getenv("FG_DECK_STORE_DIR", "").strip()
+    if value == "0":
+        return None
+    return value or _default_disk_dir()
+
+
+def _make_private_dir(path):
+    """Creates path as 0700; refuses a directory another user owns, since its pickles get loaded."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if hasattr(os, "getuid") and os.stat(path).st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by another user")
+    os.chmod(path, 0o700)
+
+
+class DeckArtifactStore:
+    """
+    Content-addressed store for ingested decks, shared by every session in the process.
+    - records are keyed by the SHA-256 of the extracted deck text; aliases map the uploaded
+      PDF's SHA-256 to that key so a re-upload skips extraction as well
+    - memory tier: LRU bounded by the records' serialized size (FG_DECK_STORE_MAX_MB)
+    - disk tier: one pickle per record plus alias files in a private (0700) per-user directory,
+      trimmed oldest-first past FG_DECK_STORE_DISK_MAX_MB. Puts track the directory size in a
+      counter; it is only walked when the counter passes the limit or every DECK_STORE_RESCAN_PUTS
+      puts (to pick up page-cache files written alongside)
+    Records hold live index objects and are treated as read-only once stored.
+    """
+
+    def __init__(self, max_bytes=None, disk_dir=None, disk_max_bytes=None):
+        if max_bytes is None:
+            max_bytes = _env_int("FG_DECK_STORE_MAX_MB", DECK_STORE_MAX_MB) * 1024 * 1024
+        if disk_max_bytes is None:
+            disk_max_bytes = _env_int("FG_DECK_STORE_DISK_MAX_MB", DECK_STORE_DISK_MAX_MB) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.disk_dir = _disk_dir_from_env() if disk_dir is None else (disk_dir or None)
+        self.disk_max_bytes = disk_max_bytes
+        self._records = OrderedDict()
+        self._sizes = {}
+        self._aliases = OrderedDict()
+        self._bytes = 0
+        self._disk_bytes = None
+        self._puts_since_scan = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "disk_evictions": 0,
+            "disk_errors": 0,
+        }
+        if self.disk_dir:
+            try:
+                _make_private_dir(self.disk_dir)
+            except OSError as e:
+                print(f"DECK STORE DISK ERROR (mkdir {self.disk_dir}): {e}. Using memory only.")
+                self.disk_dir = None
+
+    def _path(self, name):
+        return os.path.join(self.disk_dir, name)
+
+    def _remember(self, key, record, size):
+        """Caller holds the lock."""
+        if key in self._records:
+            self._bytes -= self._sizes[key]
+        self._records[key] = record
+        self._records.move_to_end(key)
+        self._sizes[key] = size
+        self._bytes += size
+        while self._bytes > self.max_bytes and len(self._records) > 1:
+            evicted_key, _ = self._records.popitem(last=False)
+            self._bytes -= self._sizes.pop(evicted_key)
+            self.stats["evictions"] += 1
+
+    def disk_subdir(self, name):
+        """Directory for related per-deck files under the disk tier, or None when it is off."""
+        if not self.disk_dir:
+            return None
+        path = self._path(name)
+        try:
+            _make_private_dir(path)
+        except OSError as e:
+            print(f"DECK STORE DISK ERROR (mkdir {path}): {e}")
+            return None
+        return path
+
+    def _read_disk(self, key):
+        path = self._path(f"{key}.pkl")
+        try:
+            with open(path, "rb") as handle:
+                payload = handle.read()
+            stored = pickle.loads(payload)
+            if stored.get("version") != DECK_STORE_FORMAT_VERSION:
+                return None, 0
+            os.utime(path)
+            return stored["record"], len(payload)
+        except FileNotFoundError:
+            return None, 0
+        except Exception as e:
+            print(f"DECK STORE DISK ERROR (read {key}): {e}")
+            self.stats["disk_errors"] += 1
+            return None, 0
+
+    def _write_disk(self, name, payload):
+        """Writes one owner-only (0600) file; returns the bytes written."""
+        path = self._path(name)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            descriptor = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(descriptor, "wb") as handle:
+                handle.write(payload)
+            os.replace(temp_path, path)
+            return len(payload)
+        except Exception as e:
+            print(f"DECK STORE DISK ERROR (write {name}): {e}")
+            self.stats["disk_errors"] += 1
+            return 0
+
+    def _trim_disk(self):
+        """
+        Deletes least recently used files (records and disk_subdir contents, not aliases)
+        until the directory fits disk_max_bytes.
+        """
+        if not self.disk_dir or not self.disk_max_bytes:
+            return
+        entries = []
+        for directory, _, names in os.walk(self.disk_dir):
+            for name in names:
+                if name.endswith((".alias", ".tmp")):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    info = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.stats["disk_evictions"] += 1
+        with self._lock:
+            self._disk_bytes = total
+            self._puts_since_scan = 0
+
+    def _note_disk_write(self, written):
+        """Counts written bytes and trims once the counter passes the limit or a rescan is due."""
+        if not self.disk_max_bytes:
+            return
+        with self._lock:
+            self._puts_since_scan += 1
+            if self._disk_bytes is not None:
+                self._disk_bytes += written
+            needs_scan = (
+                self._disk_bytes is None
+                or self._disk_bytes > self.disk_max_bytes
+                or self._puts_since_scan >= DECK_STORE_RESCAN_PUTS
+            )
+        if needs_scan:
+            self._trim_disk()
+
+    def get(self, key):
+        """Returns the stored record for key, or None on a miss."""
+        with self._lock:
+            record = self._records.get(key)
+            if record is not None:
+                self._records.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return record
+
+        record, size = self._read_disk(key) if self.disk_dir else (None, 0)
+        with self._lock:
+            if record is None:
+                self.stats["misses"] += 1
+                return None
+            self._remember(key, record, size)
+            self.stats["disk_hits"] += 1
+        return record
+
+    def resolve_alias(self, alias):
+        """Record key an alias (e.g. a PDF SHA-256) points to, or None."""
+        with self._lock:
+            key = self._aliases.get(alias)
+        if key is not None or not self.disk_dir:
+            return key
+        try:
+            with open(self._path(f"{alias}.alias"), "r", encoding="utf-8") as handle:
+                key = handle.read().strip() or None
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"DECK STORE DISK ERROR (alias {alias}): {e}")
+            return None
+        if key is not None:
+            self._set_alias_in_memory(alias, key)
+        return key
+
+    def _set_alias_in_memory(self, alias, key):
+        with self._lock:
+            self._aliases[alias] = key
+            self._aliases.move_to_end(alias)
+            while len(self._aliases) > DECK_STORE_ALIAS_LIMIT:
+                self._aliases.popitem(last=False)
+
+    def put(self, key, record, aliases=()):
+        payload = pickle.dumps(
+            {"version": DECK_STORE_FORMAT_VERSION, "stored_at": time.time(), "record": record},
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        with self._lock:
+            self._remember(key, record, len(payload))
+            self.stats["stores"] += 1
+        for alias in aliases:
+            self._set_alias_in_memory(alias, key)
+
+        if self.disk_dir:
+            written = self._write_disk(f"{key}.pkl", payload)
+            for alias in aliases:
+                self._write_disk(f"{alias}.alias", key.encode("utf-8"))
+            self._note_disk_write(written)
+
+    def clear(self):
+        """Drops the memory tier (the disk tier is left in place)."""
+        with self._lock:
+            self._records.clear()
+            self._sizes.clear()
+            self._aliases.clear()
+            self._bytes = 0
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats, records=len(self._records), memory_mb=round(self._bytes / (1024 * 1024), 2))
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_deck_store():
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = DeckArtifactStore()
+    return _STORE
+
+
+def get_deck_store_stats():
+    return get_deck_store().get_stats()
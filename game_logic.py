@@ -1,18 +1,59 @@
+import asyncio
 import json
 import os
 import re
+import threading
 import time
 from functools import lru_cache
 
-from google import genai
-from google.genai import types
-
+import async_bridge
+from circuit_breaker import CircuitOpenError, get_circuit_breaker
+from deck_index import DeckIndex, tokenize_for_retrieval
+from deck_ingest import extract_pitch_deck
+from deck_store import get_deck_store
+from lenient_json import extract_json_object, record_repair_path
+from llm_backend import get_backend_name, get_llm_provider
+from model_router import choose_model, primary_model, record_model_call, routed_call, routed_call_async
 from personas import LEVELS, THEMES
-
-MODEL_NAME = "gemini-flash-latest"
-JUDGMENT_MODEL = MODEL_NAME
-STREAM_MODEL = MODEL_NAME
-TRANSCRIBE_MODEL = MODEL_NAME
+from prompt_budget import (
+    PRIORITY_DECK,
+    PRIORITY_HISTORY,
+    PRIORITY_INPUT,
+    PRIORITY_INSTRUCTIONS,
+    assemble_prompt,
+    prompt_section,
+    truncate_to_tokens,
+)
+from prompt_cache import build_generate_config, build_generate_config_async, get_system_block
+from rate_limit import (
+    call_with_retry,
+    call_with_retry_async,
+    deadline_scope,
+    is_backend_unavailable,
+    iterate_with_deadline,
+    new_turn_deadline,
+    record_outcome,
+    run_with_deadline,
+    task_deadline,
+    throttle_async,
+)
+from response_cache import (
+    get_response_cache,
+    get_transcript_cache,
+    make_response_key,
+    make_transcript_key,
+    text_digest,
+)
+from semantic_index import SemanticIndex, hybrid_top_chunks, retrieval_mode
+from stream_hedging import get_stream_tracker, hedged_stream
+from structured_output import is_schema_rejection, mark_structured_output_unsupported, structured_output_fields
+
+TRANSCRIBE_PROMPT = (
+    "Transcribe this founder pitch audio to plain text. "
+    "Return only the spoken transcript. "
+    "Do not add commentary."
+)
+TRANSCRIBE_SEGMENT_CONCURRENCY = 4
 
 POST_MORTEM_SCORE_KEYS = (
     "confidence",
@@ -22,53 +63,56 @@ POST_MORTEM_SCORE_KEYS = (
 )
 POST_MORTEM_LIST_LENGTH = 3
 POST_MORTEM_LIST_KEYS = ("strengths", "weaknesses", "next_actions")
+POST_MORTEM_ATTEMPTS = 3
+SCORE_TEXT_RE = re.compile(r"(-?\d+(?:\.\d+)?)\s*(?:%|/\s*(\d+(?:\.\d+)?))?")
+LIST_SPLIT_RE = re.compile(r"\n+|;\s*")
+LIST_BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+
+JUDGMENT_DAMAGE_VALUES = (0, -10, -20)
+JUDGMENT_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "damage": {"type": "integer", "enum": list(JUDGMENT_DAMAGE_VALUES)},
+        "level_passed": {"type": "boolean"},
+        "feedback": {"type": "string"},
+    },
+    "required": ["damage", "level_passed", "feedback"],
+}
+POST_MORTEM_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "scores": {
+            "type": "object",
+            "properties": {
+                key: {"type": "integer", "minimum": 0, "maximum": 100} for key in POST_MORTEM_SCORE_KEYS
+            },
+            "required": list(POST_MORTEM_SCORE_KEYS),
+        },
+        **{
+            key: {
+                "type": "array",
+                "items": {"type": "string", "minLength": 1},
+                "minItems": POST_MORTEM_LIST_LENGTH,
+                "maxItems": POST_MORTEM_LIST_LENGTH,
+            }
+            for key in POST_MORTEM_LIST_KEYS
+        },
+        "summary": {"type": "string", "minLength": 1},
+    },
+    "required": ["scores", *POST_MORTEM_LIST_KEYS, "summary"],
+}
 
 RETRIEVAL_CHUNK_WORDS = 180
 RETRIEVAL_CHUNK_OVERLAP_WORDS = 35
 RETRIEVAL_MAX_CHUNK_CHARS = 900
 RETRIEVAL_TOP_K = 3
+RETRIEVAL_MAX_CHUNKS = 5000
+# Bump when chunking or index construction changes so stored deck artifacts are rebuilt.
+DECK_ARTIFACT_VERSION = 1
+DECK_PAGE_CACHE_SUBDIR = "pages"
+POST_MORTEM_DECK_QUERY_TOKENS = 1000
 
-RETRIEVAL_STOPWORDS = {
-    "about",
-    "after",
-    "again",
-    "being",
-    "below",
-    "could",
-    "first",
-    "founder",
-    "from",
-    "have",
-    "into",
-    "just",
-    "level",
-    "more",
-    "next",
-    "only",
-    "other",
-    "same",
-    "that",
-    "their",
-    "there",
-    "these",
-    "they",
-    "this",
-    "through",
-    "under",
-    "until",
-    "what",
-    "when",
-    "where",
-    "which",
-    "while",
-    "with",
-    "would",
-    "your",
-}
-
-
-def _get_client():
-    return genai.Client()
+TURN_JUDGMENT_MIN_WAIT_SECONDS = 1.0
 
 
 def _clean_json_text(raw_text):
@@ -92,102 +136,164 @@ def _normalize_whitespace(text):
     return re.sub(r"\s+", " ", text or "").strip()
 
 
-def _tokenize_for_retrieval(text):
-    raw_tokens = re.findall(r"[a-z0-9]{3,}", (text or "").lower())
-    return [token for token in raw_tokens if token not in RETRIEVAL_STOPWORDS]
+class DeckChunker:
+    """
+    Incremental deck chunking: feed text as it is extracted (e.g. page by page) and collect
+    overlapping retrieval chunks. Feeding the whole deck text at once yields the same chunks.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self._current_words = []
+
+    def add_text(self, text):
+        for paragraph in re.split(r"\n\s*\n", (text or "").strip()):
+            paragraph_words = paragraph.split()
+            if not paragraph_words:
+                continue
+
+            if self._current_words and len(self._current_words) + len(paragraph_words) > RETRIEVAL_CHUNK_WORDS:
+                self.chunks.append(" ".join(self._current_words)[:RETRIEVAL_MAX_CHUNK_CHARS])
+                self._current_words = self._current_words[-RETRIEVAL_CHUNK_OVERLAP_WORDS:]
+
+            self._current_words.extend(paragraph_words)
+
+    def finish(self):
+        """Flushes the open chunk; output is a tuple so stored deck artifacts stay immutable."""
+        if self._current_words:
+            self.chunks.append(" ".join(self._current_words)[:RETRIEVAL_MAX_CHUNK_CHARS])
+            self._current_words = []
+        if len(self.chunks) > RETRIEVAL_MAX_CHUNKS:
+            print(f"DECK CHUNKING: {len(self.chunks)} chunks; indexing the first {RETRIEVAL_MAX_CHUNKS}.")
+        return tuple(self.chunks[:RETRIEVAL_MAX_CHUNKS])
 
 
-@lru_cache(maxsize=8)
 def _build_deck_chunks(deck_text):
-    """
-    Caches chunking for uploaded deck text.
-    Output is a tuple so it remains hash-safe for lru_cache.
-    """
-    normalized = (deck_text or "").strip()
-    if not normalized:
-        return tuple()
+    chunker = DeckChunker()
+    chunker.add_text(deck_text)
+    return chunker.finish()
 
-    paragraphs = [
-        _normalize_whitespace(part)
-        for part in re.split(r"\n\s*\n", normalized)
-        if _normalize_whitespace(part)
-    ]
-    if not paragraphs:
-        paragraphs = [_normalize_whitespace(normalized)]
 
-    chunks = []
-    current_words = []
+@lru_cache(maxsize=8)
+def _deck_digest(pitch_deck_text):
+    return text_digest(pitch_deck_text) if pitch_deck_text else ""
+
+
+def _deck_artifact_key(deck_digest):
+    return f"deck-v{DECK_ARTIFACT_VERSION}-{deck_digest}"
+
+
+def _build_deck_artifacts(deck_text, page_count=0, page_map=(), chunks=None):
+    """
+    Everything retrieval needs for one deck, built once and shared through the deck store:
+    - text, page count and page map ((page_number, start_char, end_char) into text)
+    - chunks, the BM25 index, and the semantic index unless FG_DECK_RETRIEVAL=lexical
+    """
+    if chunks is None:
+        chunks = _build_deck_chunks(deck_text)
+    return {
+        "text": deck_text,
+        "page_count": page_count,
+        "page_map": tuple(page_map),
+        "chunks": chunks,
+        "deck_index": DeckIndex(chunks),
+        "semantic_index": SemanticIndex(chunks) if retrieval_mode() != "lexical" else None,
+    }
 
-    for paragraph in paragraphs:
-        paragraph_words = paragraph.split()
-        if not paragraph_words:
-            continue
 
-        if current_words and len(current_words) + len(paragraph_words) > RETRIEVAL_CHUNK_WORDS:
-            chunk_text = " ".join(current_words).strip()
-            if chunk_text:
-                chunks.append(chunk_text[:RETRIEVAL_MAX_CHUNK_CHARS])
+def load_pitch_deck(pdf_hash):
+    """Stored artifacts for a previously ingested PDF (by its SHA-256), or None."""
+    deck_key = get_deck_store().resolve_alias(pdf_hash) if pdf_hash else None
+    return get_deck_store().get(deck_key) if deck_key else None
 
-            overlap_words = current_words[-RETRIEVAL_CHUNK_OVERLAP_WORDS:]
-            current_words = list(overlap_words)
 
-        current_words.extend(paragraph_words)
+def ingest_pitch_deck(pdf_hash, pdf_bytes, on_progress=None):
+    """
+    Extracts, chunks and indexes an uploaded PDF, then stores it; later uploads of the same PDF
+    hit load_pitch_deck. Pages are chunked as extraction streams them in;
+    on_progress(pages_done, page_count) follows extraction.
+    """
+    chunker = DeckChunker()
+    deck_text, page_count, page_map = extract_pitch_deck(
+        pdf_bytes,
+        on_text=chunker.add_text,
+        on_progress=on_progress,
+        page_cache_dir=get_deck_store().disk_subdir(DECK_PAGE_CACHE_SUBDIR),
+    )
+    deck_key = _deck_artifact_key(_deck_digest(deck_text))
+    artifacts = get_deck_store().get(deck_key)
+    if artifacts is None:
+        artifacts = _build_deck_artifacts(deck_text, page_count, page_map, chunker.finish())
+    get_deck_store().put(deck_key, artifacts, aliases=(pdf_hash,) if pdf_hash else ())
+    return artifacts
 
-    if current_words:
-        chunk_text = " ".join(current_words).strip()
-        if chunk_text:
-            chunks.append(chunk_text[:RETRIEVAL_MAX_CHUNK_CHARS])
 
-    return tuple(chunks[:100])
+def _deck_artifacts(deck_text):
+    """Artifacts for deck text from the shared store, building them for text that was never ingested."""
+    deck_key = _deck_artifact_key(_deck_digest(deck_text))
+    artifacts = get_deck_store().get(deck_key)
+    if artifacts is None:
+        artifacts = _build_deck_artifacts(deck_text)
+        get_deck_store().put(deck_key, artifacts)
+    return artifacts
 
 
-def _score_chunk(chunk_text, query_tokens):
-    if not chunk_text:
-        return 0.0
+def _get_deck_index(deck_text):
+    return _deck_artifacts(deck_text)["deck_index"]
 
-    chunk_tokens = _tokenize_for_retrieval(chunk_text)
-    if not chunk_tokens:
-        return 0.0
 
-    chunk_token_set = set(chunk_tokens)
-    overlap = chunk_token_set.intersection(query_tokens)
-    if not overlap:
-        return 0.0
+def _get_semantic_index(deck_text):
+    artifacts = _deck_artifacts(deck_text)
+    if artifacts["semantic_index"] is None:
+        # Decks stored while FG_DECK_RETRIEVAL=lexical carry no semantic index: build it once and store it back.
+        artifacts = dict(artifacts, semantic_index=SemanticIndex(artifacts["chunks"]))
+        get_deck_store().put(_deck_artifact_key(_deck_digest(deck_text)), artifacts)
+    return artifacts["semantic_index"]
 
-    overlap_count = len(overlap)
-    frequency_score = sum(chunk_text.lower().count(token) for token in overlap)
-    numeric_bonus = 0.5 if re.search(r"\d", chunk_text) else 0.0
-    density = overlap_count / max(len(query_tokens), 1)
 
-    return overlap_count + (frequency_score * 0.35) + (density * 2.0) + numeric_bonus
+@lru_cache(maxsize=32)
+def _static_query_tokens(current_level, startup_theme):
+    """Retrieval tokens from the per-level parts of the deck query (win condition, style, theme)."""
+    level_data = LEVELS.get(current_level, {})
+    return frozenset(
+        tokenize_for_retrieval(
+            " ".join(
+                [
+                    str(level_data.get("win_condition", "")),
+                    str(level_data.get("style", "")),
+                    str(startup_theme),
+                ]
+            )
+        )
+    )
 
 
-def _retrieve_pitch_deck_context(pitch_deck_text, query_text, top_k=RETRIEVAL_TOP_K):
+def _retrieve_pitch_deck_context(pitch_deck_text, query_text, top_k=RETRIEVAL_TOP_K, static_tokens=frozenset()):
     """
     Simple local retrieval:
-    - chunk deck
-    - score chunk relevance by lexical overlap
+    - chunk and index the deck once (cached per deck text)
+    - score chunks against the query with BM25; static_tokens are pre-tokenized query terms
+    - FG_DECK_RETRIEVAL=hybrid (default) / semantic blends in hashed-embedding cosine scores
+      on query_text, so paraphrases (ARR vs revenue, churned vs churn) still match
     - return top excerpts as compact context block
     """
     if not pitch_deck_text:
         return ""
 
-    chunks = _build_deck_chunks(pitch_deck_text)
-    if not chunks:
+    deck_index = _get_deck_index(pitch_deck_text)
+    if not deck_index.chunks:
         return ""
 
-    query_tokens = set(_tokenize_for_retrieval(query_text))
-    scored_chunks = []
-
-    for chunk in chunks:
-        score = _score_chunk(chunk, query_tokens)
-        scored_chunks.append((score, chunk))
-
-    scored_chunks.sort(key=lambda item: item[0], reverse=True)
-
-    selected = [chunk for score, chunk in scored_chunks if score > 0][:top_k]
+    query_tokens = static_tokens.union(tokenize_for_retrieval(query_text))
+    mode = retrieval_mode()
+    if mode == "lexical":
+        selected = deck_index.top_chunks(query_tokens, top_k)
+    else:
+        selected = hybrid_top_chunks(
+            deck_index, _get_semantic_index(pitch_deck_text), query_tokens, query_text, top_k, mode
+        )
     if not selected:
-        selected = list(chunks[:top_k])
+        selected = list(deck_index.chunks[:top_k])
 
     excerpt_lines = []
     for idx, excerpt in enumerate(selected, start=1):
@@ -200,16 +306,9 @@ def _build_deck_instruction(pitch_deck_text, user_input, current_level, startup_
     if not pitch_deck_text:
         return ""
 
-    level_data = LEVELS.get(current_level, {})
-    retrieval_query = " ".join(
-        [
-            str(user_input or ""),
-            str(level_data.get("win_condition", "")),
-            str(level_data.get("style", "")),
-            str(startup_theme),
-        ]
+    deck_context = _retrieve_pitch_deck_context(
+        pitch_deck_text, str(user_input or ""), static_tokens=_static_query_tokens(current_level, startup_theme)
     )
-    deck_context = _retrieve_pitch_deck_context(pitch_deck_text, retrieval_query)
     if not deck_context:
         return ""
 
@@ -251,6 +350,11 @@ def _default_post_mortem_report():
     }
 
 
+def is_fallback_post_mortem(report):
+    """True when a post-mortem is the canned fallback rather than a model assessment."""
+    return report == _default_post_mortem_report()
+
+
 def _clamp_score(value, default_value):
     if isinstance(value, bool):
         return default_value
@@ -352,23 +456,112 @@ def _is_valid_post_mortem_report(report):
     return True
 
 
-def _build_post_mortem_prompt(startup_theme, theme_data, outcome, transcript_text, deck_context):
-    deck_block = (
-        f"\nPITCH DECK EVIDENCE (RAG EXCERPTS):\n{deck_context}\n"
-        if deck_context
-        else "\nPITCH DECK EVIDENCE (RAG EXCERPTS): none provided\n"
-    )
+def _schema_key(key):
+    return re.sub(r"[\s\-]+", "_", str(key).strip().lower())
+
+
+def _schema_fields(mapping):
+    """Keys normalized to snake_case; the first spelling of a key wins."""
+    fields = {}
+    for key, value in mapping.items():
+        fields.setdefault(_schema_key(key), value)
+    return fields
 
+
+def _coerce_score(value):
+    """Accepts 85, 85.0, "85", "85%", "85/100" or "8.5/10"; returns None when unusable."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return max(0, min(100, int(round(value))))
+
+    match = SCORE_TEXT_RE.search(str(value))
+    if not match:
+        return None
+    numeric = float(match.group(1))
+    scale = float(match.group(2)) if match.group(2) else 100.0
+    if scale <= 0:
+        return None
+    return max(0, min(100, int(round(numeric * 100.0 / scale))))
+
+
+def _coerce_list_items(value):
+    if isinstance(value, str):
+        value = LIST_SPLIT_RE.split(value)
+    if not isinstance(value, list):
+        return []
+
+    items = []
+    for item in value:
+        if isinstance(item, dict):
+            item = next((field for field in item.values() if isinstance(field, str)), "")
+        cleaned = LIST_BULLET_RE.sub("", str(item or "")).strip()
+        if cleaned and cleaned not in items:
+            items.append(cleaned)
+    return items[:POST_MORTEM_LIST_LENGTH]
+
+
+def _coerce_post_mortem_report(candidate):
+    """
+    Schema-driven local repair of a parsed post-mortem.
+    - keys are matched case/spacing-insensitively; scores may sit at the top level
+    - scores are parsed from text and clamped, lists are split/trimmed to POST_MORTEM_LIST_LENGTH
+    Returns None when content is genuinely missing (too few items, no summary, absent score).
+    """
+    if not isinstance(candidate, dict):
+        return None
+    fields = _schema_fields(candidate)
+    scores_input = fields.get("scores")
+    if isinstance(scores_input, dict):
+        scores_input = _schema_fields(scores_input)
+    else:
+        scores_input = fields
+
+    scores = {key: _coerce_score(scores_input.get(key)) for key in POST_MORTEM_SCORE_KEYS}
+    if any(score is None for score in scores.values()):
+        return None
+
+    summary = fields.get("summary")
+    if isinstance(summary, list):
+        summary = " ".join(str(part).strip() for part in summary)
+    if not isinstance(summary, str) or not summary.strip():
+        return None
+
+    report = {"scores": scores, "summary": summary.strip()}
+    for list_key in POST_MORTEM_LIST_KEYS:
+        items = _coerce_list_items(fields.get(list_key))
+        if len(items) < POST_MORTEM_LIST_LENGTH:
+            return None
+        report[list_key] = items
+    return report
+
+
+def _repair_post_mortem_locally(raw_output):
+    """Lenient extraction + coercion; a valid report, or None when a model repair is needed."""
+    report = _coerce_post_mortem_report(extract_json_object(raw_output))
+    return report if _is_valid_post_mortem_report(report) else None
+
+
+def _parse_post_mortem_output(raw_output):
+    """Returns (report, repair_path) with repair_path in strict / local / failed."""
+    try:
+        candidate = _safe_load_json(raw_output)
+    except ValueError:
+        candidate = None
+    if _is_valid_post_mortem_report(candidate):
+        return _normalize_post_mortem_report(candidate), "strict"
+
+    report = _repair_post_mortem_locally(raw_output)
+    return report, ("local" if report is not None else "failed")
+
+
+def _build_post_mortem_instruction(startup_theme, theme_data):
     return f"""
     You are an expert startup pitch coach.
     Analyze the transcript and return ONLY valid JSON matching the exact schema below.
 
     Selected Theme: {startup_theme}
     Theme Context: {theme_data['description']}
-    Final Outcome: {outcome}
-    {deck_block}
-    TRANSCRIPT:
-    {transcript_text}
 
     JSON SCHEMA:
     {{
@@ -404,6 +597,32 @@ def _build_post_mortem_prompt(startup_theme, theme_data, outcome, transcript_tex
     """
 
 
+def _build_level_assessment_instruction(current_level, startup_theme, theme_data):
+    level_data = LEVELS.get(current_level, {})
+    return f"""
+    LEVEL UNDER REVIEW: {level_data.get('title', f'Level {current_level}')}
+    Investor Win Condition: {level_data.get('win_condition', '')}
+    Assess only the founder's performance in this level; the final report merges every level.
+    """ + _build_post_mortem_instruction(startup_theme, theme_data)
+
+
+def _build_post_mortem_prompt(outcome, transcript_text, deck_context, instruction_text=""):
+    return assemble_prompt(
+        "post_mortem",
+        [
+            prompt_section("instructions", instruction_text, PRIORITY_INSTRUCTIONS, inline=False),
+            prompt_section("outcome", f"Final Outcome: {outcome}", PRIORITY_INPUT),
+            prompt_section(
+                "deck",
+                deck_context or "none provided",
+                PRIORITY_DECK,
+                header="PITCH DECK EVIDENCE (RAG EXCERPTS):",
+            ),
+            prompt_section("transcript", transcript_text, PRIORITY_HISTORY, header="TRANSCRIPT:", keep="tail"),
+        ],
+    )
+
+
 def _build_post_mortem_repair_prompt(raw_output, validation_error):
     return f"""
     You are a strict JSON repair utility.
@@ -437,7 +656,9 @@ def _build_post_mortem_repair_prompt(raw_output, validation_error):
 
 
 def initialize_ai():
-    """Checks for API key."""
+    """Checks for API key. The offline fake backend (FG_LLM_BACKEND=fake) needs none."""
+    if get_backend_name() == "fake":
+        return True
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         print("DEBUG: GEMINI_API_KEY is missing.")
@@ -472,6 +693,11 @@ def _build_roleplay_instruction(current_level, startup_theme, theme_data):
     - Tailor skepticism to the selected startup theme.
     - Ask pointed follow-up questions when needed.
     - Output plain conversational text only.
+
+    TASK:
+    - Respond as the current investor persona in natural conversational text only.
+    - Do not include JSON.
+    - Keep your response concise and sharp (2-5 sentences).
     """
 
 
@@ -497,15 +723,56 @@ def _build_judgment_instruction(current_level, startup_theme, theme_data):
     - If the user answer is weak or violates constraints: damage is -10 or -20.
     - If the user answer satisfies the win condition: level_passed is true.
     - Otherwise: damage is 0 and level_passed is false.
+
+    TASK:
+    Output strict JSON only with this schema:
+    {{
+      "damage": <int: 0, -10, -20>,
+      "level_passed": <boolean>,
+      "feedback": "<short rationale>"
+    }}
     """
 
 
-def _recover_streamed_reply(reply_prompt, partial_text, stream_error):
-    """
-    Recovery path for interrupted streams.
-    Returns continuation text (or full text if no partial exists).
-    """
-    recovery_prompt = f"""
+def _get_system_block(task, current_level, startup_theme, theme_data=None):
+    """Static persona/theme preamble for one task, compiled once per (task, level, theme)."""
+    theme_data = theme_data or get_theme_data(startup_theme)
+    builders = {
+        "stream": lambda: _build_roleplay_instruction(current_level, startup_theme, theme_data),
+        "judgment": lambda: _build_judgment_instruction(current_level, startup_theme, theme_data),
+        "post_mortem": lambda: _build_post_mortem_instruction(startup_theme, theme_data),
+        "level_assessment": lambda: _build_level_assessment_instruction(current_level, startup_theme, theme_data),
+    }
+    return get_system_block(task, current_level, startup_theme, builders[task])
+
+
+def _response_cache_key(task, current_level, startup_theme, pitch_deck_text, chat_history, user_input, model):
+    """Exact-match key; the system block key doubles as the prompt version."""
+    system_block = _get_system_block(task, current_level, startup_theme)
+    return make_response_key(
+        task,
+        current_level,
+        startup_theme,
+        _deck_digest(pitch_deck_text),
+        chat_history,
+        user_input,
+        f"{system_block['key']}|{model}",
+    )
+
+
+def _cached_response(cache_key):
+    cache = get_response_cache()
+    return cache.get(cache_key) if cache is not None else None
+
+
+def _store_response(cache_key, value):
+    cache = get_response_cache()
+    if cache is not None:
+        cache.put(cache_key, value)
+
+
+def _build_recovery_prompt(reply_prompt, partial_text, stream_error):
+    return f"""
     {reply_prompt}
 
     RECOVERY MODE:
@@ -522,104 +789,301 @@ def _recover_streamed_reply(reply_prompt, partial_text, stream_error):
     - Do not repeat prior text.
     """
 
-    for attempt in range(2):
-        try:
-            client = _get_client()
-            response = client.models.generate_content(
-                model=STREAM_MODEL,
-                contents=recovery_prompt,
-            )
-            return (response.text or "").strip()
-        except Exception as e:
-            error_str = str(e)
-            if "429" in error_str or "Quota" in error_str:
-                print(f"Quota hit in stream recovery. Waiting 2 seconds... (Attempt {attempt + 1}/2)")
-                time.sleep(2)
-                continue
-            print(f"STREAM RECOVERY ERROR: {e}")
-            return ""
 
-    return ""
+async def _recover_streamed_reply_async(reply_prompt, partial_text, stream_error, system_block):
+    """
+    Recovery path for interrupted streams, routed separately from the stream itself.
+    Returns continuation text (or full text if no partial exists).
+    """
+    recovery_prompt = _build_recovery_prompt(reply_prompt, partial_text, stream_error)
+
+    async def _call(model):
+        return await get_llm_provider().agenerate(
+            model, recovery_prompt, await build_generate_config_async(system_block, model)
+        )
+
+    try:
+        recovered = await call_with_retry_async("stream", lambda: routed_call_async("recovery", _call))
+        return recovered.strip()
+    except Exception as e:
+        print(f"STREAM RECOVERY ERROR: {e}")
+        return ""
+
+
+def _render_history_text(chat_history, conversation_memory=None):
+    if conversation_memory is not None:
+        return conversation_memory.render(chat_history)
+    return "\n".join([f"{msg['role'].upper()}: {msg['content']}" for msg in chat_history])
+
+
+class TurnContext:
+    """
+    Everything one user turn's prompts are built from, assembled once and shared.
+    - the stream and judgment calls read the same memoized deck excerpts, rendered history
+      and system blocks, so both see identical evidence and the work is done once
+    - with_history() derives the re-judgment context, reusing everything history-independent
+    """
+
+    HISTORY_KEYS = ("history", "prompt", "cache_key")
+
+    def __init__(
+        self,
+        user_input,
+        current_level,
+        chat_history,
+        startup_theme,
+        pitch_deck_text="",
+        conversation_memory=None,
+    ):
+        self.user_input = user_input
+        self.current_level = current_level
+        self.chat_history = list(chat_history)
+        self.startup_theme = startup_theme
+        self.pitch_deck_text = pitch_deck_text
+        self.conversation_memory = conversation_memory
+        self.theme_data = get_theme_data(startup_theme)
+        self.stats = {"builds": 0, "reuses": 0}
+        self._memo = {}
+        self._lock = threading.RLock()
+
+    def _memoized(self, key, build):
+        with self._lock:
+            if key in self._memo:
+                self.stats["reuses"] += 1
+                return self._memo[key]
+            self.stats["builds"] += 1
+            value = self._memo[key] = build()
+            return value
+
+    def with_history(self, chat_history):
+        """Same turn, different history (e.g. with the streamed reply appended)."""
+        derived = TurnContext(
+            self.user_input,
+            self.current_level,
+            chat_history,
+            self.startup_theme,
+            self.pitch_deck_text,
+            self.conversation_memory,
+        )
+        with self._lock:
+            derived._memo = {key: value for key, value in self._memo.items() if key[0] not in self.HISTORY_KEYS}
+        return derived
+
+    def system_block(self, task):
+        return self._memoized(
+            ("system", task),
+            lambda: _get_system_block(task, self.current_level, self.startup_theme, self.theme_data),
+        )
 
+    def deck_instruction(self):
+        return self._memoized(
+            ("deck",),
+            lambda: _build_deck_instruction(
+                self.pitch_deck_text, self.user_input, self.current_level, self.startup_theme
+            ),
+        )
+
+    def history_text(self):
+        return self._memoized(
+            ("history",), lambda: _render_history_text(self.chat_history, self.conversation_memory)
+        )
 
-def stream_investor_reply(user_input, current_level, chat_history, startup_theme, pitch_deck_text=""):
+    def prompt(self, task):
+        return self._memoized(("prompt", task), lambda: _build_turn_suffix(task, self))
+
+    def response_cache_key(self, task, model):
+        return self._memoized(
+            ("cache_key", task, model),
+            lambda: _response_cache_key(
+                task,
+                self.current_level,
+                self.startup_theme,
+                self.pitch_deck_text,
+                self.chat_history,
+                self.user_input,
+                model,
+            ),
+        )
+
+
+def _build_turn_suffix(task, turn_context):
+    """
+    Dynamic per-turn part of the stream and judgment prompts, packed into the task budget.
+    Priority: instructions > latest input > deck excerpts > history.
+    """
+    return assemble_prompt(
+        task,
+        [
+            prompt_section(
+                "instructions", turn_context.system_block(task)["text"], PRIORITY_INSTRUCTIONS, inline=False
+            ),
+            prompt_section("deck", turn_context.deck_instruction(), PRIORITY_DECK),
+            prompt_section(
+                "history",
+                turn_context.history_text(),
+                PRIORITY_HISTORY,
+                header="CURRENT CHAT HISTORY:",
+                keep="tail",
+            ),
+            prompt_section(
+                "input", str(turn_context.user_input or ""), PRIORITY_INPUT, header="USER'S NEW INPUT:"
+            ),
+        ],
+    )
+
+
+def _stream_recovery_notice(partial_text):
+    if partial_text:
+        return "\n\n*(Connection jitter detected. Recovering remaining text...)*\n\n"
+    return "*(Reconnecting to investor response...)* "
+
+
+def _degraded_investor_line(current_level, chat_history):
+    """Canned in-character line served while the model backend circuit is open."""
+    lines = LEVELS.get(current_level, {}).get("degraded_lines") or [
+        "Let's pause on that. Tell me again, in one sentence, why this business wins."
+    ]
+    return lines[len(chat_history) % len(lines)]
+
+
+def _recovered_reply_tail(partial_text, recovered):
+    """Returns the text to show after recovery, without repeating what already streamed."""
+    if not recovered:
+        if partial_text:
+            return "\n*(Reply may be partial due to a temporary connection issue.)*"
+        return "*(The investor pauses, unable to respond right now. Try again.)*"
+
+    cleaned_recovered = recovered
+    if partial_text:
+        if cleaned_recovered.startswith(partial_text):
+            cleaned_recovered = cleaned_recovered[len(partial_text):]
+        elif len(partial_text) > 80:
+            tail = partial_text[-80:]
+            if cleaned_recovered.startswith(tail):
+                cleaned_recovered = cleaned_recovered[len(tail):]
+
+    return cleaned_recovered.lstrip()
+
+
+def stream_investor_reply(
+    user_input, current_level, chat_history, startup_theme, pitch_deck_text="", conversation_memory=None
+):
     """
     Streams only the investor dialogue text token-by-token for low-latency UX.
     Mechanics (damage / pass) should be requested separately via get_turn_judgment.
+    Runs the async stream (with hedging) on the bridge loop.
     """
-    theme_data = get_theme_data(startup_theme)
-    roleplay_instruction = _build_roleplay_instruction(current_level, startup_theme, theme_data)
-    deck_instruction = _build_deck_instruction(
-        pitch_deck_text, user_input, current_level, startup_theme
+    return async_bridge.iterate(
+        stream_investor_reply_async(
+            user_input, current_level, chat_history, startup_theme, pitch_deck_text, conversation_memory
+        )
     )
-    history_text = "\n".join([f"{msg['role'].upper()}: {msg['content']}" for msg in chat_history])
 
-    reply_prompt = f"""
-    {roleplay_instruction}
-    {deck_instruction}
 
-    CURRENT CHAT HISTORY:
-    {history_text}
+async def stream_investor_reply_async(
+    user_input, current_level, chat_history, startup_theme, pitch_deck_text="", conversation_memory=None
+):
+    """
+    Yields reply tokens from the provider's async stream.
+    A stalled first token triggers a hedged second request (see stream_hedging.hedged_stream).
+    """
+    turn_context = TurnContext(
+        user_input, current_level, chat_history, startup_theme, pitch_deck_text, conversation_memory
+    )
+    async for token in _stream_turn_reply_async(turn_context):
+        yield token
 
-    USER'S NEW INPUT:
-    {user_input}
 
-    TASK:
-    - Respond as the current investor persona in natural conversational text only.
-    - Do not include JSON.
-    - Keep your response concise and sharp (2-5 sentences).
-    """
+async def _stream_turn_reply_async(turn_context):
+    """Investor reply stream for one TurnContext."""
+    current_level = turn_context.current_level
+    chat_history = turn_context.chat_history
+    reply_prompt = turn_context.prompt("stream")
+    reply_block = turn_context.system_block("stream")
+    stream_model = choose_model("stream")
+    reply_config = await build_generate_config_async(reply_block, stream_model)
 
-    def _token_generator():
-        partial_chunks = []
-        try:
-            client = _get_client()
-            response_stream = client.models.generate_content_stream(
-                model=STREAM_MODEL,
-                contents=reply_prompt,
-            )
-            for chunk in response_stream:
-                text = chunk.text or ""
-                if text:
-                    partial_chunks.append(text)
-                    yield text
-            return
-        except Exception as stream_error:
-            partial_text = "".join(partial_chunks).strip()
-            if partial_text:
-                yield "\n\n*(Connection jitter detected. Recovering remaining text...)*\n\n"
-            else:
-                yield "*(Reconnecting to investor response...)* "
+    partial_chunks = []
+    try:
+        await throttle_async("stream")
+        sent_at = time.perf_counter()
+        tokens = hedged_stream(
+            lambda: get_llm_provider().astream(stream_model, reply_prompt, reply_config),
+            get_stream_tracker(),
+            acquire_hedge=lambda: throttle_async("stream"),
+            can_hedge=get_circuit_breaker().is_closed,
+        )
+        async for text in tokens:
+            if not partial_chunks:
+                record_model_call("stream", stream_model, time.perf_counter() - sent_at)
+            partial_chunks.append(text)
+            yield text
+        record_outcome()
+        return
+    except CircuitOpenError:
+        yield _degraded_investor_line(current_level, chat_history)
+        return
+    except Exception as stream_error:
+        record_outcome(stream_error)
+        record_model_call("stream", stream_model, None, stream_error)
+        partial_text = "".join(partial_chunks).strip()
+        yield _stream_recovery_notice(partial_text)
+
+        recovered = await _recover_streamed_reply_async(
+            reply_prompt=reply_prompt,
+            partial_text=partial_text,
+            stream_error=str(stream_error),
+            system_block=reply_block,
+        )
+        if not recovered and not partial_text and not get_circuit_breaker().is_closed():
+            recovered = _degraded_investor_line(current_level, chat_history)
+        tail = _recovered_reply_tail(partial_text, recovered)
+        if tail:
+            yield tail
 
-            recovered = _recover_streamed_reply(
-                reply_prompt=reply_prompt,
-                partial_text=partial_text,
-                stream_error=str(stream_error),
-            )
-            if not recovered:
-                if partial_text:
-                    yield "\n*(Reply may be partial due to a temporary connection issue.)*"
-                else:
-                    yield "*(The investor pauses, unable to respond right now. Try again.)*"
-                return
 
-            cleaned_recovered = recovered
-            if partial_text:
-                if cleaned_recovered.startswith(partial_text):
-                    cleaned_recovered = cleaned_recovered[len(partial_text):]
-                elif len(partial_text) > 80:
-                    tail = partial_text[-80:]
-                    if cleaned_recovered.startswith(tail):
-                        cleaned_recovered = cleaned_recovered[len(tail):]
+def _parse_turn_judgment(raw_text):
+    game_data = _safe_load_json(raw_text)
+
+    damage = game_data.get("damage", 0)
+    try:
+        damage = int(damage)
+    except (TypeError, ValueError):
+        damage = 0
+    if damage not in JUDGMENT_DAMAGE_VALUES:
+        damage = -20 if damage < -10 else (-10 if damage < 0 else 0)
+
+    level_passed = bool(game_data.get("level_passed", False))
+    feedback = str(game_data.get("feedback", "")).strip()
+
+    return {
+        "damage": damage,
+        "level_passed": level_passed,
+        "feedback": feedback,
+    }
+
+
+def _fallback_turn_judgment(feedback):
+    return {
+        "damage": 0,
+        "level_passed": False,
+        "feedback": feedback,
+    }
 
-            cleaned_recovered = cleaned_recovered.lstrip()
-            if cleaned_recovered:
-                yield cleaned_recovered
 
-    return _token_generator()
+def _judgment_failure(error):
+    if isinstance(error, CircuitOpenError):
+        return _fallback_turn_judgment("Investor network degraded. No damage this round.")
+    if is_backend_unavailable(error):
+        print(f"JUDGMENT GAVE UP: {error}")
+        return _fallback_turn_judgment("Model overloaded. Judgment unavailable.")
+    print(f"JUDGMENT ERROR: {error}")
+    return _fallback_turn_judgment(f"System error: {error}")
 
 
-def get_turn_judgment(user_input, current_level, chat_history, startup_theme, pitch_deck_text=""):
+def get_turn_judgment(
+    user_input, current_level, chat_history, startup_theme, pitch_deck_text="", conversation_memory=None
+):
     """
     Returns strict mechanics JSON after a streamed investor reply.
     Output schema:
@@ -629,76 +1093,227 @@ def get_turn_judgment(user_input, current_level, chat_history, startup_theme, pi
       "feedback": "..."
     }
     """
-    theme_data = get_theme_data(startup_theme)
-    judgment_instruction = _build_judgment_instruction(current_level, startup_theme, theme_data)
-    deck_instruction = _build_deck_instruction(
-        pitch_deck_text, user_input, current_level, startup_theme
+    judgment, _ = _request_turn_judgment(
+        TurnContext(user_input, current_level, chat_history, startup_theme, pitch_deck_text, conversation_memory)
     )
-    history_text = "\n".join([f"{msg['role'].upper()}: {msg['content']}" for msg in chat_history])
+    return judgment
 
-    judgment_prompt = f"""
-    {judgment_instruction}
-    {deck_instruction}
 
-    CURRENT CHAT HISTORY:
-    {history_text}
+async def get_turn_judgment_async(
+    user_input, current_level, chat_history, startup_theme, pitch_deck_text="", conversation_memory=None
+):
+    """Async twin of get_turn_judgment."""
+    judgment, _ = await _request_turn_judgment_async(
+        TurnContext(user_input, current_level, chat_history, startup_theme, pitch_deck_text, conversation_memory)
+    )
+    return judgment
 
-    USER'S NEW INPUT:
-    {user_input}
 
-    TASK:
-    Output strict JSON only with this schema:
-    {{
-      "damage": <int: 0, -10, -20>,
-      "level_passed": <boolean>,
-      "feedback": "<short rationale>"
-    }}
+def _generate_structured(task, contents, system_block, schema):
+    """
+    JSON call constrained by schema (structured-output mode), on the task's routed model.
+    If the model rejects the schema, it is remembered per model and the call is repeated
+    as plain prompt-only JSON, which the existing parsers/repair path handle.
     """
 
-    for attempt in range(3):
+    def _call(model):
+        config = build_generate_config(system_block, model, **structured_output_fields(model, schema))
         try:
-            client = _get_client()
-            response = client.models.generate_content(
-                model=JUDGMENT_MODEL,
-                contents=judgment_prompt,
-            )
-            raw_text = response.text or ""
-            game_data = _safe_load_json(raw_text)
+            return get_llm_provider().generate(model, contents, config)
+        except Exception as e:
+            if not is_schema_rejection(e):
+                raise
+            mark_structured_output_unsupported(model, e)
+        return get_llm_provider().generate(model, contents, build_generate_config(system_block, model))
 
-            damage = game_data.get("damage", 0)
-            try:
-                damage = int(damage)
-            except (TypeError, ValueError):
-                damage = 0
-            if damage not in (0, -10, -20):
-                damage = -20 if damage < -10 else (-10 if damage < 0 else 0)
-
-            level_passed = bool(game_data.get("level_passed", False))
-            feedback = str(game_data.get("feedback", "")).strip()
-
-            return {
-                "damage": damage,
-                "level_passed": level_passed,
-                "feedback": feedback,
-            }
+    return call_with_retry(task, lambda: routed_call(task, _call))
+
+
+async def _generate_structured_async(task, contents, system_block, schema):
+    """Async twin of _generate_structured."""
+
+    async def _call(model):
+        config = await build_generate_config_async(system_block, model, **structured_output_fields(model, schema))
+        try:
+            return await get_llm_provider().agenerate(model, contents, config)
         except Exception as e:
-            error_str = str(e)
-            if "429" in error_str or "Quota" in error_str:
-                print(f"Quota hit in judgment. Waiting 3 seconds... (Attempt {attempt + 1}/3)")
-                time.sleep(3)
-                continue
-            print(f"JUDGMENT ERROR: {e}")
-            return {
-                "damage": 0,
-                "level_passed": False,
-                "feedback": f"System error: {e}",
+            if not is_schema_rejection(e):
+                raise
+            mark_structured_output_unsupported(model, e)
+        return await get_llm_provider().agenerate(
+            model, contents, await build_generate_config_async(system_block, model)
+        )
+
+    return await call_with_retry_async(task, lambda: routed_call_async(task, _call))
+
+
+def _request_turn_judgment(turn_context):
+    """
+    Shared judgment call for one TurnContext.
+    Returns: (judgment, is_model_verdict) where the flag is False for fallback payloads.
+    Model verdicts are served from / stored in the exact-match response cache.
+    """
+    cache_key = turn_context.response_cache_key("judgment", primary_model("judgment"))
+    cached_judgment = _cached_response(cache_key)
+    if cached_judgment is not None:
+        return cached_judgment, True
+
+    judgment_prompt = turn_context.prompt("judgment")
+    judgment_block = turn_context.system_block("judgment")
+
+    try:
+        raw_text = _generate_structured(
+            "judgment", judgment_prompt, judgment_block, JUDGMENT_RESPONSE_SCHEMA
+        )
+        judgment = _parse_turn_judgment(raw_text)
+    except Exception as e:
+        return _judgment_failure(e), False
+
+    _store_response(cache_key, judgment)
+    return judgment, True
+
+
+async def _request_turn_judgment_async(turn_context):
+    """Async twin of _request_turn_judgment."""
+    cache_key = turn_context.response_cache_key("judgment", primary_model("judgment"))
+    cached_judgment = _cached_response(cache_key)
+    if cached_judgment is not None:
+        return cached_judgment, True
+
+    judgment_prompt = turn_context.prompt("judgment")
+    judgment_block = turn_context.system_block("judgment")
+
+    try:
+        raw_text = await _generate_structured_async(
+            "judgment", judgment_prompt, judgment_block, JUDGMENT_RESPONSE_SCHEMA
+        )
+        judgment = _parse_turn_judgment(raw_text)
+    except Exception as e:
+        return _judgment_failure(e), False
+
+    _store_response(cache_key, judgment)
+    return judgment, True
+
+
+def _reply_contradicts_judgment(judgment, streamed_reply):
+    """
+    The speculative judgment never saw the investor reply.
+    A pass verdict while the investor is still closing on a question means the reply
+    changed the picture, so the round is judged again with the reply included.
+    """
+    if not judgment.get("level_passed"):
+        return False
+    reply = (streamed_reply or "").strip()
+    if not reply or reply.startswith("*("):
+        return False
+    return reply.rstrip("*)").rstrip().endswith("?")
+
+
+class TurnPipeline:
+    """
+    Concurrent turn pipeline:
+    - speculative judgment starts on the async bridge as soon as the user input arrives
+    - investor reply streams from the same bridge loop at the same time
+    - finalize() reconciles the speculative verdict with the completed reply
+    - every call of the turn (stream, judgment, re-judgment, retries) shares one deadline
+    - stream and judgment prompts come from one TurnContext
+    """
+
+    def __init__(self, turn_context):
+        self.turn_context = turn_context
+        self.timings = {}
+        self.deadline = new_turn_deadline()
+
+        self._started_at = time.perf_counter()
+        self._stream_done_at = None
+        self._judgment_future = async_bridge.submit(
+            run_with_deadline(self.deadline, self._timed_judgment(self.turn_context))
+        )
+
+    async def _timed_judgment(self, turn_context):
+        started = time.perf_counter()
+        judgment, is_model_verdict = await _request_turn_judgment_async(turn_context)
+        return judgment, is_model_verdict, time.perf_counter() - started
+
+    def stream_reply(self):
+        """Yields investor reply tokens while recording first-token and stream-end timings."""
+        tokens = async_bridge.iterate(
+            iterate_with_deadline(self.deadline, _stream_turn_reply_async(self.turn_context))
+        )
+        try:
+            for token in tokens:
+                if "first_token_s" not in self.timings:
+                    self.timings["first_token_s"] = round(time.perf_counter() - self._started_at, 3)
+                yield token
+        finally:
+            self._stream_done_at = time.perf_counter()
+            self.timings["stream_s"] = round(self._stream_done_at - self._started_at, 3)
+
+    def finalize(self, streamed_reply):
+        """
+        Returns the judgment for this turn.
+        Reuses the speculative verdict unless it failed or the reply contradicts it.
+        """
+        if self._stream_done_at is None:
+            self._stream_done_at = time.perf_counter()
+            self.timings.setdefault("stream_s", round(self._stream_done_at - self._started_at, 3))
+
+        wait_started = time.perf_counter()
+        try:
+            judgment, is_model_verdict, judgment_seconds = self._judgment_future.result(
+                timeout=max(self.deadline.remaining(), TURN_JUDGMENT_MIN_WAIT_SECONDS)
+            )
+        except Exception as e:
+            print(f"SPECULATIVE JUDGMENT ERROR: {e}")
+            self._judgment_future.cancel()
+            judgment, is_model_verdict, judgment_seconds = None, False, 0.0
+        wait_seconds = time.perf_counter() - wait_started
+
+        rejudge_reason = ""
+        if not is_model_verdict:
+            rejudge_reason = "speculative-unavailable"
+        elif _reply_contradicts_judgment(judgment, streamed_reply):
+            rejudge_reason = "reply-contradicts-pass"
+
+        rejudge_seconds = 0.0
+        if rejudge_reason and not get_circuit_breaker().is_closed():
+            rejudge_reason = "skipped-circuit-open"
+        elif rejudge_reason:
+            rejudge_context = self.turn_context.with_history(
+                self.turn_context.chat_history + [{"role": "ai", "content": streamed_reply or ""}]
+            )
+            judgment, _, rejudge_seconds = async_bridge.run(
+                run_with_deadline(self.deadline, self._timed_judgment(rejudge_context))
+            )
+        if judgment is None:
+            # Speculative call failed and the breaker blocked the re-judge: degrade instead of crashing the view.
+            judgment = _fallback_turn_judgment("Investor network degraded. No damage this round.")
+
+        total_seconds = time.perf_counter() - self._started_at
+        sequential_seconds = self.timings["stream_s"] + judgment_seconds + rejudge_seconds
+        self.timings.update(
+            {
+                "judgment_s": round(judgment_seconds, 3),
+                "judgment_wait_s": round(wait_seconds, 3),
+                "rejudge_s": round(rejudge_seconds, 3),
+                "rejudge_reason": rejudge_reason,
+                "total_s": round(total_seconds, 3),
+                "saved_s": round(max(0.0, sequential_seconds - total_seconds), 3),
+                "context_reuses": self.turn_context.stats["reuses"],
             }
+        )
+        print(
+            "TURN PIPELINE: "
+            f"stream={self.timings['stream_s']}s judgment={self.timings['judgment_s']}s "
+            f"wait={self.timings['judgment_wait_s']}s rejudge={self.timings['rejudge_s']}s "
+            f"total={self.timings['total_s']}s saved={self.timings['saved_s']}s"
+        )
+        return judgment
 
-    return {
-        "damage": 0,
-        "level_passed": False,
-        "feedback": "Model overloaded. Judgment unavailable.",
-    }
+
+def start_turn_pipeline(turn_context):
+    """Starts the speculative judgment immediately and returns the pipeline handle."""
+    return TurnPipeline(turn_context)
 
 
 def get_ai_response(user_input, current_level, chat_history, startup_theme, pitch_deck_text=""):
@@ -721,111 +1336,365 @@ def get_ai_response(user_input, current_level, chat_history, startup_theme, pitc
     }
 
 
+def _transcript_cache_key(audio_bytes, mime_type):
+    """The transcription prompt digest and primary model act as the prompt version."""
+    return make_transcript_key(
+        audio_bytes, mime_type, f"{text_digest(TRANSCRIBE_PROMPT)[:12]}|{primary_model('transcription')}"
+    )
+
+
+def _cached_transcript(cache_key):
+    cache = get_transcript_cache()
+    return cache.get(cache_key) if cache is not None else None
+
+
+def _store_transcript(cache_key, transcript):
+    cache = get_transcript_cache()
+    if cache is not None:
+        cache.put(cache_key, transcript)
+
+
 def transcribe_pitch_audio(audio_bytes, mime_type="audio/wav"):
     """
-    Transcribes microphone input to text using Gemini multimodal support.
+    Transcribes microphone input to text using the provider's multimodal support.
     Returns plain text transcript or empty string on failure.
+    Identical clips (same bytes and MIME type) resolve from the process-wide transcript cache.
     """
     if not audio_bytes:
         return ""
 
-    safe_mime = (mime_type or "audio/wav").strip() or "audio/wav"
-    prompt_part = types.Part.from_text(
-        text=(
-            "Transcribe this founder pitch audio to plain text. "
-            "Return only the spoken transcript. "
-            "Do not add commentary."
+    cache_key = _transcript_cache_key(audio_bytes, mime_type)
+    cached_transcript = _cached_transcript(cache_key)
+    if cached_transcript:
+        return cached_transcript
+
+    try:
+        raw_text = call_with_retry(
+            "transcription",
+            lambda: routed_call(
+                "transcription",
+                lambda model: get_llm_provider().transcribe(model, audio_bytes, mime_type, TRANSCRIBE_PROMPT),
+            ),
         )
-    )
-    audio_part = types.Part.from_bytes(data=audio_bytes, mime_type=safe_mime)
+        transcript = _normalize_whitespace(raw_text)
+        if transcript:
+            _store_transcript(cache_key, transcript)
+            return transcript
+        raise ValueError("Empty transcript.")
+    except Exception as e:
+        print(f"TRANSCRIPTION ERROR: {e}")
+        return ""
 
-    for attempt in range(3):
-        try:
-            client = _get_client()
-            response = client.models.generate_content(
-                model=TRANSCRIBE_MODEL,
-                contents=[prompt_part, audio_part],
-            )
-            transcript = _normalize_whitespace(response.text or "")
-            if transcript:
-                return transcript
-            raise ValueError("Empty transcript.")
-        except Exception as e:
-            error_str = str(e)
-            if "429" in error_str or "Quota" in error_str:
-                print(f"Quota hit in transcription. Waiting 3 seconds... (Attempt {attempt + 1}/3)")
-                time.sleep(3)
-                continue
-            print(f"TRANSCRIPTION ERROR: {e}")
-            return ""
 
-    return ""
+async def transcribe_pitch_audio_async(audio_bytes, mime_type="audio/wav"):
+    """Async twin of transcribe_pitch_audio."""
+    if not audio_bytes:
+        return ""
+
+    cache_key = _transcript_cache_key(audio_bytes, mime_type)
+    cached_transcript = _cached_transcript(cache_key)
+    if cached_transcript:
+        return cached_transcript
+
+    try:
+        raw_text = await call_with_retry_async(
+            "transcription",
+            lambda: routed_call_async(
+                "transcription",
+                lambda model: get_llm_provider().atranscribe(model, audio_bytes, mime_type, TRANSCRIBE_PROMPT),
+            ),
+        )
+        transcript = _normalize_whitespace(raw_text)
+        if transcript:
+            _store_transcript(cache_key, transcript)
+            return transcript
+        raise ValueError("Empty transcript.")
+    except Exception as e:
+        print(f"TRANSCRIPTION ERROR: {e}")
+        return ""
 
 
-def get_post_mortem_analysis(chat_history, startup_theme, outcome, pitch_deck_text=""):
+def stream_pitch_transcript(audio_bytes, mime_type="audio/wav", segments=None):
     """
-    Phase 1.1 + Phase 2:
-    - strict JSON validation / repair / normalization
-    - includes pitch deck RAG excerpts in evaluation context
+    Yields the transcript so far while segments of a finished clip are transcribed on the bridge loop.
+    The last item is the full transcript; nothing is yielded when transcription fails.
     """
-    client = _get_client()
-    theme_data = get_theme_data(startup_theme)
-    transcript_text = "\n".join([f"{msg['role'].upper()}: {msg['content']}" for msg in chat_history])
+    return async_bridge.iterate(stream_pitch_transcript_async(audio_bytes, mime_type, segments))
 
-    deck_query = f"{outcome}\n{transcript_text[:4000]}"
-    deck_context = _retrieve_pitch_deck_context(pitch_deck_text, deck_query, top_k=4)
 
-    generation_prompt = _build_post_mortem_prompt(
-        startup_theme,
-        theme_data,
-        outcome,
-        transcript_text,
-        deck_context,
-    )
+async def stream_pitch_transcript_async(audio_bytes, mime_type="audio/wav", segments=None):
+    """
+    Incremental transcription of a clip pre-split at silences (see preprocess_voice_clip).
+    - segments are transcribed concurrently and stitched back in order as each one lands
+    - a failed segment falls back to a single whole-clip call
+    - the stitched transcript is cached under the whole clip's key
+    """
+    if not audio_bytes:
+        return
 
-    best_candidate = None
-    last_error = None
+    cache_key = _transcript_cache_key(audio_bytes, mime_type)
+    cached_transcript = _cached_transcript(cache_key)
+    if cached_transcript:
+        yield cached_transcript
+        return
 
-    for attempt in range(3):
-        raw_output = ""
+    segments = [segment for segment in segments or [] if segment] or [audio_bytes]
+    semaphore = asyncio.Semaphore(TRANSCRIBE_SEGMENT_CONCURRENCY)
 
-        try:
-            response = client.models.generate_content(model=MODEL_NAME, contents=generation_prompt)
-            raw_output = response.text or ""
-            candidate = _safe_load_json(raw_output)
-            best_candidate = candidate
+    async def _transcribe_segment(segment):
+        async with semaphore:
+            return await transcribe_pitch_audio_async(segment, mime_type)
 
-            if _is_valid_post_mortem_report(candidate):
-                return _normalize_post_mortem_report(candidate)
+    tasks = [asyncio.ensure_future(_transcribe_segment(segment)) for segment in segments]
+    parts = []
+    try:
+        for task in tasks:
+            part = await task
+            if not part:
+                break
+            parts.append(part)
+            yield " ".join(parts)
+    finally:
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    if len(parts) == len(segments):
+        _store_transcript(cache_key, " ".join(parts))
+    elif len(segments) > 1:
+        print(f"TRANSCRIPTION: segment {len(parts) + 1}/{len(segments)} failed; retrying the whole clip.")
+        transcript = await transcribe_pitch_audio_async(audio_bytes, mime_type)
+        if transcript:
+            yield transcript
+
+
+def _build_post_mortem_deck_query(outcome, transcript_text):
+    """Founder claims are what the deck should be checked against, so USER lines lead the query."""
+    founder_lines = "\n".join(
+        line for line in transcript_text.splitlines() if line.startswith("USER:")
+    )
+    query_body = truncate_to_tokens(founder_lines or transcript_text, POST_MORTEM_DECK_QUERY_TOKENS)
+    return f"{outcome}\n{query_body}"
 
-            raise ValueError("Schema validation failed for initial post-mortem output.")
 
-        except Exception as first_error:
-            last_error = first_error
+def _build_post_mortem_generation_prompt(
+    chat_history, startup_theme, outcome, pitch_deck_text, transcript_text=None
+):
+    if transcript_text is None:
+        transcript_text = _render_history_text(chat_history)
 
-            try:
-                repair_prompt = _build_post_mortem_repair_prompt(raw_output, str(first_error))
-                repair_response = client.models.generate_content(model=MODEL_NAME, contents=repair_prompt)
-                repaired_output = repair_response.text or ""
-                repaired_candidate = _safe_load_json(repaired_output)
-                best_candidate = repaired_candidate
-
-                if _is_valid_post_mortem_report(repaired_candidate):
-                    return _normalize_post_mortem_report(repaired_candidate)
-
-                raise ValueError("Schema validation failed for repaired post-mortem output.")
-
-            except Exception as repair_error:
-                last_error = repair_error
-                error_str = str(repair_error)
-                if "429" in error_str or "Quota" in error_str:
-                    print(f"Quota hit during post-mortem. Waiting 5 seconds... (Attempt {attempt + 1}/3)")
-                    time.sleep(5)
-                continue
+    deck_query = _build_post_mortem_deck_query(outcome, transcript_text)
+    deck_context = _retrieve_pitch_deck_context(pitch_deck_text, deck_query, top_k=4)
+    system_block = _get_system_block("post_mortem", 0, startup_theme)
+
+    return _build_post_mortem_prompt(outcome, transcript_text, deck_context, system_block["text"])
 
+
+def _finalize_post_mortem(best_candidate, last_error):
+    record_repair_path("post_mortem", "failed")
     if best_candidate is not None:
         print("Post-mortem schema not fully valid after retries. Returning normalized candidate.")
         return _normalize_post_mortem_report(best_candidate)
 
     print(f"Post-mortem analysis failed after retries: {last_error}")
     return _default_post_mortem_report()
+
+
+def get_post_mortem_analysis(chat_history, startup_theme, outcome, pitch_deck_text="", transcript_text=None):
+    """Blocking wrapper: runs get_post_mortem_analysis_async on the async bridge."""
+    return async_bridge.run(
+        get_post_mortem_analysis_async(chat_history, startup_theme, outcome, pitch_deck_text, transcript_text)
+    )
+
+
+async def get_post_mortem_analysis_async(
+    chat_history, startup_theme, outcome, pitch_deck_text="", transcript_text=None
+):
+    """
+    Phase 1.1 + Phase 2:
+    - strict JSON validation / repair / normalization
+    - includes pitch deck RAG excerpts in evaluation context
+    - transcript_text (e.g. per-level summaries) replaces the raw transcript when provided
+    - valid reports are served from / stored in the exact-match response cache
+    """
+    cache_key = _response_cache_key(
+        "post_mortem", 0, startup_theme, pitch_deck_text, chat_history, outcome, primary_model("post_mortem")
+    )
+    cached_report = _cached_response(cache_key)
+    if cached_report is not None:
+        return cached_report
+    if not get_circuit_breaker().is_closed():
+        print("POST-MORTEM DEGRADED: model backend circuit is open. Returning default report.")
+        return _default_post_mortem_report()
+
+    generation_prompt = _build_post_mortem_generation_prompt(
+        chat_history, startup_theme, outcome, pitch_deck_text, transcript_text
+    )
+    generation_block = _get_system_block("post_mortem", 0, startup_theme)
+
+    best_candidate = None
+    last_error = None
+
+    with deadline_scope(task_deadline("post_mortem")):
+        for attempt in range(POST_MORTEM_ATTEMPTS):
+            raw_output = ""
+
+            try:
+                raw_output = await _generate_structured_async(
+                    "post_mortem", generation_prompt, generation_block, POST_MORTEM_RESPONSE_SCHEMA
+                )
+                candidate = _safe_load_json(raw_output)
+                best_candidate = candidate
+
+                if _is_valid_post_mortem_report(candidate):
+                    report = _normalize_post_mortem_report(candidate)
+                    record_repair_path("post_mortem", "strict")
+                    _store_response(cache_key, report)
+                    return report
+
+                raise ValueError("Schema validation failed for initial post-mortem output.")
+
+            except Exception as first_error:
+                last_error = first_error
+                if is_backend_unavailable(first_error):
+                    break
+
+                local_report = _repair_post_mortem_locally(raw_output)
+                if local_report is not None:
+                    record_repair_path("post_mortem", "local")
+                    _store_response(cache_key, local_report)
+                    return local_report
+
+                try:
+                    repair_prompt = _build_post_mortem_repair_prompt(raw_output, str(first_error))
+                    repaired_output = await call_with_retry_async(
+                        "post_mortem",
+                        lambda: routed_call_async(
+                            "post_mortem", lambda model: get_llm_provider().agenerate(model, repair_prompt)
+                        ),
+                    )
+                    repaired_report = _repair_post_mortem_locally(repaired_output)
+                    if repaired_report is not None:
+                        record_repair_path("post_mortem", "model")
+                        _store_response(cache_key, repaired_report)
+                        return repaired_report
+                    repaired_candidate = _safe_load_json(repaired_output)
+                    best_candidate = repaired_candidate
+
+                    raise ValueError("Schema validation failed for repaired post-mortem output.")
+
+                except Exception as repair_error:
+                    last_error = repair_error
+                    if is_backend_unavailable(repair_error):
+                        break
+                    continue
+
+    return _finalize_post_mortem(best_candidate, last_error)
+
+
+def _build_level_assessment_prompt(current_level, level_history, startup_theme, pitch_deck_text):
+    transcript_text = _render_history_text(level_history)
+    deck_query = _build_post_mortem_deck_query(f"Level {current_level}", transcript_text)
+    deck_context = _retrieve_pitch_deck_context(pitch_deck_text, deck_query, top_k=2)
+    return assemble_prompt(
+        "level_assessment",
+        [
+            prompt_section(
+                "instructions",
+                _get_system_block("level_assessment", current_level, startup_theme)["text"],
+                PRIORITY_INSTRUCTIONS,
+                inline=False,
+            ),
+            prompt_section(
+                "deck",
+                deck_context or "none provided",
+                PRIORITY_DECK,
+                header="PITCH DECK EVIDENCE (RAG EXCERPTS):",
+            ),
+            prompt_section(
+                "transcript", transcript_text, PRIORITY_HISTORY, header="LEVEL TRANSCRIPT:", keep="tail"
+            ),
+        ],
+    )
+
+
+async def get_level_assessment_async(current_level, level_history, startup_theme, pitch_deck_text=""):
+    """
+    Partial post-mortem for one level, produced in the background while the game goes on.
+    Returns a normalized report dict, or None when the backend gave nothing usable.
+    """
+    cache_key = _response_cache_key(
+        "level_assessment",
+        current_level,
+        startup_theme,
+        pitch_deck_text,
+        level_history,
+        "",
+        primary_model("post_mortem"),
+    )
+    cached_report = _cached_response(cache_key)
+    if cached_report is not None:
+        return cached_report
+
+    assessment_prompt = _build_level_assessment_prompt(
+        current_level, level_history, startup_theme, pitch_deck_text
+    )
+    assessment_block = _get_system_block("level_assessment", current_level, startup_theme)
+    try:
+        raw_output = await _generate_structured_async(
+            "post_mortem", assessment_prompt, assessment_block, POST_MORTEM_RESPONSE_SCHEMA
+        )
+    except Exception as e:
+        print(f"LEVEL ASSESSMENT ERROR (Level {current_level}): {e}")
+        return None
+
+    report, repair_path = _parse_post_mortem_output(raw_output)
+    record_repair_path("level_assessment", repair_path)
+    if report is None:
+        print(f"LEVEL ASSESSMENT ERROR (Level {current_level}): unusable output after local repair.")
+        return None
+    _store_response(cache_key, report)
+    return report
+
+
+def merge_post_mortem_partials(partials, outcome):
+    """
+    Builds the final report from per-level partials locally (no model call).
+    partials: {level: {"report": <normalized report>, "message_count": int}}
+    - scores: mean weighted by each level's message count
+    - lists: round-robin from the most recent level back, de-duplicated
+    """
+    ordered = [partials[level] for level in sorted(partials)]
+    weights = [max(1, partial["message_count"]) for partial in ordered]
+    total_weight = sum(weights)
+
+    merged = {
+        "scores": {
+            key: round(
+                sum(partial["report"]["scores"][key] * weight for partial, weight in zip(ordered, weights))
+                / total_weight
+            )
+            for key in POST_MORTEM_SCORE_KEYS
+        }
+    }
+
+    for list_key in POST_MORTEM_LIST_KEYS:
+        items = []
+        seen = set()
+        for index in range(POST_MORTEM_LIST_LENGTH):
+            for partial in reversed(ordered):
+                level_items = partial["report"][list_key]
+                if index >= len(level_items):
+                    continue
+                marker = level_items[index].strip().lower()
+                if marker not in seen:
+                    seen.add(marker)
+                    items.append(level_items[index])
+        merged[list_key] = items[:POST_MORTEM_LIST_LENGTH]
+
+    outcome_line = (
+        "Secured the investment" if outcome == "victory" else "Ran out of confidence"
+    ) + f" after {len(ordered)} assessed level{'s' if len(ordered) != 1 else ''}."
+    merged["summary"] = f"{outcome_line} {ordered[-1]['report']['summary']}"
+    return _normalize_post_mortem_report(merged)
@@ -0,0 +1,120 @@
+import ast
+import json
+import re
+import threading
+
+SMART_QUOTES = {
+    "“": '"',
+    "”": '"',
+    "‘": "'",
+    "’": "'",
+}
+TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+PYTHON_LITERALS = (("true", "True"), ("false", "False"), ("null", "None"))
+
+_REPAIR_COUNTS = {}
+_REPAIR_LOCK = threading.Lock()
+
+
+def _strip_code_fences(text):
+    cleaned_text = (text or "").strip()
+    if cleaned_text.startswith("```"):
+        first_newline = cleaned_text.find("\n")
+        cleaned_text = cleaned_text[first_newline:].strip() if first_newline != -1 else ""
+    if cleaned_text.endswith("```"):
+        cleaned_text = cleaned_text[:-3].strip()
+    return cleaned_text
+
+
+def _balanced_object_spans(text):
+    """
+    Yields every top-level {...} span, string-aware.
+    A span cut off by the end of the text is closed with the missing quote/brackets.
+    """
+    start = text.find("{")
+    while start != -1:
+        stack = []
+        in_string = False
+        escaped = False
+        end = None
+        for index in range(start, len(text)):
+            char = text[index]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+                continue
+            if char == '"':
+                in_string = True
+            elif char in "{[":
+                stack.append("}" if char == "{" else "]")
+            elif char in "}]":
+                if stack and stack[-1] == char:
+                    stack.pop()
+                if not stack:
+                    end = index + 1
+                    break
+
+        if end is None:
+            closing = ('"' if in_string else "") + "".join(reversed(stack))
+            yield text[start:].rstrip().rstrip(",") + closing
+            return
+        yield text[start:end]
+        start = text.find("{", end)
+
+
+def _loads_tolerant(span):
+    fixed = span
+    for smart_quote, plain_quote in SMART_QUOTES.items():
+        fixed = fixed.replace(smart_quote, plain_quote)
+    fixed = TRAILING_COMMA_RE.sub(r"\1", fixed)
+    try:
+        return json.loads(fixed)
+    except ValueError:
+        pass
+
+    # Single-quoted keys/strings and Python literals are common "almost JSON".
+    python_text = fixed
+    for json_literal, python_literal in PYTHON_LITERALS:
+        python_text = re.sub(rf"\b{json_literal}\b", python_literal, python_text)
+    try:
+        return ast.literal_eval(python_text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+
+def extract_json_object(raw_text):
+    """
+    Best-effort parse of model output that should have been a JSON object.
+    - tolerates markdown fences and prose before/after the object
+    - fixes trailing commas, smart quotes, single quotes and truncated endings
+    Returns the first dict found, or None.
+    """
+    cleaned_text = _strip_code_fences(raw_text)
+    try:
+        value = json.loads(cleaned_text)
+        if isinstance(value, dict):
+            return value
+    except ValueError:
+        pass
+
+    for span in _balanced_object_spans(cleaned_text):
+        value = _loads_tolerant(span)
+        if isinstance(value, dict):
+            return value
+    return None
+
+
+def record_repair_path(task, path):
+    """Counts how an output was made usable: strict, local, model, or failed."""
+    with _REPAIR_LOCK:
+        task_counts = _REPAIR_COUNTS.setdefault(task, {})
+        task_counts[path] = task_counts.get(path, 0) + 1
+
+
+def get_repair_stats():
+    with _REPAIR_LOCK:
+        return {task: dict(counts) for task, counts in _REPAIR_COUNTS.items()}
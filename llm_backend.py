@@ -0,0 +1,309 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+from google.genai import types
+
+from llm_client import client_lease
+
+LLM_BACKEND_ENV = "FG_LLM_BACKEND"
+
+FAKE_DEFAULT_LATENCY_MS = 300
+FAKE_DEFAULT_TOKENS_PER_SEC = 40.0
+FAKE_DEFAULT_STALL_MS = 5000
+FAKE_INVESTOR_LINES = (
+    "Walk me through who pays for this and why they would switch today.",
+    "That sounds nice, but what proof do you have that customers want it?",
+    "Give me one number that shows this is working.",
+    "What happens when a bigger player copies this next quarter?",
+    "How does this scale past your first hundred customers?",
+)
+
+
+class LLMProvider:
+    """
+    Model backend interface used by game_logic.
+    All methods return plain text; config is a types.GenerateContentConfig (or None).
+    """
+
+    name = "base"
+
+    def generate(self, model, contents, config=None):
+        raise NotImplementedError
+
+    def transcribe(self, model, audio_bytes, mime_type, prompt_text):
+        raise NotImplementedError
+
+    async def agenerate(self, model, contents, config=None):
+        raise NotImplementedError
+
+    async def astream(self, model, contents, config=None):
+        raise NotImplementedError
+        yield ""
+
+    async def atranscribe(self, model, audio_bytes, mime_type, prompt_text):
+        raise NotImplementedError
+
+    def create_cached_content(self, model, display_name, system_instruction, ttl_seconds):
+        """Returns (cache_name, expires_at_epoch). Backends without context caching raise."""
+        raise NotImplementedError(f"{self.name} backend has no context caching.")
+
+
+def _transcription_contents(audio_bytes, mime_type, prompt_text):
+    safe_mime = (mime_type or "audio/wav").strip() or "audio/wav"
+    return [
+        types.Part.from_text(text=prompt_text),
+        types.Part.from_bytes(data=audio_bytes, mime_type=safe_mime),
+    ]
+
+
+class GeminiProvider(LLMProvider):
+    """google.genai backend on the shared client pool."""
+
+    name = "gemini"
+
+    def generate(self, model, contents, config=None):
+        with client_lease() as client:
+            response = client.models.generate_content(model=model, contents=contents, config=config)
+        return response.text or ""
+
+    def transcribe(self, model, audio_bytes, mime_type, prompt_text):
+        return self.generate(model, _transcription_contents(audio_bytes, mime_type, prompt_text))
+
+    async def agenerate(self, model, contents, config=None):
+        with client_lease() as client:
+            response = await client.aio.models.generate_content(
+                model=model,
+                contents=contents,
+                config=config,
+            )
+        return response.text or ""
+
+    async def astream(self, model, contents, config=None):
+        with client_lease() as client:
+            response_stream = await client.aio.models.generate_content_stream(
+                model=model,
+                contents=contents,
+                config=config,
+            )
+            async for chunk in response_stream:
+                text = chunk.text or ""
+                if text:
+                    yield text
+
+    async def atranscribe(self, model, audio_bytes, mime_type, prompt_text):
+        return await self.agenerate(model, _transcription_contents(audio_bytes, mime_type, prompt_text))
+
+    def create_cached_content(self, model, display_name, system_instruction, ttl_seconds):
+        with client_lease() as client:
+            cached = client.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    display_name=display_name,
+                    system_instruction=system_instruction,
+                    ttl=f"{ttl_seconds}s",
+                ),
+            )
+        if not cached.name:
+            raise ValueError("Cached content was created without a resource name.")
+        expires_at = time.time() + ttl_seconds
+        if cached.expire_time is not None:
+            expires_at = cached.expire_time.timestamp()
+        return cached.name, expires_at
+
+
+def _env_float(name, default_value):
+    try:
+        return float(os.getenv(name, "") or default_value)
+    except ValueError:
+        return default_value
+
+
+def _contents_text(contents):
+    if isinstance(contents, str):
+        return contents
+    parts = []
+    for item in contents or []:
+        text = getattr(item, "text", None)
+        parts.append(text if isinstance(text, str) else str(item)[:200])
+    return "\n".join(parts)
+
+
+class FakeProvider(LLMProvider):
+    """
+    Deterministic in-process backend for offline load tests and benchmarks.
+    Env knobs:
+    - FG_FAKE_LATENCY_MS: delay before the first token (default 300)
+    - FG_FAKE_TOKENS_PER_SEC: streaming rate (default 40)
+    - FG_FAKE_ERROR_RATE / FG_FAKE_QUOTA_RATE: probability of a generic error / 429 per call
+    - FG_FAKE_INTERRUPT_RATE: probability a stream dies midway
+    - FG_FAKE_STALL_RATE / FG_FAKE_STALL_MS: probability and length of an extra first-token stall
+    - FG_FAKE_SEED: seed for the per-call outcome sequence
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency_ms=None,
+        tokens_per_sec=None,
+        error_rate=None,
+        quota_rate=None,
+        interrupt_rate=None,
+        seed=None,
+        stall_rate=None,
+        stall_ms=None,
+    ):
+        self.latency_ms = latency_ms if latency_ms is not None else _env_float(
+            "FG_FAKE_LATENCY_MS", FAKE_DEFAULT_LATENCY_MS
+        )
+        self.tokens_per_sec = tokens_per_sec if tokens_per_sec is not None else _env_float(
+            "FG_FAKE_TOKENS_PER_SEC", FAKE_DEFAULT_TOKENS_PER_SEC
+        )
+        self.error_rate = error_rate if error_rate is not None else _env_float("FG_FAKE_ERROR_RATE", 0.0)
+        self.quota_rate = quota_rate if quota_rate is not None else _env_float("FG_FAKE_QUOTA_RATE", 0.0)
+        self.interrupt_rate = interrupt_rate if interrupt_rate is not None else _env_float(
+            "FG_FAKE_INTERRUPT_RATE", 0.0
+        )
+        self.stall_rate = stall_rate if stall_rate is not None else _env_float("FG_FAKE_STALL_RATE", 0.0)
+        self.stall_ms = stall_ms if stall_ms is not None else _env_float("FG_FAKE_STALL_MS", FAKE_DEFAULT_STALL_MS)
+        self.seed = seed if seed is not None else os.getenv("FG_FAKE_SEED", "0")
+        self._call_counts = {}
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "errors": 0, "quota_errors": 0, "interrupts": 0, "stalls": 0}
+
+    def _rng(self, model, contents, config):
+        system_text = getattr(config, "system_instruction", None) or ""
+        digest = hashlib.sha256(
+            f"{model}|{system_text}|{_contents_text(contents)}".encode("utf-8")
+        ).hexdigest()
+        with self._lock:
+            attempt = self._call_counts.get(digest, 0)
+            self._call_counts[digest] = attempt + 1
+            self.stats["calls"] += 1
+        return random.Random(f"{self.seed}|{digest}|{attempt}"), system_text, _contents_text(contents)
+
+    def _maybe_fail(self, rng):
+        roll = rng.random()
+        if roll < self.quota_rate:
+            self.stats["quota_errors"] += 1
+            raise RuntimeError("429 RESOURCE_EXHAUSTED: Quota exceeded (fake backend).")
+        if roll < self.quota_rate + self.error_rate:
+            self.stats["errors"] += 1
+            raise RuntimeError("503 UNAVAILABLE: injected fake backend error.")
+
+    def _respond(self, rng, system_text, contents_text):
+        """Picks the payload shape from the task's instruction block (or the inline prompt)."""
+        lowered = f"{system_text}\n{contents_text[:400]}".lower()
+        if "game judge" in lowered:
+            passed = rng.random() < 0.3
+            damage = 0 if passed else rng.choice((0, -10, -20))
+            return json.dumps(
+                {"damage": damage, "level_passed": passed, "feedback": "Deterministic fake verdict."}
+            )
+        if "pitch coach" in lowered or "json repair utility" in lowered:
+            return json.dumps(
+                {
+                    "scores": {
+                        "confidence": rng.randint(40, 95),
+                        "technical_clarity": rng.randint(40, 95),
+                        "business_viability": rng.randint(40, 95),
+                        "resilience_under_pressure": rng.randint(40, 95),
+                    },
+                    "strengths": ["Clear problem framing.", "Stayed calm under pressure.", "Used one metric."],
+                    "weaknesses": ["Vague pricing.", "Thin competitive moat.", "Few proof points."],
+                    "next_actions": [
+                        "Lead with one revenue number.",
+                        "Prepare a copycat defense.",
+                        "Rehearse a 30-second technical overview.",
+                    ],
+                    "summary": "Deterministic fake post-mortem for load testing.",
+                }
+            )
+        if "running summary" in lowered:
+            return "Founder pitched the product; investor pushed on proof, pricing and scale."
+        if "transcribe this founder pitch" in lowered:
+            return "This is a deterministic fake transcript of the founder pitch."
+        first, second = rng.sample(FAKE_INVESTOR_LINES, 2)
+        return f"{first} {second}"
+
+    def _token_delay(self):
+        return 1.0 / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+
+    def _plan(self, model, contents, config):
+        rng, system_text, contents_text = self._rng(model, contents, config)
+        self._maybe_fail(rng)
+        text = self._respond(rng, system_text, contents_text)
+        interrupt_at = None
+        if rng.random() < self.interrupt_rate:
+            interrupt_at = max(1, len(text.split()) // 2)
+        first_token_delay = self.latency_ms / 1000.0
+        if rng.random() < self.stall_rate:
+            self.stats["stalls"] += 1
+            first_token_delay += self.stall_ms / 1000.0
+        return text, interrupt_at, first_token_delay
+
+    def _interrupted(self):
+        self.stats["interrupts"] += 1
+        return ConnectionError("Fake stream interrupted.")
+
+    def generate(self, model, contents, config=None):
+        text, _, first_token_delay = self._plan(model, contents, config)
+        time.sleep(first_token_delay + len(text.split()) * self._token_delay())
+        return text
+
+    def transcribe(self, model, audio_bytes, mime_type, prompt_text):
+        return self.generate(model, prompt_text)
+
+    async def agenerate(self, model, contents, config=None):
+        text, _, first_token_delay = self._plan(model, contents, config)
+        await asyncio.sleep(first_token_delay + len(text.split()) * self._token_delay())
+        return text
+
+    async def astream(self, model, contents, config=None):
+        text, interrupt_at, first_token_delay = self._plan(model, contents, config)
+        await asyncio.sleep(first_token_delay)
+        for index, word in enumerate(text.split(" ")):
+            if interrupt_at is not None and index >= interrupt_at:
+                raise self._interrupted()
+            yield word if index == 0 else f" {word}"
+            await asyncio.sleep(self._token_delay())
+
+    async def atranscribe(self, model, audio_bytes, mime_type, prompt_text):
+        return await self.agenerate(model, prompt_text)
+
+
+_PROVIDERS = {
+    "gemini": GeminiProvider,
+    "fake": FakeProvider,
+}
+_PROVIDER = None
+_PROVIDER_LOCK = threading.Lock()
+
+
+def get_backend_name():
+    name = (os.getenv(LLM_BACKEND_ENV, "") or "gemini").strip().lower()
+    return name if name in _PROVIDERS else "gemini"
+
+
+def get_llm_provider():
+    """Process-wide provider chosen by FG_LLM_BACKEND (gemini | fake)."""
+    global _PROVIDER
+    if _PROVIDER is None:
+        with _PROVIDER_LOCK:
+            if _PROVIDER is None:
+                _PROVIDER = _PROVIDERS[get_backend_name()]()
+    return _PROVIDER
+
+
+def set_llm_provider(provider):
+    """Swaps the process-wide provider (load tests, benchmarks). Returns the previous one."""
+    global _PROVIDER
+    with _PROVIDER_LOCK:
+        previous = _PROVIDER
+        _PROVIDER = provider
+    return previous
@@ -0,0 +1,172 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import httpx
+from google import genai
+from google.genai import types
+
+from rate_limit import is_quota_error, is_transient_error
+
+GEMINI_POOL_SIZE = 4
+GEMINI_POOL_KEEPALIVE_SECONDS = 90
+GEMINI_CLIENT_MAX_AGE_SECONDS = 30 * 60
+GEMINI_CLIENT_MAX_FAILURES = 3
+
+
+def _env_int(name, default_value):
+    try:
+        return max(1, int(os.getenv(name, "") or default_value))
+    except ValueError:
+        return default_value
+
+
+def _build_http_options(pool_size, base_url=None):
+    """Keep-alive limits are per client; each pooled client holds its own warm connections."""
+    limits = httpx.Limits(
+        max_connections=pool_size * 2,
+        max_keepalive_connections=pool_size * 2,
+        keepalive_expiry=GEMINI_POOL_KEEPALIVE_SECONDS,
+    )
+    options = {
+        "client_args": {"limits": limits},
+        "async_client_args": {"limits": limits},
+    }
+    if base_url:
+        options["base_url"] = base_url
+    return types.HttpOptions(**options)
+
+
+class _PooledClient:
+    def __init__(self, client):
+        self.client = client
+        self.created_at = time.monotonic()
+        self.consecutive_failures = 0
+        self.in_flight = 0
+        self.retired = False
+
+    def close_if_idle(self):
+        if self.retired and self.in_flight == 0:
+            try:
+                self.client.close()
+            except Exception:
+                pass
+
+
+class GeminiClientPool:
+    """
+    Process-wide pool of long-lived genai clients shared by every Streamlit session.
+    - clients are created lazily on first lease
+    - leases go to the least busy slot
+    - slots are recycled after repeated transient, non-quota failures or when they exceed max age
+    """
+
+    def __init__(
+        self,
+        size=GEMINI_POOL_SIZE,
+        max_age_seconds=GEMINI_CLIENT_MAX_AGE_SECONDS,
+        max_failures=GEMINI_CLIENT_MAX_FAILURES,
+        base_url=None,
+        client_factory=None,
+    ):
+        self.size = max(1, int(size))
+        self.max_age_seconds = max_age_seconds
+        self.max_failures = max_failures
+        self.base_url = base_url
+        self._client_factory = client_factory or self._default_client_factory
+        self._slots = [None] * self.size
+        self._lock = threading.Lock()
+        self.stats = {"created": 0, "recycled": 0, "leases": 0, "failures": 0}
+
+    def _default_client_factory(self):
+        return genai.Client(http_options=_build_http_options(self.size, self.base_url))
+
+    def _slot_is_healthy(self, slot):
+        if slot is None or slot.retired:
+            return False
+        if slot.consecutive_failures >= self.max_failures:
+            return False
+        return (time.monotonic() - slot.created_at) < self.max_age_seconds
+
+    def _acquire(self):
+        with self._lock:
+            for index, slot in enumerate(self._slots):
+                if slot is not None and not self._slot_is_healthy(slot):
+                    slot.retired = True
+                    slot.close_if_idle()
+                    self._slots[index] = None
+                    self.stats["recycled"] += 1
+
+            # Idle live clients first, then empty slots, then the least busy client.
+            index = min(
+                range(self.size),
+                key=lambda i: 0.5 if self._slots[i] is None else self._slots[i].in_flight,
+            )
+            if self._slots[index] is None:
+                self._slots[index] = _PooledClient(self._client_factory())
+                self.stats["created"] += 1
+
+            slot = self._slots[index]
+            slot.in_flight += 1
+            self.stats["leases"] += 1
+            return slot
+
+    def _release(self, slot, error=None, outcome_known=True):
+        """
+        Only transient, non-quota errors (5xx, dropped connections) count against the client;
+        quota and bad-request errors are answers from a working connection.
+        """
+        with self._lock:
+            slot.in_flight -= 1
+            if not outcome_known:
+                pass
+            elif error is None:
+                slot.consecutive_failures = 0
+            elif is_transient_error(error) and not is_quota_error(error):
+                slot.consecutive_failures += 1
+                self.stats["failures"] += 1
+            slot.close_if_idle()
+
+    @contextmanager
+    def lease(self):
+        """Yields a shared client; transient errors raised inside the block count against its health."""
+        slot = self._acquire()
+        try:
+            yield slot.client
+        except (GeneratorExit, asyncio.CancelledError):
+            # Abandoned or cancelled by the caller (e.g. a losing hedged stream): says nothing about the client.
+            self._release(slot, outcome_known=False)
+            raise
+        except BaseException as exc:
+            self._release(slot, exc)
+            raise
+        else:
+            self._release(slot)
+
+    def close(self):
+        with self._lock:
+            for index, slot in enumerate(self._slots):
+                if slot is not None:
+                    slot.retired = True
+                    slot.close_if_idle()
+                self._slots[index] = None
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_client_pool():
+    """Lazily builds the process-wide pool. FG_GEMINI_POOL_SIZE overrides the slot count."""
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = GeminiClientPool(size=_env_int("FG_GEMINI_POOL_SIZE", GEMINI_POOL_SIZE))
+    return _POOL
+
+
+def client_lease():
+    return get_client_pool().lease()
@@ -0,0 +1,235 @@
+import copy
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from rate_limit import is_transient_error
+
+PRIMARY_MODEL = "gemini-flash-latest"
+FALLBACK_MODEL = "gemini-flash-lite-latest"
+DEFAULT_MODEL_ROUTES = {
+    "stream": {"models": [PRIMARY_MODEL, FALLBACK_MODEL], "latency_slo_seconds": 3.0, "error_rate_slo": 0.2},
+    "recovery": {"models": [PRIMARY_MODEL, FALLBACK_MODEL], "latency_slo_seconds": 8.0, "error_rate_slo": 0.3},
+    "judgment": {"models": [PRIMARY_MODEL, FALLBACK_MODEL], "latency_slo_seconds": 6.0, "error_rate_slo": 0.2},
+    "transcription": {"models": [PRIMARY_MODEL, FALLBACK_MODEL], "latency_slo_seconds": 15.0, "error_rate_slo": 0.3},
+    "post_mortem": {"models": [PRIMARY_MODEL, FALLBACK_MODEL], "latency_slo_seconds": 30.0, "error_rate_slo": 0.3},
+    "summary": {"models": [PRIMARY_MODEL, FALLBACK_MODEL], "latency_slo_seconds": 15.0, "error_rate_slo": 0.3},
+}
+ROUTE_WINDOW = 50
+ROUTE_MIN_SAMPLES = 10
+ROUTE_LATENCY_PERCENTILE = 90
+ROUTE_CONSECUTIVE_FAILURES = 4
+ROUTE_COOLDOWN_SECONDS = 60.0
+ROUTE_LOG_SIZE = 500
+
+
+def _load_route_overrides():
+    """
+    FG_MODEL_ROUTES holds JSON (inline, or a path to a .json file) shaped like DEFAULT_MODEL_ROUTES.
+    Tasks and fields left out keep their defaults.
+    """
+    raw_value = os.getenv("FG_MODEL_ROUTES", "").strip()
+    if not raw_value:
+        return {}
+    try:
+        if raw_value.endswith(".json") and os.path.exists(raw_value):
+            with open(raw_value, "r", encoding="utf-8") as handle:
+                overrides = json.load(handle)
+        else:
+            overrides = json.loads(raw_value)
+        if not isinstance(overrides, dict):
+            raise ValueError("expected an object keyed by task")
+        return overrides
+    except Exception as e:
+        print(f"MODEL ROUTES CONFIG ERROR: {e}. Using default routes.")
+        return {}
+
+
+def load_model_routes():
+    routes = copy.deepcopy(DEFAULT_MODEL_ROUTES)
+    for task, override in _load_route_overrides().items():
+        if not isinstance(override, dict):
+            print(f"MODEL ROUTES CONFIG ERROR: route for {task!r} is not an object.")
+            continue
+        route = routes.setdefault(task, copy.deepcopy(DEFAULT_MODEL_ROUTES["judgment"]))
+        models = override.get("models")
+        if models is not None:
+            if isinstance(models, list) and models and all(isinstance(model, str) and model for model in models):
+                route["models"] = list(models)
+            else:
+                print(f"MODEL ROUTES CONFIG ERROR: models for {task!r} must be a non-empty list of names.")
+        for field in ("latency_slo_seconds", "error_rate_slo"):
+            if field in override:
+                try:
+                    route[field] = max(0.0, float(override[field]))
+                except (TypeError, ValueError):
+                    print(f"MODEL ROUTES CONFIG ERROR: {field} for {task!r} must be a number.")
+    return routes
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class ModelRouter:
+    """
+    Picks a model per task from an ordered route and watches live SLOs.
+    - each (task, model) keeps a window of latencies and outcomes
+    - a model breaching its latency (p90) or error-rate SLO, or failing ROUTE_CONSECUTIVE_FAILURES
+      times in a row, is demoted for a cooldown and the next model in the route takes over
+    - once the cooldown passes the preferred model is tried again with a fresh window
+    """
+
+    def __init__(self, routes=None):
+        self.routes = routes or load_model_routes()
+        self._windows = {}
+        self._consecutive_failures = {}
+        self._demoted_until = {}
+        self._last_choice = {}
+        self._lock = threading.Lock()
+        self.route_log = deque(maxlen=ROUTE_LOG_SIZE)
+        self.stats = {"calls": {}, "failovers": 0, "restores": 0}
+
+    def _route(self, task):
+        return self.routes.get(task) or self.routes["judgment"]
+
+    def primary_model(self, task):
+        return self._route(task)["models"][0]
+
+    def choose(self, task):
+        """The first non-demoted model of the task's route (the soonest-restored one if all are demoted)."""
+        now = time.monotonic()
+        models = self._route(task)["models"]
+        with self._lock:
+            healthy = [model for model in models if self._demoted_until.get((task, model), 0.0) <= now]
+            if healthy:
+                model = healthy[0]
+            else:
+                model = min(models, key=lambda name: self._demoted_until.get((task, name), 0.0))
+
+            previous = self._last_choice.get(task)
+            self._last_choice[task] = model
+            task_calls = self.stats["calls"].setdefault(task, {})
+            task_calls[model] = task_calls.get(model, 0) + 1
+            self.route_log.append({"at": time.time(), "task": task, "model": model})
+            if previous is not None and previous != model:
+                if models.index(model) < models.index(previous):
+                    self.stats["restores"] += 1
+                print(f"MODEL ROUTE: {task} now uses {model} (was {previous}).")
+        return model
+
+    def _demote(self, task, model, reason):
+        self._demoted_until[(task, model)] = time.monotonic() + ROUTE_COOLDOWN_SECONDS
+        self._windows.pop((task, model), None)
+        self._consecutive_failures[(task, model)] = 0
+        self.stats["failovers"] += 1
+        print(f"MODEL ROUTE FAILOVER: {task} on {model} breached its SLO ({reason}).")
+
+    def record(self, task, model, latency_seconds, error=None):
+        """
+        Feeds one call's outcome. Only errors from the model call itself (5xx, dropped connections,
+        its own 429s) count against the model. Limiter queueing, deadlines and the open breaker
+        are process-wide and say nothing about the model, so they are ignored like bad requests.
+        """
+        if error is not None and not is_transient_error(error):
+            return
+        route = self._route(task)
+        key = (task, model)
+        with self._lock:
+            window = self._windows.setdefault(key, deque(maxlen=ROUTE_WINDOW))
+            window.append((latency_seconds, error is None))
+            if error is None:
+                self._consecutive_failures[key] = 0
+            else:
+                self._consecutive_failures[key] = self._consecutive_failures.get(key, 0) + 1
+                if self._consecutive_failures[key] >= ROUTE_CONSECUTIVE_FAILURES:
+                    self._demote(task, model, f"{ROUTE_CONSECUTIVE_FAILURES} failures in a row")
+                    return
+
+            if len(window) < ROUTE_MIN_SAMPLES:
+                return
+            error_rate = sum(1 for _, ok in window if not ok) / len(window)
+            latencies = [latency for latency, ok in window if ok and latency is not None]
+            if route["error_rate_slo"] and error_rate > route["error_rate_slo"]:
+                self._demote(task, model, f"error rate {error_rate:.0%}")
+            elif latencies and route["latency_slo_seconds"]:
+                latency = _percentile(latencies, ROUTE_LATENCY_PERCENTILE)
+                if latency > route["latency_slo_seconds"]:
+                    self._demote(task, model, f"p{ROUTE_LATENCY_PERCENTILE} latency {latency:.2f}s")
+
+    def get_stats(self):
+        now = time.monotonic()
+        with self._lock:
+            demoted = {
+                f"{task}:{model}": round(until - now, 1)
+                for (task, model), until in self._demoted_until.items()
+                if until > now
+            }
+            return {
+                "calls": copy.deepcopy(self.stats["calls"]),
+                "failovers": self.stats["failovers"],
+                "restores": self.stats["restores"],
+                "current": dict(self._last_choice),
+                "demoted_remaining_s": demoted,
+            }
+
+
+_ROUTER = None
+_ROUTER_LOCK = threading.Lock()
+
+
+def get_model_router():
+    global _ROUTER
+    if _ROUTER is None:
+        with _ROUTER_LOCK:
+            if _ROUTER is None:
+                _ROUTER = ModelRouter()
+    return _ROUTER
+
+
+def primary_model(task):
+    return get_model_router().primary_model(task)
+
+
+def choose_model(task):
+    return get_model_router().choose(task)
+
+
+def record_model_call(task, model, latency_seconds, error=None):
+    get_model_router().record(task, model, latency_seconds, error)
+
+
+def routed_call(task, make_call):
+    """Runs make_call(model) on the task's current model and records latency / outcome."""
+    router = get_model_router()
+    model = router.choose(task)
+    started = time.perf_counter()
+    try:
+        result = make_call(model)
+    except Exception as e:
+        router.record(task, model, None, e)
+        raise
+    router.record(task, model, time.perf_counter() - started)
+    return result
+
+
+async def routed_call_async(task, make_coro):
+    """Async twin of routed_call; make_coro(model) returns the awaitable."""
+    router = get_model_router()
+    model = router.choose(task)
+    started = time.perf_counter()
+    try:
+        result = await make_coro(model)
+    except Exception as e:
+        router.record(task, model, None, e)
+        raise
+    router.record(task, model, time.perf_counter() - started)
+    return result
+
+
+def get_model_route_stats():
+    return get_model_router().get_stats()
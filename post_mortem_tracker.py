@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+
+import async_bridge
+from game_logic import get_level_assessment_async, merge_post_mortem_partials
+
+POST_MORTEM_SPECULATE_HP = 30
+POST_MORTEM_SPECULATE_LEVEL = 5
+POST_MORTEM_FINAL_WAIT_SECONDS = 20
+
+
+def _env_int(name, default_value):
+    try:
+        return max(0, int(os.getenv(name, "") or default_value))
+    except ValueError:
+        return default_value
+
+
+def _has_founder_turns(level_history):
+    return any(msg.get("role") == "user" for msg in level_history)
+
+
+class PostMortemTracker:
+    """
+    Per-session incremental post-mortem.
+    - each passed level gets a partial assessment on the async bridge
+    - the in-progress level is assessed speculatively while HP is low or during level 5
+    - the final report merges the partials locally instead of re-reading the whole run
+    """
+
+    def __init__(self, speculate_hp=None, final_wait_seconds=None):
+        if speculate_hp is None:
+            speculate_hp = _env_int("FG_POST_MORTEM_SPECULATE_HP", POST_MORTEM_SPECULATE_HP)
+        if final_wait_seconds is None:
+            final_wait_seconds = _env_int("FG_POST_MORTEM_FINAL_WAIT_SECONDS", POST_MORTEM_FINAL_WAIT_SECONDS)
+        self.speculate_hp = speculate_hp
+        self.final_wait_seconds = final_wait_seconds
+        self.partials = {}
+        self.stats = {"submitted": 0, "reused": 0, "completed": 0, "failed": 0}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def _submit(self, level, level_history, startup_theme, pitch_deck_text):
+        """Starts (or reuses) the assessment of one level at its current message count."""
+        history = list(level_history)
+        with self._lock:
+            entry = self._pending.get(level)
+            if entry is not None and entry["message_count"] == len(history):
+                self.stats["reused"] += 1
+                return entry["future"]
+            future = async_bridge.submit(
+                get_level_assessment_async(level, history, startup_theme, pitch_deck_text)
+            )
+            entry = {"message_count": len(history), "future": future}
+            self._pending[level] = entry
+            self.stats["submitted"] += 1
+
+        future.add_done_callback(lambda done_future: self._store(level, entry, done_future))
+        return future
+
+    def _store(self, level, entry, done_future):
+        try:
+            report = done_future.result()
+        except Exception as e:
+            print(f"POST-MORTEM PARTIAL ERROR (Level {level}): {e}")
+            report = None
+        with self._lock:
+            if report is None:
+                self.stats["failed"] += 1
+                return
+            self.stats["completed"] += 1
+            current = self.partials.get(level)
+            if current is None or current["message_count"] <= entry["message_count"]:
+                self.partials[level] = {"report": report, "message_count": entry["message_count"]}
+
+    def close_level(self, level, level_history, startup_theme, pitch_deck_text=""):
+        """Called at the awaiting_perk_selection transition (and on the final level-5 pass)."""
+        if _has_founder_turns(level_history):
+            self._submit(level, level_history, startup_theme, pitch_deck_text)
+
+    def maybe_speculate(self, level, level_history, current_hp, startup_theme, pitch_deck_text=""):
+        """Pre-assesses the in-progress level when the run is likely to end soon."""
+        near_end = current_hp <= self.speculate_hp or level >= POST_MORTEM_SPECULATE_LEVEL
+        if near_end and _has_founder_turns(level_history):
+            self._submit(level, level_history, startup_theme, pitch_deck_text)
+
+    def final_report(self, outcome, current_level, current_history, startup_theme, pitch_deck_text=""):
+        """
+        Merged final report, waiting at most final_wait_seconds for outstanding partials.
+        Returns None unless every level up to current_level has a partial (e.g. after a
+        restore), so callers fall back to the full analysis.
+        """
+        with self._lock:
+            known_levels = set(self.partials) | set(self._pending)
+        if any(level not in known_levels for level in range(1, current_level)):
+            return None
+        if _has_founder_turns(current_history):
+            self._submit(current_level, current_history, startup_theme, pitch_deck_text)
+
+        wait_until = time.monotonic() + self.final_wait_seconds
+        with self._lock:
+            futures = [entry["future"] for entry in self._pending.values()]
+        for future in futures:
+            try:
+                future.result(timeout=max(0.0, wait_until - time.monotonic()))
+            except Exception:
+                continue
+
+        with self._lock:
+            partials = dict(self.partials)
+        if any(level not in partials for level in range(1, current_level + 1)):
+            return None
+        return merge_post_mortem_partials(partials, outcome)
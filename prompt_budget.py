@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import deque
+
+PROMPT_TOKEN_BUDGETS = {
+    "stream": 3000,
+    "judgment": 3000,
+    "post_mortem": 9000,
+    "level_assessment": 5000,
+    "summary": 2500,
+}
+DEFAULT_PROMPT_TOKEN_BUDGET = 4000
+MIN_SECTION_TOKENS = 40
+PROMPT_SIZE_LOG_LENGTH = 500
+
+PRIORITY_INSTRUCTIONS = 0
+PRIORITY_INPUT = 1
+PRIORITY_DECK = 2
+PRIORITY_HISTORY = 3
+
+_SIZE_LOG = deque(maxlen=PROMPT_SIZE_LOG_LENGTH)
+_SIZE_LOG_LOCK = threading.Lock()
+# Lifetime assembled tokens per task; the size log above only covers the most recent prompts.
+_TOKEN_TOTALS = {}
+
+
+def estimate_tokens(text):
+    """Cheap local estimate (~4 chars per token); good enough for budgeting, no tokenizer call."""
+    return (len(text or "") + 3) // 4
+
+
+def truncate_to_tokens(text, max_tokens, keep="head"):
+    """Cuts text to roughly max_tokens on a word boundary, keeping the head or the tail."""
+    text = text or ""
+    max_chars = max(0, int(max_tokens)) * 4
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= 0:
+        return ""
+    if keep == "tail":
+        cut = text[-max_chars:]
+        space = cut.find(" ")
+        return cut[space + 1 :] if 0 <= space < 40 else cut
+    cut = text[:max_chars]
+    space = cut.rfind(" ")
+    return cut[:space] if space > max_chars - 40 else cut
+
+
+def prompt_section(name, text, priority, header="", keep="head", inline=True):
+    """
+    One prompt section.
+    inline=False sections (e.g. the system block sent via config) count against the budget
+    but are not rendered into the contents.
+    """
+    return {
+        "name": name,
+        "text": (text or "").strip(),
+        "priority": priority,
+        "header": header,
+        "keep": keep,
+        "inline": inline,
+    }
+
+
+def assemble_prompt(task, sections, budget=None):
+    """
+    Packs sections by priority into the task budget and renders them in their given order.
+    Lower-priority sections are truncated (or dropped below MIN_SECTION_TOKENS) when space runs out.
+    Every call is recorded in the prompt size log.
+    """
+    if budget is None:
+        budget = PROMPT_TOKEN_BUDGETS.get(task, DEFAULT_PROMPT_TOKEN_BUDGET)
+
+    remaining = budget
+    packed = {}
+    for index in sorted(range(len(sections)), key=lambda i: sections[i]["priority"]):
+        section = sections[index]
+        header_tokens = estimate_tokens(section["header"]) if section["text"] else 0
+        text_tokens = estimate_tokens(section["text"])
+        if text_tokens + header_tokens <= remaining or section["priority"] == PRIORITY_INSTRUCTIONS:
+            packed[index] = section["text"]
+        elif remaining - header_tokens >= MIN_SECTION_TOKENS:
+            packed[index] = truncate_to_tokens(section["text"], remaining - header_tokens, section["keep"])
+        else:
+            packed[index] = ""
+        if packed[index]:
+            remaining -= estimate_tokens(packed[index]) + header_tokens
+
+    rendered = []
+    section_sizes = {}
+    for index, section in enumerate(sections):
+        text = packed[index]
+        section_sizes[section["name"]] = {
+            "tokens": estimate_tokens(text),
+            "original_tokens": estimate_tokens(section["text"]),
+            "truncated": text != section["text"],
+        }
+        if section["inline"] and text:
+            rendered.append(f"{section['header']}\n{text}" if section["header"] else text)
+
+    _record_prompt_size(task, budget, section_sizes)
+    return "\n\n".join(rendered)
+
+
+def _record_prompt_size(task, budget, section_sizes):
+    total_tokens = sum(size["tokens"] for size in section_sizes.values())
+    truncated = [name for name, size in section_sizes.items() if size["truncated"]]
+    entry = {
+        "task": task,
+        "at": time.time(),
+        "budget": budget,
+        "total_tokens": total_tokens,
+        "sections": section_sizes,
+        "truncated": truncated,
+    }
+    with _SIZE_LOG_LOCK:
+        _SIZE_LOG.append(entry)
+        _TOKEN_TOTALS[task] = _TOKEN_TOTALS.get(task, 0) + total_tokens
+    if truncated:
+        print(f"PROMPT BUDGET: {task} trimmed {', '.join(truncated)} to fit {budget} tokens.")
+
+
+def get_prompt_size_log(task=None, limit=50):
+    with _SIZE_LOG_LOCK:
+        entries = list(_SIZE_LOG)
+    if task:
+        entries = [entry for entry in entries if entry["task"] == task]
+    return entries[-limit:]
+
+
+def get_prompt_token_total(task):
+    """Estimated tokens of every prompt assembled for task since startup."""
+    with _SIZE_LOG_LOCK:
+        return _TOKEN_TOTALS.get(task, 0)
+
+
+def summarize_prompt_sizes():
+    """Per-task count, mean/max assembled tokens and truncation rate over the size log."""
+    summary = {}
+    for entry in get_prompt_size_log(limit=PROMPT_SIZE_LOG_LENGTH):
+        stats = summary.setdefault(
+            entry["task"], {"calls": 0, "total_tokens": 0, "max_tokens": 0, "truncated_calls": 0}
+        )
+        stats["calls"] += 1
+        stats["total_tokens"] += entry["total_tokens"]
+        stats["max_tokens"] = max(stats["max_tokens"], entry["total_tokens"])
+        stats["truncated_calls"] += 1 if entry["truncated"] else 0
+    for stats in summary.values():
+        stats["mean_tokens"] = round(stats.pop("total_tokens") / max(stats["calls"], 1))
+    return summary
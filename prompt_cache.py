@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from google.genai import types
+
+import async_bridge
+from llm_backend import get_llm_provider
+
+PROMPT_CACHE_VERSION = "v1"
+CONTEXT_CACHE_TTL_SECONDS = 60 * 60
+CONTEXT_CACHE_REFRESH_MARGIN_SECONDS = 5 * 60
+CONTEXT_CACHE_MIN_TOKENS = 1024
+CONTEXT_CACHE_RETRY_SECONDS = 10 * 60
+
+_BLOCKS = {}
+_BLOCKS_LOCK = threading.Lock()
+_STATS = {
+    "compiled": 0,
+    "registered": 0,
+    "refreshed": 0,
+    "register_failures": 0,
+    "cached_calls": 0,
+    "inline_calls": 0,
+}
+
+
+def _context_cache_enabled():
+    return os.getenv("FG_CONTEXT_CACHE", "").strip() == "1"
+
+
+def _estimate_tokens(text):
+    return len(text or "") // 4
+
+
+def get_system_block(task, current_level, startup_theme, build_text):
+    """
+    Returns the precompiled static instruction block for one (task, level, theme).
+    build_text() runs once per process; the key hashes the version and the rendered text
+    so any prompt edit produces a new key instead of reusing a stale cache entry.
+    """
+    lookup = (PROMPT_CACHE_VERSION, task, current_level, startup_theme)
+    block = _BLOCKS.get(lookup)
+    if block is not None:
+        return block
+
+    with _BLOCKS_LOCK:
+        block = _BLOCKS.get(lookup)
+        if block is None:
+            text = build_text().strip()
+            digest = hashlib.sha256(
+                f"{PROMPT_CACHE_VERSION}|{task}|{current_level}|{startup_theme}|{text}".encode("utf-8")
+            ).hexdigest()[:16]
+            block = {
+                "key": f"fg-{task}-{PROMPT_CACHE_VERSION}-{digest}",
+                "text": text,
+                "cached_by_model": {},
+                "refreshing": set(),
+                "registering": {},
+            }
+            _BLOCKS[lookup] = block
+            _STATS["compiled"] += 1
+    return block
+
+
+def _register_block(block, model):
+    """Creates (or re-creates) the provider-side cached content for one block and model."""
+    try:
+        cached_name, expires_at = get_llm_provider().create_cached_content(
+            model,
+            block["key"],
+            block["text"],
+            CONTEXT_CACHE_TTL_SECONDS,
+        )
+        entry = {"name": cached_name, "expires_at": expires_at}
+        refreshed = model in block["cached_by_model"]
+        _STATS["refreshed" if refreshed else "registered"] += 1
+    except Exception as e:
+        print(f"CONTEXT CACHE REGISTER ERROR ({block['key']}): {e}")
+        entry = {"name": None, "expires_at": time.time() + CONTEXT_CACHE_RETRY_SECONDS}
+        _STATS["register_failures"] += 1
+
+    with _BLOCKS_LOCK:
+        block["cached_by_model"][model] = entry
+        block["refreshing"].discard(model)
+    return entry
+
+
+async def _refresh_block_async(block, model):
+    await asyncio.to_thread(_register_block, block, model)
+
+
+def _registration(block, model):
+    """
+    (future, owner) for the registration of one block and model; only the owner runs it,
+    so concurrent misses share a single create call.
+    """
+    with _BLOCKS_LOCK:
+        entry = block["cached_by_model"].get(model)
+        if entry is not None and time.time() < entry["expires_at"]:
+            future = Future()
+            future.set_result(entry)
+            return future, False
+        future = block["registering"].get(model)
+        if future is not None:
+            return future, False
+        future = Future()
+        block["registering"][model] = future
+    return future, True
+
+
+def _run_registration(block, model, future):
+    entry = _register_block(block, model)
+    with _BLOCKS_LOCK:
+        block["registering"].pop(model, None)
+    future.set_result(entry)
+    return entry
+
+
+def _live_entry(block, model):
+    """
+    The entry to use for this call, or None when the block has to be registered first.
+    Entries close to expiry are refreshed on the async bridge while the old name keeps serving.
+    """
+    entry = block["cached_by_model"].get(model)
+    now = time.time()
+    if entry is None or now >= entry["expires_at"]:
+        return None
+    if entry["expires_at"] - now <= CONTEXT_CACHE_REFRESH_MARGIN_SECONDS:
+        with _BLOCKS_LOCK:
+            should_refresh = model not in block["refreshing"]
+            block["refreshing"].add(model)
+        if should_refresh:
+            async_bridge.submit(_refresh_block_async(block, model))
+    return entry
+
+
+def _uses_context_cache(block):
+    return _context_cache_enabled() and _estimate_tokens(block["text"]) >= CONTEXT_CACHE_MIN_TOKENS
+
+
+def _cached_content_name(block, model):
+    """Returns a live cached-content name, or None when the block is sent inline."""
+    if not _uses_context_cache(block):
+        return None
+    entry = _live_entry(block, model)
+    if entry is None:
+        future, owner = _registration(block, model)
+        entry = _run_registration(block, model, future) if owner else future.result()
+    return entry["name"]
+
+
+async def _cached_content_name_async(block, model):
+    """Async twin of _cached_content_name; registration runs in a worker thread, off the event loop."""
+    if not _uses_context_cache(block):
+        return None
+    entry = _live_entry(block, model)
+    if entry is None:
+        future, owner = _registration(block, model)
+        if owner:
+            entry = await asyncio.to_thread(_run_registration, block, model, future)
+        else:
+            entry = await asyncio.wrap_future(future)
+    return entry["name"]
+
+
+def _config_with_block(block, cached_name, config_fields):
+    if cached_name:
+        _STATS["cached_calls"] += 1
+        return types.GenerateContentConfig(cached_content=cached_name, **config_fields)
+
+    _STATS["inline_calls"] += 1
+    return types.GenerateContentConfig(system_instruction=block["text"], **config_fields)
+
+
+def build_generate_config(block, model, **config_fields):
+    """
+    Per-call config carrying the static block.
+    Uses provider context caching when enabled and large enough, otherwise system_instruction,
+    so the per-turn contents only carry the dynamic suffix.
+    """
+    return _config_with_block(block, _cached_content_name(block, model), config_fields)
+
+
+async def build_generate_config_async(block, model, **config_fields):
+    """Async twin of build_generate_config, for calls made on the async bridge."""
+    return _config_with_block(block, await _cached_content_name_async(block, model), config_fields)
+
+
+def get_prompt_cache_stats():
+    return dict(_STATS, blocks=len(_BLOCKS))
@@ -0,0 +1,389 @@
+import asyncio
+import contextvars
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from circuit_breaker import CircuitOpenError, get_circuit_breaker
+
+LLM_RATE_PER_SECOND = 50.0
+LLM_BURST = 50
+LLM_MIN_RATE_PER_SECOND = 0.5
+LLM_RATE_RECOVERY_FRACTION = 0.05
+
+RETRY_MAX_ATTEMPTS = 4
+RETRY_BASE_DELAY_SECONDS = 0.5
+RETRY_MAX_DELAY_SECONDS = 8.0
+RETRY_HINT_JITTER = 0.2
+QUOTA_COOLDOWN_SECONDS = 2.0
+
+TURN_DEADLINE_SECONDS = 30.0
+TASK_DEADLINE_SECONDS = {
+    "stream": 20.0,
+    "judgment": 20.0,
+    "transcription": 30.0,
+    "post_mortem": 60.0,
+    "summary": 30.0,
+}
+DEFAULT_TASK_DEADLINE_SECONDS = 30.0
+
+_CURRENT_DEADLINE = contextvars.ContextVar("fg_llm_deadline", default=None)
+
+
+def _env_float(name, default_value):
+    try:
+        return max(0.0, float(os.getenv(name, "") or default_value))
+    except ValueError:
+        return default_value
+
+
+class DeadlineExceeded(RuntimeError):
+    """Raised when a wait or retry would run past the current deadline."""
+
+
+def _error_code(error):
+    code = getattr(error, "code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_quota_error(error):
+    if _error_code(error) == 429 or getattr(error, "status", None) == "RESOURCE_EXHAUSTED":
+        return True
+    error_str = str(error)
+    return "429" in error_str or "Quota" in error_str or "RESOURCE_EXHAUSTED" in error_str
+
+
+def is_transient_error(error):
+    """Quota, 5xx and connection drops are worth retrying; bad requests and parse errors are not."""
+    if isinstance(error, (DeadlineExceeded, CircuitOpenError)):
+        return False
+    if is_quota_error(error) or isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    code = _error_code(error)
+    if code is not None:
+        return code >= 500
+    error_str = str(error)
+    return bool(re.match(r"\s*5\d\d\b", error_str)) or "UNAVAILABLE" in error_str
+
+
+def is_backend_unavailable(error):
+    """True when asking again now is pointless (retries spent, deadline passed or breaker open)."""
+    return is_transient_error(error) or isinstance(error, (DeadlineExceeded, CircuitOpenError))
+
+
+def _record_backend_outcome(error=None):
+    """Feeds the circuit breaker; only transient failures count against backend health."""
+    breaker = get_circuit_breaker()
+    if error is None:
+        breaker.record_success()
+    elif is_transient_error(error):
+        breaker.record_failure(error)
+
+
+def _parse_duration(value):
+    match = re.match(r"^\s*([0-9]*\.?[0-9]+)\s*s?\s*$", str(value or ""))
+    return float(match.group(1)) if match else None
+
+
+def retry_hint_seconds(error):
+    """
+    Server-suggested wait, if any:
+    - Retry-After response header
+    - google.rpc.RetryInfo retryDelay in the error details
+    - "retry in 12.5s" style text in the message
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        hint = _parse_duration(headers.get("retry-after") or headers.get("Retry-After"))
+        if hint is not None:
+            return hint
+
+    details = getattr(error, "details", None)
+    if isinstance(details, dict):
+        error_body = details.get("error", details)
+        for item in error_body.get("details", []) if isinstance(error_body, dict) else []:
+            if isinstance(item, dict) and "retryDelay" in item:
+                hint = _parse_duration(item["retryDelay"])
+                if hint is not None:
+                    return hint
+
+    match = re.search(r"retry in ([0-9]*\.?[0-9]+)\s*s", str(error), re.IGNORECASE)
+    return float(match.group(1)) if match else None
+
+
+class Deadline:
+    """Absolute cut-off shared by every call (and retry) made on behalf of one turn."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+
+def new_turn_deadline():
+    """Deadline for everything one player turn may spend on model calls, queueing and retries."""
+    return Deadline(_env_float("FG_TURN_DEADLINE_SECONDS", TURN_DEADLINE_SECONDS))
+
+
+@contextmanager
+def deadline_scope(deadline):
+    """Makes deadline the budget for every rate-limited call inside the block (sync code)."""
+    token = _CURRENT_DEADLINE.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _CURRENT_DEADLINE.reset(token)
+
+
+async def run_with_deadline(deadline, coro):
+    """Async counterpart of deadline_scope; the contextvar stays local to this task."""
+    _CURRENT_DEADLINE.set(deadline)
+    return await coro
+
+
+async def iterate_with_deadline(deadline, async_iterable):
+    _CURRENT_DEADLINE.set(deadline)
+    async for item in async_iterable:
+        yield item
+
+
+def task_deadline(task):
+    """The tighter of the enclosing turn deadline and the task's own cap."""
+    task_deadline = Deadline(TASK_DEADLINE_SECONDS.get(task, DEFAULT_TASK_DEADLINE_SECONDS))
+    current = _CURRENT_DEADLINE.get()
+    if current is not None and current.expires_at < task_deadline.expires_at:
+        return current
+    return task_deadline
+
+
+class AdaptiveRateLimiter:
+    """
+    Process-wide token bucket (GCRA form) shared by every session.
+    - callers reserve a send slot and wait for it, so bursts queue instead of failing
+    - a 429 pauses the whole bucket (honoring retry hints) and halves the rate
+    - successes recover the rate additively toward the configured ceiling
+    """
+
+    def __init__(self, rate_per_second=None, burst=None):
+        if rate_per_second is None:
+            rate_per_second = _env_float("FG_LLM_RATE_PER_SEC", LLM_RATE_PER_SECOND)
+        if burst is None:
+            burst = int(_env_float("FG_LLM_BURST", LLM_BURST))
+        self.max_rate = max(rate_per_second, LLM_MIN_RATE_PER_SECOND)
+        self.rate = self.max_rate
+        self.burst = max(1, burst)
+        self._tat = 0.0
+        self._paused_until = 0.0
+        self._waiting = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "queued": 0,
+            "queue_wait_s": 0.0,
+            "max_queue_depth": 0,
+            "throttled": 0,
+            "retries": 0,
+            "deadline_exceeded": 0,
+        }
+
+    def _reserve(self, deadline):
+        with self._lock:
+            now = time.monotonic()
+            interval = 1.0 / self.rate
+            tolerance = interval * (self.burst - 1)
+            tat = max(self._tat, now)
+            send_at = max(now, tat - tolerance, self._paused_until)
+            wait_seconds = send_at - now
+            if deadline is not None and wait_seconds > deadline.remaining():
+                self.stats["deadline_exceeded"] += 1
+                raise DeadlineExceeded(f"Rate limiter wait {wait_seconds:.1f}s exceeds the deadline.")
+            self._tat = max(tat, send_at) + interval
+            self.stats["requests"] += 1
+            if wait_seconds > 0:
+                self.stats["queued"] += 1
+                self.stats["queue_wait_s"] += wait_seconds
+                self._waiting += 1
+                self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self._waiting)
+        return wait_seconds
+
+    def _leave_queue(self):
+        with self._lock:
+            self._waiting -= 1
+
+    def acquire(self, deadline=None):
+        """Blocks until a send slot is free. Returns the seconds spent queued."""
+        wait_seconds = self._reserve(deadline)
+        if wait_seconds > 0:
+            try:
+                time.sleep(wait_seconds)
+            finally:
+                self._leave_queue()
+        return wait_seconds
+
+    async def acquire_async(self, deadline=None):
+        wait_seconds = self._reserve(deadline)
+        if wait_seconds > 0:
+            try:
+                await asyncio.sleep(wait_seconds)
+            finally:
+                self._leave_queue()
+        return wait_seconds
+
+    def record_success(self):
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * LLM_RATE_RECOVERY_FRACTION)
+
+    def record_throttle(self, retry_hint=None):
+        """A 429 anywhere slows everyone down, so sessions do not retry in lockstep."""
+        cooldown = retry_hint if retry_hint is not None else QUOTA_COOLDOWN_SECONDS
+        with self._lock:
+            now = time.monotonic()
+            self.stats["throttled"] += 1
+            self.rate = max(LLM_MIN_RATE_PER_SECOND, self.rate / 2.0)
+            self._paused_until = max(self._paused_until, now + cooldown)
+            interval = 1.0 / self.rate
+            self._tat = max(self._tat, self._paused_until + interval * (self.burst - 1))
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats, current_rate=round(self.rate, 3), queue_depth=self._waiting)
+        stats["queue_wait_s"] = round(stats["queue_wait_s"], 3)
+        return stats
+
+
+class RetryPolicy:
+    """Jittered exponential backoff ("full jitter"), stretched to any server retry hint."""
+
+    def __init__(
+        self,
+        max_attempts=RETRY_MAX_ATTEMPTS,
+        base_delay=RETRY_BASE_DELAY_SECONDS,
+        max_delay=RETRY_MAX_DELAY_SECONDS,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt, retry_hint=None):
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_hint is not None:
+            delay = max(delay, retry_hint * random.uniform(1.0, 1.0 + RETRY_HINT_JITTER))
+        return delay
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+_LIMITER = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_rate_limiter():
+    global _LIMITER
+    if _LIMITER is None:
+        with _LIMITER_LOCK:
+            if _LIMITER is None:
+                _LIMITER = AdaptiveRateLimiter()
+    return _LIMITER
+
+
+def get_rate_limit_stats():
+    return get_rate_limiter().get_stats()
+
+
+def _next_delay(task, attempt, error, policy, deadline):
+    """Returns the backoff before the next attempt, or re-raises when retrying is not allowed."""
+    limiter = get_rate_limiter()
+    retry_hint = retry_hint_seconds(error)
+    if is_quota_error(error):
+        limiter.record_throttle(retry_hint)
+    if not is_transient_error(error) or attempt + 1 >= policy.max_attempts:
+        raise error
+
+    delay = policy.backoff(attempt, retry_hint)
+    if delay >= deadline.remaining():
+        limiter.stats["deadline_exceeded"] += 1
+        raise error
+    limiter.stats["retries"] += 1
+    print(
+        f"LLM RETRY ({task}): {str(error)[:120]} -- retrying in {delay:.2f}s "
+        f"(attempt {attempt + 1}/{policy.max_attempts})"
+    )
+    return delay
+
+
+def call_with_retry(task, call, policy=None):
+    """
+    Runs call() through the circuit breaker and the shared rate limiter, retrying transient errors.
+    Total time (queueing + backoff) is capped by the turn deadline or the task's own cap.
+    Raises CircuitOpenError instantly while the breaker is open; otherwise the last error
+    is re-raised when attempts or time run out.
+    """
+    policy = policy or DEFAULT_RETRY_POLICY
+    deadline = task_deadline(task)
+    limiter = get_rate_limiter()
+    breaker = get_circuit_breaker()
+    for attempt in range(policy.max_attempts):
+        breaker.check()
+        limiter.acquire(deadline)
+        try:
+            result = call()
+        except Exception as e:
+            _record_backend_outcome(e)
+            time.sleep(_next_delay(task, attempt, e, policy, deadline))
+            continue
+        limiter.record_success()
+        _record_backend_outcome()
+        return result
+    raise DeadlineExceeded(f"{task}: retries exhausted.")
+
+
+async def call_with_retry_async(task, make_coro, policy=None):
+    """Async twin of call_with_retry; make_coro() must return a fresh coroutine per attempt."""
+    policy = policy or DEFAULT_RETRY_POLICY
+    deadline = task_deadline(task)
+    limiter = get_rate_limiter()
+    breaker = get_circuit_breaker()
+    for attempt in range(policy.max_attempts):
+        breaker.check()
+        await limiter.acquire_async(deadline)
+        try:
+            result = await make_coro()
+        except Exception as e:
+            _record_backend_outcome(e)
+            await asyncio.sleep(_next_delay(task, attempt, e, policy, deadline))
+            continue
+        limiter.record_success()
+        _record_backend_outcome()
+        return result
+    raise DeadlineExceeded(f"{task}: retries exhausted.")
+
+
+def throttle(task):
+    """Breaker check + rate limit for a call that handles its own failures (e.g. a token stream)."""
+    get_circuit_breaker().check()
+    get_rate_limiter().acquire(task_deadline(task))
+
+
+async def throttle_async(task):
+    get_circuit_breaker().check()
+    await get_rate_limiter().acquire_async(task_deadline(task))
+
+
+def record_outcome(error=None):
+    """Feeds a throttle-only call's result back into the adaptive rate and the circuit breaker."""
+    limiter = get_rate_limiter()
+    if error is None:
+        limiter.record_success()
+    elif is_quota_error(error):
+        limiter.record_throttle(retry_hint_seconds(error))
+    _record_backend_outcome(error)
@@ -0,0 +1,265 @@
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+RESPONSE_CACHE_SIZE = 512
+RESPONSE_CACHE_TTL_SECONDS = 24 * 60 * 60
+RESPONSE_CACHE_SWEEP_EVERY = 64
+TRANSCRIPT_CACHE_SIZE = 256
+TRANSCRIPT_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+def _env_int(name, default_value):
+    try:
+        return max(0, int(os.getenv(name, "") or default_value))
+    except ValueError:
+        return default_value
+
+
+def _response_cache_enabled():
+    return os.getenv("FG_RESPONSE_CACHE", "").strip() != "0"
+
+
+def _transcript_cache_enabled():
+    return os.getenv("FG_TRANSCRIPT_CACHE", "").strip() != "0"
+
+
+def text_digest(text):
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def _collapse_whitespace(text):
+    return re.sub(r"\s+", " ", str(text or "")).strip()
+
+
+def normalize_history(chat_history):
+    """Role-tagged, whitespace-collapsed lines; cosmetic differences must not change the key."""
+    return [
+        f"{str(msg.get('role', '')).upper()}: {_collapse_whitespace(msg.get('content', ''))}"
+        for msg in chat_history or []
+    ]
+
+
+def make_response_key(task, current_level, startup_theme, deck_hash, chat_history, user_input, prompt_version):
+    """Content address for one model question. prompt_version should change whenever the prompt text does."""
+    payload = json.dumps(
+        [
+            task,
+            current_level,
+            startup_theme,
+            deck_hash or "",
+            normalize_history(chat_history),
+            _collapse_whitespace(user_input),
+            prompt_version,
+        ],
+        ensure_ascii=False,
+    )
+    return f"{task}-{text_digest(payload)[:32]}"
+
+
+def make_transcript_key(audio_bytes, mime_type, prompt_version):
+    """Content address for one clip: audio digest + normalized MIME type + transcription prompt/model."""
+    audio_digest = hashlib.sha256(audio_bytes or b"").hexdigest()
+    normalized_mime = (mime_type or "audio/wav").split(";")[0].strip().lower()
+    payload = json.dumps([audio_digest, normalized_mime, prompt_version])
+    return f"transcript-{text_digest(payload)[:32]}"
+
+
+class ResponseCache:
+    """
+    Exact-match cache for model answers.
+    - bounded in-memory LRU tier
+    - optional on-disk tier (one JSON file per key) when a directory is configured
+    - entries older than the TTL are dropped on read and swept from disk periodically
+    """
+
+    def __init__(self, max_entries=None, ttl_seconds=None, disk_dir=None):
+        if max_entries is None:
+            max_entries = _env_int("FG_RESPONSE_CACHE_SIZE", RESPONSE_CACHE_SIZE)
+        if ttl_seconds is None:
+            ttl_seconds = _env_int("FG_RESPONSE_CACHE_TTL_SECONDS", RESPONSE_CACHE_TTL_SECONDS)
+        if disk_dir is None:
+            disk_dir = os.getenv("FG_RESPONSE_CACHE_DIR", "").strip() or None
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts_since_sweep = 0
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expired": 0,
+            "disk_errors": 0,
+        }
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def _is_expired(self, stored_at):
+        return bool(self.ttl_seconds) and time.time() - stored_at > self.ttl_seconds
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _read_disk(self, key):
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"RESPONSE CACHE DISK ERROR (read {key}): {e}")
+            self.stats["disk_errors"] += 1
+            return None
+
+        if self._is_expired(entry.get("stored_at", 0)):
+            self.stats["expired"] += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry
+
+    def _write_disk(self, key, entry):
+        path = self._disk_path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as handle:
+                json.dump(entry, handle, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"RESPONSE CACHE DISK ERROR (write {key}): {e}")
+            self.stats["disk_errors"] += 1
+
+    def sweep_disk(self):
+        """Removes expired files from the disk tier. Returns the number removed."""
+        if not self.disk_dir or not self.ttl_seconds:
+            return 0
+        removed = 0
+        cutoff = time.time() - self.ttl_seconds
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+        self.stats["expired"] += removed
+        return removed
+
+    def get(self, key):
+        """Returns a copy of the cached value, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry["stored_at"]):
+                del self._entries[key]
+                self.stats["expired"] += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return copy.deepcopy(entry["value"])
+
+        entry = self._read_disk(key) if self.disk_dir else None
+        with self._lock:
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._remember(key, entry)
+            self.stats["disk_hits"] += 1
+        return copy.deepcopy(entry["value"])
+
+    def put(self, key, value):
+        entry = {"stored_at": time.time(), "value": copy.deepcopy(value)}
+        with self._lock:
+            self._remember(key, entry)
+            self.stats["stores"] += 1
+            self._puts_since_sweep += 1
+            should_sweep = self._puts_since_sweep >= RESPONSE_CACHE_SWEEP_EVERY
+            if should_sweep:
+                self._puts_since_sweep = 0
+
+        if self.disk_dir:
+            self._write_disk(key, entry)
+            if should_sweep:
+                self.sweep_disk()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats, entries=len(self._entries))
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_response_cache():
+    """Process-wide cache shared by all sessions. Returns None when FG_RESPONSE_CACHE=0."""
+    global _CACHE
+    if not _response_cache_enabled():
+        return None
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = ResponseCache()
+    return _CACHE
+
+
+def get_response_cache_stats():
+    cache = get_response_cache()
+    return cache.get_stats() if cache is not None else {}
+
+
+_TRANSCRIPT_CACHE = None
+
+
+def get_transcript_cache():
+    """
+    Process-wide audio digest -> transcript cache, separate from model answers so clips
+    cannot evict replies. Returns None when FG_TRANSCRIPT_CACHE=0.
+    """
+    global _TRANSCRIPT_CACHE
+    if not _transcript_cache_enabled():
+        return None
+    if _TRANSCRIPT_CACHE is None:
+        with _CACHE_LOCK:
+            if _TRANSCRIPT_CACHE is None:
+                _TRANSCRIPT_CACHE = ResponseCache(
+                    max_entries=_env_int("FG_TRANSCRIPT_CACHE_SIZE", TRANSCRIPT_CACHE_SIZE),
+                    ttl_seconds=_env_int("FG_TRANSCRIPT_CACHE_TTL_SECONDS", TRANSCRIPT_CACHE_TTL_SECONDS),
+                    # "" (not None) so an unset dir disables the disk tier instead of sharing FG_RESPONSE_CACHE_DIR.
+                    disk_dir=os.getenv("FG_TRANSCRIPT_CACHE_DIR", "").strip(),
+                )
+    return _TRANSCRIPT_CACHE
+
+
+def get_transcript_cache_stats():
+    cache = get_transcript_cache()
+    return cache.get_stats() if cache is not None else {}
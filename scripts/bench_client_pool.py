@@ -0,0 +1,127 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from google import genai
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+os.chdir(ROOT_DIR)
+
+from llm_client import GeminiClientPool, _build_http_options  # noqa: E402
+
+STAND_IN_REPLY = {
+    "candidates": [
+        {
+            "content": {"role": "model", "parts": [{"text": "Stand-in investor reply."}]},
+            "finishReason": "STOP",
+        }
+    ]
+}
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Minimal generateContent stand-in that keeps HTTP/1.1 connections alive."""
+
+    protocol_version = "HTTP/1.1"
+    connections = set()
+    connections_lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        self.rfile.read(length)
+        with self.connections_lock:
+            self.connections.add(self.client_address)
+
+        body = json.dumps(STAND_IN_REPLY).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_stand_in():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round((pct / 100.0) * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _run(label, calls, concurrency, call_once):
+    _StandInHandler.connections = set()
+    samples = []
+
+    def _timed():
+        started = time.perf_counter()
+        call_once()
+        samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(_timed) for _ in range(calls)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    mean_ms = (sum(samples) / len(samples)) * 1000
+    print(
+        f"{label:<22} calls={calls} conc={concurrency} "
+        f"mean={mean_ms:.2f}ms p50={_percentile(samples, 50) * 1000:.2f}ms "
+        f"p95={_percentile(samples, 95) * 1000:.2f}ms "
+        f"connections={len(_StandInHandler.connections)} wall={elapsed:.2f}s"
+    )
+    return mean_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call client setup overhead: fresh client vs shared pool.")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+
+    server, base_url = _start_stand_in()
+    os.environ.setdefault("GEMINI_API_KEY", "bench-key")
+
+    def _fresh_client_call():
+        client = genai.Client(http_options=_build_http_options(1, base_url))
+        client.models.generate_content(model="bench-model", contents="ping")
+        client.close()
+
+    pool = GeminiClientPool(size=args.pool_size, base_url=base_url)
+
+    def _pooled_call():
+        with pool.lease() as client:
+            client.models.generate_content(model="bench-model", contents="ping")
+
+    try:
+        before_ms = _run("fresh genai.Client()", args.calls, args.concurrency, _fresh_client_call)
+        after_ms = _run("pooled client", args.calls, args.concurrency, _pooled_call)
+    finally:
+        pool.close()
+        server.shutdown()
+
+    print(f"Per-call setup overhead removed: {before_ms - after_ms:.2f}ms ({before_ms / max(after_ms, 1e-9):.1f}x faster)")
+    print(f"Pool stats: {pool.stats}")
+
+
+if __name__ == "__main__":
+    main()
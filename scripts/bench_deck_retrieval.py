@@ -0,0 +1,159 @@
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+os.chdir(ROOT_DIR)
+
+import game_logic  # noqa: E402
+from deck_index import tokenize_for_retrieval  # noqa: E402
+from deck_store import get_deck_store  # noqa: E402
+from personas import LEVELS, THEMES  # noqa: E402
+
+DECK_VOCABULARY = (
+    "revenue churn retention cohort margin gross burn runway pipeline enterprise pilot customers "
+    "pricing subscription annual recurring growth market share competitors moat patents compliance "
+    "security latency uptime infrastructure hiring engineers sales marketing acquisition payback "
+    "valuation dilution seed series round investors board roadmap launch regulatory partnerships "
+    "inventory logistics suppliers warehouse unit economics contribution forecast scenario downside"
+).split()
+FOUNDER_QUESTIONS = (
+    "Our churn dropped to 3% after the enterprise pilot and retention cohorts improved.",
+    "Gross margin is 72% and payback on acquisition spend is under nine months.",
+    "We have patents pending and our compliance posture covers SOC 2 and HIPAA.",
+    "Runway is 18 months at current burn; the seed round extends it to 30.",
+    "Logistics costs fell once we renegotiated with suppliers and consolidated warehouses.",
+    "Our moat is proprietary data from 40 partnerships that competitors cannot replicate.",
+)
+
+
+def _synthetic_deck(pages, words_per_page, seed):
+    rng = random.Random(seed)
+    deck_pages = []
+    for page_number in range(1, pages + 1):
+        paragraphs = []
+        for _ in range(4):
+            words = [rng.choice(DECK_VOCABULARY) for _ in range(words_per_page // 4)]
+            if rng.random() < 0.4:
+                words.insert(rng.randrange(len(words)), f"{rng.randint(1, 99)}%")
+            paragraphs.append(" ".join(words))
+        deck_pages.append(f"Slide {page_number}\n\n" + "\n\n".join(paragraphs))
+    return "\n\n".join(deck_pages)
+
+
+def _legacy_score_chunk(chunk_text, query_tokens):
+    """The per-query scorer this index replaced (re-tokenizes and rescans every chunk)."""
+    chunk_tokens = tokenize_for_retrieval(chunk_text)
+    if not chunk_tokens:
+        return 0.0
+    overlap = set(chunk_tokens).intersection(query_tokens)
+    if not overlap:
+        return 0.0
+    frequency_score = sum(chunk_text.lower().count(token) for token in overlap)
+    numeric_bonus = 0.5 if re.search(r"\d", chunk_text) else 0.0
+    density = len(overlap) / max(len(query_tokens), 1)
+    return len(overlap) + (frequency_score * 0.35) + (density * 2.0) + numeric_bonus
+
+
+def _legacy_retrieve(chunks, query_text, top_k):
+    query_tokens = set(tokenize_for_retrieval(query_text))
+    scored_chunks = sorted(
+        ((_legacy_score_chunk(chunk, query_tokens), chunk) for chunk in chunks), key=lambda item: item[0], reverse=True
+    )
+    return [chunk for score, chunk in scored_chunks if score > 0][:top_k]
+
+
+def _dict_bm25_retrieve(deck_index, query_tokens, top_k):
+    """BM25 scored through the Python postings dict (the path used when numpy is missing)."""
+    scores = deck_index.score(query_tokens)
+    best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+    return [deck_index.chunks[chunk_index] for chunk_index, _ in best]
+
+
+def _time_per_call(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare legacy per-query chunk scoring with the BM25 deck index (dict and NumPy paths)."
+    )
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 400, 1600])
+    parser.add_argument("--words-per-page", type=int, default=220)
+    parser.add_argument("--decks", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    # BM25 only; bench_semantic_retrieval.py covers the hybrid path.
+    os.environ["FG_DECK_RETRIEVAL"] = "lexical"
+    os.environ.setdefault("FG_DECK_STORE_DIR", "0")
+
+    theme = next(iter(THEMES))
+    queries = [(question, level) for question in FOUNDER_QUESTIONS for level in sorted(LEVELS)]
+    top_k = game_logic.RETRIEVAL_TOP_K
+    for pages in args.pages:
+        for deck_number in range(args.decks):
+            deck_text = _synthetic_deck(pages, args.words_per_page, seed=deck_number)
+            get_deck_store().clear()
+
+            started = time.perf_counter()
+            deck_index = game_logic._get_deck_index(deck_text)
+            build_ms = (time.perf_counter() - started) * 1000
+            chunks = deck_index.chunks
+            if chunks and not deck_index.term_ids:
+                print("numpy is not installed; the vectorized path is unavailable.")
+                return 1
+
+            legacy_ms = []
+            dict_ms = []
+            vector_ms = []
+            mismatches = 0
+            for question, level in queries:
+                level_data = LEVELS[level]
+                full_query = " ".join([question, level_data["win_condition"], level_data["style"], theme])
+                static_tokens = game_logic._static_query_tokens(level, theme)
+                query_tokens = static_tokens.union(tokenize_for_retrieval(question))
+                legacy_ms.append(_time_per_call(lambda: _legacy_retrieve(chunks, full_query, top_k), args.repeats))
+                dict_ms.append(
+                    _time_per_call(lambda: _dict_bm25_retrieve(deck_index, query_tokens, top_k), args.repeats)
+                )
+                vector_ms.append(
+                    _time_per_call(
+                        lambda: game_logic._retrieve_pitch_deck_context(
+                            deck_text, question, static_tokens=static_tokens
+                        ),
+                        args.repeats,
+                    )
+                )
+                if deck_index.top_chunks(query_tokens, top_k) != _dict_bm25_retrieve(deck_index, query_tokens, top_k):
+                    mismatches += 1
+
+            legacy_median = statistics.median(legacy_ms)
+            dict_median = statistics.median(dict_ms)
+            vector_median = statistics.median(vector_ms)
+            print(
+                f"{pages} pages (deck {deck_number + 1}): {len(deck_text.split()):,} words, {len(chunks)} chunks, "
+                f"{len(deck_index.postings)} terms; index built in {build_ms:.1f}ms"
+            )
+            print(
+                f"  per query (median of {len(queries)}): legacy {legacy_median:.3f}ms, "
+                f"BM25 dict {dict_median:.3f}ms, BM25 NumPy {vector_median:.3f}ms "
+                f"({legacy_median / max(vector_median, 1e-9):.1f}x vs legacy); "
+                f"top-{top_k} mismatches dict vs NumPy: {mismatches}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+os.chdir(ROOT_DIR)
+
+import deck_ingest  # noqa: E402
+
+SLIDE_VOCABULARY = (
+    "revenue churn retention cohort margin burn runway pipeline enterprise pilot customers pricing "
+    "subscription growth market competitors moat patents compliance security hiring engineers sales "
+    "acquisition payback valuation roadmap launch partnerships logistics suppliers forecast"
+).split()
+
+
+def _escape_pdf_text(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _synthetic_pdf(pages, words_per_page, seed):
+    """Minimal PDF: one Helvetica text block per page, Flate-compressed like exported decks."""
+    rng = random.Random(seed)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page_number in range(1, pages + 1):
+        words = [rng.choice(SLIDE_VOCABULARY) for _ in range(words_per_page)]
+        words.insert(rng.randrange(words_per_page), f"{rng.randint(1, 99)}%")
+        lines = [f"Slide {page_number}"] + [" ".join(words[start: start + 12]) for start in range(0, len(words), 12)]
+        content = "BT /F1 10 Tf 40 760 Td 12 TL " + " ".join(f"({_escape_pdf_text(line)}) '" for line in lines) + " ET"
+        stream = zlib.compress(content.encode("latin-1"))
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % (len(objects))
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{object_id} 0 R" for object_id in page_ids).encode("ascii")
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for object_id, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % object_id + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(output)
+
+
+def _legacy_extract(pdf_bytes):
+    """The extractor this pipeline replaced: every page serially, truncated afterwards."""
+    reader = deck_ingest._open_reader(pdf_bytes)
+    combined = "\n\n".join((page.extract_text() or "").strip() for page in reader.pages).strip()
+    return combined[: deck_ingest.DECK_MAX_CHARS]
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pages/sec of legacy, serial, pooled and page-cached deck extraction.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[20, 60, 400])
+    parser.add_argument("--words-per-page", type=int, default=120)
+    parser.add_argument("--workers", type=int, default=deck_ingest.extract_workers())
+    args = parser.parse_args()
+    os.environ["FG_DECK_EXTRACT_WORKERS"] = str(args.workers)
+
+    print(f"{os.cpu_count()} CPUs, {args.workers} pool workers, budget {deck_ingest.DECK_MAX_CHARS:,} chars")
+    if args.workers > 1:
+        _, warmup_seconds = _timed(
+            lambda: deck_ingest.extract_pitch_deck(
+                _synthetic_pdf(deck_ingest.DECK_PARALLEL_MIN_PAGES, 20, seed=0), workers=args.workers
+            )
+        )
+        print(f"pool warm-up (spawning workers): {warmup_seconds * 1000:.0f}ms")
+
+    for pages in args.pages:
+        pdf_bytes = _synthetic_pdf(pages, args.words_per_page, seed=pages)
+        legacy_text, legacy_seconds = _timed(lambda: _legacy_extract(pdf_bytes))
+        runs = {"legacy": (pages, legacy_seconds)}
+        (serial_text, _, serial_map), serial_seconds = _timed(
+            lambda: deck_ingest.extract_pitch_deck(pdf_bytes, workers=1)
+        )
+        runs["serial"] = (serial_map[-1][0], serial_seconds)
+        if args.workers > 1:
+            (pooled_text, _, pooled_map), pooled_seconds = _timed(
+                lambda: deck_ingest.extract_pitch_deck(pdf_bytes, workers=args.workers)
+            )
+            runs[f"pool x{args.workers}"] = (pooled_map[-1][0], pooled_seconds)
+            if pooled_text != serial_text:
+                print("  MISMATCH: pooled text differs from serial text")
+        with tempfile.TemporaryDirectory() as page_cache_dir:
+            deck_ingest.extract_pitch_deck(pdf_bytes, workers=1, page_cache_dir=page_cache_dir)
+            (cached_text, _, cached_map), cached_seconds = _timed(
+                lambda: deck_ingest.extract_pitch_deck(pdf_bytes, workers=1, page_cache_dir=page_cache_dir)
+            )
+        runs["page cache"] = (cached_map[-1][0], cached_seconds)
+        if cached_text != serial_text or legacy_text.split() != serial_text.split():
+            print("  MISMATCH: cached or legacy text differs from serial text")
+
+        print(f"{pages} pages, {len(serial_text):,} chars kept:")
+        for label, (pages_read, seconds) in runs.items():
+            print(
+                f"  {label:12s} {seconds * 1000:8.1f}ms  {pages_read:4d} pages read  "
+                f"{pages_read / seconds:7.1f} pages/s  ({legacy_seconds / seconds:.1f}x vs legacy)"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
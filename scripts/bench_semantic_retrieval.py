@@ -0,0 +1,130 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+os.chdir(ROOT_DIR)
+
+import game_logic  # noqa: E402
+from deck_index import DeckIndex, tokenize_for_retrieval  # noqa: E402
+from semantic_index import SemanticIndex, hybrid_top_chunks, np  # noqa: E402
+
+FILLER_VOCABULARY = (
+    "strategy vision alignment execution quarter initiative framework platform ecosystem stakeholder "
+    "narrative milestone objective workflow dashboard integration module feature release feedback "
+    "community brand design research prototype experiment operations office culture mission values"
+).split()
+# (planted slide sentence, founder question that paraphrases it without sharing its key terms)
+PLANTED_FACTS = (
+    ("ARR reached 4.1M this year, up from 1.2M.", "How much revenue are you generating?"),
+    ("Churned logos dropped to 2% monthly after the onboarding rework.", "What does churn look like?"),
+    ("CAC is 310 dollars with a five month payback.", "What does it cost to acquire a customer?"),
+    ("TAM is 40B across North America and Europe.", "How big is the addressable market?"),
+    ("We hold three granted patents and IP on the routing engine.", "Is your intellectual property protected?"),
+    ("NPS of 72 among enterprise pilots.", "Are customers satisfied with the product?"),
+    ("Gross margins improve to 68% as COGS fall with scale.", "What is your cost of goods?"),
+    ("Hiring plan: twelve engineers over the next year.", "How many engineers are you hiring?"),
+)
+
+
+def _planted_deck(pages, words_per_page, seed):
+    rng = random.Random(seed)
+    planted_pages = dict(zip(rng.sample(range(pages), len(PLANTED_FACTS)), PLANTED_FACTS))
+    deck_pages = []
+    for page_number in range(pages):
+        words = [rng.choice(FILLER_VOCABULARY) for _ in range(words_per_page)]
+        if page_number in planted_pages:
+            words.insert(rng.randrange(len(words) // 2), planted_pages[page_number][0])
+        deck_pages.append(f"Slide {page_number + 1}\n\n" + " ".join(words))
+    return "\n\n".join(deck_pages)
+
+
+def _median_ms(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def _paraphrase_recall(pages, words_per_page, decks, top_k, repeats):
+    hits = {"lexical": 0, "semantic": 0, "hybrid": 0}
+    latency = {"lexical": [], "semantic": [], "hybrid": []}
+    for seed in range(decks):
+        chunks = game_logic._build_deck_chunks(_planted_deck(pages, words_per_page, seed))
+        deck_index = DeckIndex(chunks)
+        semantic_index = SemanticIndex(chunks)
+        for sentence, question in PLANTED_FACTS:
+            query_tokens = set(tokenize_for_retrieval(question))
+            searches = {
+                "lexical": lambda: deck_index.top_chunks(query_tokens, top_k),
+                "semantic": lambda: hybrid_top_chunks(
+                    deck_index, semantic_index, query_tokens, question, top_k, "semantic"
+                ),
+                "hybrid": lambda: hybrid_top_chunks(deck_index, semantic_index, query_tokens, question, top_k),
+            }
+            for mode, search in searches.items():
+                if any(sentence in chunk for chunk in search()):
+                    hits[mode] += 1
+                latency[mode].append(_median_ms(search, repeats))
+    total = decks * len(PLANTED_FACTS)
+    print(f"Paraphrase recall@{top_k} ({decks} decks x {pages} pages, {total} planted facts):")
+    for mode in hits:
+        print(f"  {mode:8s} {hits[mode] / total:6.1%}  median {statistics.median(latency[mode]):.3f}ms/query")
+
+
+def _ann_recall(pages, words_per_page, top_k, repeats):
+    chunks = game_logic._build_deck_chunks(_planted_deck(pages, words_per_page, seed=99))
+    started = time.perf_counter()
+    semantic_index = SemanticIndex(chunks)
+    build_ms = (time.perf_counter() - started) * 1000
+    if semantic_index.centroids is None:
+        print(f"{len(chunks)} chunks is below the IVF threshold; raise --ann-pages.")
+        return
+
+    queries = [question for _, question in PLANTED_FACTS] + [
+        " ".join(random.Random(index).sample(FILLER_VOCABULARY, 6)) for index in range(40)
+    ]
+    overlaps = []
+    exact_ms = []
+    ivf_ms = []
+    for query in queries:
+        exact = set(np.argsort(-semantic_index.similarities(query, exact=True))[:top_k].tolist())
+        approximate = set(np.argsort(-semantic_index.similarities(query))[:top_k].tolist())
+        overlaps.append(len(exact & approximate) / top_k)
+        exact_ms.append(_median_ms(lambda: semantic_index.similarities(query, exact=True), repeats))
+        ivf_ms.append(_median_ms(lambda: semantic_index.similarities(query), repeats))
+    print(
+        f"IVF vs exact on {len(chunks)} chunks ({len(semantic_index.centroids)} lists, built in {build_ms:.0f}ms): "
+        f"recall@{top_k} {statistics.mean(overlaps):.1%}, exact {statistics.median(exact_ms):.3f}ms, "
+        f"IVF {statistics.median(ivf_ms):.3f}ms per query"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paraphrase recall and latency of lexical vs semantic deck retrieval.")
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--words-per-page", type=int, default=150)
+    parser.add_argument("--decks", type=int, default=5)
+    parser.add_argument("--ann-pages", type=int, default=2400)
+    parser.add_argument("--top-k", type=int, default=game_logic.RETRIEVAL_TOP_K)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    if np is None:
+        print("numpy is not installed; semantic retrieval is unavailable.")
+        return 1
+    _paraphrase_recall(args.pages, args.words_per_page, args.decks, args.top_k, args.repeats)
+    _ann_recall(args.ann_pages, args.words_per_page, 10, args.repeats)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
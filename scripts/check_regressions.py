@@ -0,0 +1,422 @@
+import asyncio
+import importlib
+import os
+import stat
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+os.chdir(ROOT_DIR)
+os.environ["FG_LLM_BACKEND"] = "fake"
+
+
+def _check_context_cache_registers_once_off_loop():
+    """Concurrent misses for one block share a single create call, which runs outside the event loop."""
+    import prompt_cache
+
+    creates = []
+
+    class _SlowCacheProvider:
+        def create_cached_content(self, model, key, text, ttl_seconds):
+            creates.append(key)
+            time.sleep(0.3)
+            return f"cachedContents/{key}", time.time() + ttl_seconds
+
+    async def _misses_and_ticks():
+        ticks = []
+
+        async def _tick():
+            for _ in range(10):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+
+        block = prompt_cache.get_system_block("check", 0, "registration", lambda: "static rule. " * 2000)
+        results = await asyncio.gather(
+            _tick(), *(prompt_cache._cached_content_name_async(block, "check-model") for _ in range(5))
+        )
+        return results[1:], max(later - earlier for earlier, later in zip(ticks, ticks[1:]))
+
+    original_provider = prompt_cache.get_llm_provider
+    original_flag = os.environ.get("FG_CONTEXT_CACHE")
+    prompt_cache.get_llm_provider = _SlowCacheProvider
+    os.environ["FG_CONTEXT_CACHE"] = "1"
+    try:
+        names, longest_gap = asyncio.run(_misses_and_ticks())
+    finally:
+        prompt_cache.get_llm_provider = original_provider
+        if original_flag is None:
+            os.environ.pop("FG_CONTEXT_CACHE", None)
+        else:
+            os.environ["FG_CONTEXT_CACHE"] = original_flag
+    if len(creates) != 1 or len(set(names)) != 1 or names[0] is None:
+        raise AssertionError(f"{len(creates)} create calls for 5 concurrent misses, names {names}")
+    if longest_gap > 0.2:
+        raise AssertionError(f"event loop stalled for {longest_gap:.2f}s during registration")
+
+
+class _StandInClient:
+    def close(self):
+        pass
+
+
+class _StandInApiError(Exception):
+    def __init__(self, code, message):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+def _check_pool_lease_reraises_api_error():
+    """A failed pooled call re-raises the API error itself; only non-quota failures count against the slot."""
+    from llm_client import GeminiClientPool
+
+    pool = GeminiClientPool(size=1, client_factory=_StandInClient)
+    cases = ((_StandInApiError(429, "RESOURCE_EXHAUSTED"), 0), (_StandInApiError(503, "UNAVAILABLE"), 1))
+    for error, expected_failures in cases:
+        try:
+            with pool.lease():
+                raise error
+        except Exception as exc:
+            if exc is not error:
+                raise AssertionError(f"lease raised {exc!r} instead of {error!r}")
+        else:
+            raise AssertionError("lease swallowed the API error")
+        if pool.stats["failures"] != expected_failures:
+            raise AssertionError(f"expected {expected_failures} counted failures, got {pool.stats['failures']}")
+
+
+def _check_pool_ignores_cancelled_and_bad_requests():
+    """Cancelled leases and 400s say nothing about the client, so they never recycle a healthy slot."""
+    from llm_client import GeminiClientPool
+
+    pool = GeminiClientPool(size=1, client_factory=_StandInClient)
+    errors = [asyncio.CancelledError()] * 3 + [_StandInApiError(400, "INVALID_ARGUMENT: schema rejected")]
+    for error in errors:
+        try:
+            with pool.lease():
+                raise error
+        except BaseException as exc:
+            if exc is not error:
+                raise AssertionError(f"lease raised {exc!r} instead of {error!r}")
+    with pool.lease():
+        pass
+    if pool.stats["failures"] or pool.stats["created"] != 1 or pool.stats["recycled"]:
+        raise AssertionError(f"healthy client was penalized: {pool.stats}")
+
+
+def _check_finalize_degrades_when_circuit_open():
+    """A failed speculative judgment with the breaker open must yield the degraded verdict, not None."""
+    from concurrent.futures import Future
+
+    from circuit_breaker import STATE_CLOSED, STATE_OPEN, get_circuit_breaker
+    from game_logic import TurnContext, start_turn_pipeline
+    from personas import LEVELS, THEMES
+
+    breaker = get_circuit_breaker()
+    breaker.state = STATE_OPEN
+    try:
+        pipeline = start_turn_pipeline(TurnContext("Our churn is 2%.", next(iter(LEVELS)), [], next(iter(THEMES))))
+        pipeline._judgment_future.result(timeout=10)
+        failed_future = Future()
+        failed_future.set_exception(TimeoutError("speculative judgment timed out"))
+        pipeline._judgment_future = failed_future
+        judgment = pipeline.finalize("Streamed reply.")
+    finally:
+        breaker.state = STATE_CLOSED
+    if not isinstance(judgment, dict) or judgment.get("damage") != 0 or judgment.get("level_passed") is not False:
+        raise AssertionError(f"expected the degraded default judgment, got {judgment!r}")
+    if pipeline.timings["rejudge_reason"] != "skipped-circuit-open":
+        raise AssertionError(f"unexpected rejudge reason {pipeline.timings['rejudge_reason']!r}")
+
+
+def _check_cancelled_hedge_keeps_client_healthy():
+    """The losing request of a hedged stream is cancelled inside its lease; that is not a client failure."""
+    from llm_client import GeminiClientPool
+    from stream_hedging import TTFTTracker, hedged_stream
+
+    pool = GeminiClientPool(size=1, client_factory=_StandInClient)
+    first_token_delays = [5.0, 0.0]
+
+    async def _leased_stream(first_token_delay):
+        with pool.lease():
+            await asyncio.sleep(first_token_delay)
+            for token in ("Strong", " pitch."):
+                yield token
+
+    async def _consume():
+        tracker = TTFTTracker(fixed_delay_seconds=0.05, max_hedge_rate=1.0)
+        stream = hedged_stream(lambda: _leased_stream(first_token_delays.pop(0)), tracker)
+        return "".join([token async for token in stream]), tracker.stats["hedge_wins"]
+
+    reply, hedge_wins = asyncio.run(_consume())
+    if reply != "Strong pitch." or hedge_wins != 1:
+        raise AssertionError(f"hedge did not win the race: {reply!r}, {hedge_wins} wins")
+    slot = pool._slots[0]
+    if pool.stats["failures"] or slot.consecutive_failures or slot.in_flight:
+        raise AssertionError(f"cancelled hedge loser marked the client: {pool.stats}")
+
+
+def _check_circuit_probe_uses_routed_model():
+    """The recovery probe calls the probe task's primary model, after taking a rate limiter slot."""
+    import circuit_breaker
+    import llm_backend
+    import model_router
+    import rate_limit
+
+    calls = []
+
+    class _RecordingLimiter:
+        async def acquire_async(self, deadline=None):
+            calls.append("acquire")
+            return 0.0
+
+    class _RecordingProvider:
+        async def agenerate(self, model, contents, config=None):
+            calls.append(model)
+
+    originals = (rate_limit.get_rate_limiter, llm_backend.get_llm_provider, model_router.primary_model)
+    rate_limit.get_rate_limiter = _RecordingLimiter
+    llm_backend.get_llm_provider = _RecordingProvider
+    model_router.primary_model = lambda task: f"routed-{task}"
+    try:
+        asyncio.run(circuit_breaker._default_probe())
+    finally:
+        rate_limit.get_rate_limiter, llm_backend.get_llm_provider, model_router.primary_model = originals
+    expected = ["acquire", f"routed-{circuit_breaker.CIRCUIT_PROBE_TASK}"]
+    if calls != expected:
+        raise AssertionError(f"probe made calls {calls}, expected {expected}")
+
+
+def _check_router_ignores_process_wide_errors():
+    """Deadlines and the open breaker never demote a model; its own transient failures still do."""
+    from circuit_breaker import CircuitOpenError
+    from model_router import ROUTE_CONSECUTIVE_FAILURES, ModelRouter
+    from rate_limit import DeadlineExceeded
+
+    router = ModelRouter()
+    primary = router.primary_model("judgment")
+    for _ in range(20):
+        router.record("judgment", primary, None, DeadlineExceeded("Rate limiter wait 11.1s exceeds the deadline."))
+        router.record("judgment", primary, None, CircuitOpenError("Model backend circuit is open."))
+    if router.choose("judgment") != primary or router.stats["failovers"]:
+        raise AssertionError(f"process-wide errors demoted {primary}: {router.get_stats()}")
+
+    for _ in range(ROUTE_CONSECUTIVE_FAILURES):
+        router.record("judgment", primary, None, _StandInApiError(503, "UNAVAILABLE"))
+    if router.choose("judgment") == primary:
+        raise AssertionError(f"{ROUTE_CONSECUTIVE_FAILURES} 503s in a row did not demote {primary}")
+
+
+def _check_post_mortem_shares_summary_deadline():
+    """Pending level summaries share one wait budget and fall back to their extractive text."""
+    import concurrent.futures
+
+    import conversation_memory
+
+    memory = conversation_memory.ConversationMemory()
+    for level in range(1, 5):
+        memory.level_summaries[level] = f"extractive level {level}"
+        memory._level_futures[level] = concurrent.futures.Future()
+
+    original_wait = conversation_memory.LEVEL_SUMMARY_WAIT_SECONDS
+    conversation_memory.LEVEL_SUMMARY_WAIT_SECONDS = 0.2
+    try:
+        started = time.monotonic()
+        rendered = memory.render_for_post_mortem([], [], current_level=5)
+        elapsed = time.monotonic() - started
+    finally:
+        conversation_memory.LEVEL_SUMMARY_WAIT_SECONDS = original_wait
+
+    if elapsed > 0.5:
+        raise AssertionError(f"four pending summaries waited {elapsed:.2f}s against a 0.2s budget")
+    if "LEVEL 4 SUMMARY: extractive level 4" not in rendered:
+        raise AssertionError(f"pending level lost its extractive summary: {rendered!r}")
+
+
+def _check_regen_pauses_during_outage():
+    """Post-mortem regeneration waits out an open breaker, and its token rate is not capped by the size log."""
+    from circuit_breaker import STATE_CLOSED, STATE_OPEN, get_circuit_breaker
+    from game_logic import initialize_ai
+    from personas import THEMES
+    from prompt_budget import PROMPT_SIZE_LOG_LENGTH, _record_prompt_size
+
+    regen = importlib.import_module("regenerate_post_mortems")
+    regen.CIRCUIT_POLL_SECONDS = 0.05
+    initialize_ai()
+    breaker = get_circuit_breaker()
+    breaker.state = STATE_OPEN
+    closer = threading.Timer(0.3, lambda: setattr(breaker, "state", STATE_CLOSED))
+    closer.start()
+    try:
+        transcript = [{"role": "user", "content": "We grew 3x."}]
+        run = {"id": 7, "theme": next(iter(THEMES)), "outcome": "victory", "transcript": transcript}
+        run_id, status, _ = regen._regenerate_one(run)
+    finally:
+        closer.cancel()
+        breaker.state = STATE_CLOSED
+    if status != "regenerated":
+        raise AssertionError(f"run {run_id} was {status} after the breaker closed")
+
+    progress = regen._Progress({"last_id": 0, "regenerated": 0, "failed_ids": []})
+    for _ in range(PROMPT_SIZE_LOG_LENGTH + 100):
+        _record_prompt_size("post_mortem", 9000, {"transcript": {"tokens": 10, "truncated": False}})
+    progress.finished_run(8, "failed", None)
+    if progress.input_tokens != (PROMPT_SIZE_LOG_LENGTH + 100) * 10:
+        raise AssertionError(f"input token total {progress.input_tokens} lost entries beyond the size log")
+    if progress.checkpoint["failed_ids"] != [8]:
+        raise AssertionError("failed run was not recorded for --retry-failed")
+
+
+def _check_vad_keeps_continuous_speech():
+    """A clip that is speech from start to end must not be rejected as silent; real silence still is."""
+    import numpy as np
+
+    from audio_preprocess import _encode_wav, preprocess_voice_clip
+
+    sample_rate = 16000
+    t = np.arange(3 * sample_rate) / sample_rate
+    envelope = 0.6 + 0.4 * np.abs(np.sin(2 * np.pi * 4 * t))
+    speech = (0.3 * envelope * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    noise = (0.002 * np.random.default_rng(0).standard_normal(sample_rate)).astype(np.float32)
+
+    if not preprocess_voice_clip(_encode_wav(speech, sample_rate))["has_speech"]:
+        raise AssertionError("continuous speech was reported as silent")
+    padded = preprocess_voice_clip(_encode_wav(np.concatenate([noise, speech, noise]), sample_rate))
+    if not padded["has_speech"] or padded["speech_seconds"] >= 4.5:
+        raise AssertionError(f"padded speech not trimmed: {padded.get('speech_seconds')}s")
+    if preprocess_voice_clip(_encode_wav(noise, sample_rate))["has_speech"]:
+        raise AssertionError("background noise was reported as speech")
+
+
+def _check_deck_store_disk_tier():
+    """The disk tier is private, puts do not walk the directory each time, and lexical decks index once."""
+    import deck_store
+    import game_logic
+
+    walks = []
+    original_walk = deck_store.os.walk
+    original_store = deck_store._STORE
+    original_mode = os.environ.get("FG_DECK_RETRIEVAL")
+
+    def _counting_walk(*args, **kwargs):
+        walks.append(args[0] if args else kwargs.get("top"))
+        return original_walk(*args, **kwargs)
+
+    with tempfile.TemporaryDirectory() as root:
+        store_dir = os.path.join(root, "store")
+        deck_store.os.walk = _counting_walk
+        try:
+            store = deck_store.DeckArtifactStore(disk_dir=store_dir, disk_max_bytes=1024 * 1024)
+            for index in range(10):
+                store.put(f"deck-{index}", {"text": "x" * 100}, aliases=(f"pdf-{index}",))
+            deck_store._STORE = store
+            os.environ["FG_DECK_RETRIEVAL"] = "lexical"
+            deck_text = "Revenue grew 40% month over month.\n\nWe sell compliance tooling to banks."
+            game_logic._deck_artifacts(deck_text)
+            os.environ["FG_DECK_RETRIEVAL"] = "hybrid"
+            first_index = game_logic._get_semantic_index(deck_text)
+            second_index = game_logic._get_semantic_index(deck_text)
+        finally:
+            deck_store.os.walk = original_walk
+            deck_store._STORE = original_store
+            if original_mode is None:
+                os.environ.pop("FG_DECK_RETRIEVAL", None)
+            else:
+                os.environ["FG_DECK_RETRIEVAL"] = original_mode
+
+        if len(walks) != 1:
+            raise AssertionError(f"12 puts walked the disk tier {len(walks)} times")
+        if stat.S_IMODE(os.stat(store_dir).st_mode) != 0o700:
+            raise AssertionError(f"store directory mode is {oct(os.stat(store_dir).st_mode)}")
+        record_mode = stat.S_IMODE(os.stat(os.path.join(store_dir, "deck-0.pkl")).st_mode)
+        if record_mode != 0o600:
+            raise AssertionError(f"record file mode is {oct(record_mode)}")
+        if first_index is not second_index:
+            raise AssertionError("semantic index for a lexical-mode record was rebuilt on the second query")
+
+
+def _wrapped_slides_pdf(slide_texts):
+    """Exported-deck layout: every page's content is the same `q /X0 Do Q`, drawing a per-page Form XObject."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for text in slide_texts:
+        form = f"BT /F1 12 Tf 40 700 Td ({text}) Tj ET".encode("latin-1")
+        objects.append(
+            b"<< /Type /XObject /Subtype /Form /BBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Length %d >>\nstream\n" % len(form) + form + b"\nendstream"
+        )
+        form_id = len(objects)
+        wrapper = b"q /X0 Do Q"
+        objects.append(b"<< /Length %d >>\nstream\n" % len(wrapper) + wrapper + b"\nendstream")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /XObject << /X0 %d 0 R >> >> "
+            b"/Contents %d 0 R >>" % (form_id, len(objects))
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{object_id} 0 R" for object_id in page_ids).encode("ascii")
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for object_id, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % object_id + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(output)
+
+
+def _check_page_cache_separates_wrapped_slides():
+    """Two decks sharing the XObject wrapper must not read each other's (or their own other pages') cached text."""
+    from deck_ingest import extract_pitch_deck
+
+    decks = (
+        ("Alpha revenue slide", "Alpha churn slide", "Alpha team slide"),
+        ("Beta revenue slide", "Beta churn slide", "Beta team slide"),
+    )
+    with tempfile.TemporaryDirectory() as page_cache_dir:
+        for _ in range(2):
+            for slides in decks:
+                text, _, _ = extract_pitch_deck(_wrapped_slides_pdf(slides), page_cache_dir=page_cache_dir, workers=1)
+                pages = text.split("\n\n")
+                if pages != list(slides):
+                    raise AssertionError(f"expected {list(slides)}, got {pages}")
+
+
+def main():
+    checks = [
+        ("context-cache-single-flight", _check_context_cache_registers_once_off_loop),
+        ("pool-lease-error", _check_pool_lease_reraises_api_error),
+        ("pool-lease-cancelled", _check_pool_ignores_cancelled_and_bad_requests),
+        ("finalize-circuit-open", _check_finalize_degrades_when_circuit_open),
+        ("hedge-loser-lease", _check_cancelled_hedge_keeps_client_healthy),
+        ("circuit-probe-routing", _check_circuit_probe_uses_routed_model),
+        ("router-process-wide-errors", _check_router_ignores_process_wide_errors),
+        ("post-mortem-summary-deadline", _check_post_mortem_shares_summary_deadline),
+        ("regen-circuit-pause", _check_regen_pauses_during_outage),
+        ("vad-continuous-speech", _check_vad_keeps_continuous_speech),
+        ("deck-store-disk-tier", _check_deck_store_disk_tier),
+        ("page-cache-xobjects", _check_page_cache_separates_wrapped_slides),
+    ]
+    failed = []
+    for label, check in checks:
+        try:
+            check()
+            print(f"[PASS] {label}")
+        except Exception as exc:
+            failed.append((label, str(exc)))
+            print(f"[FAIL] {label}: {exc}")
+
+    if failed:
+        raise SystemExit(1)
+    print("All regression checks passed.")
+
+
+if __name__ == "__main__":
+    main()
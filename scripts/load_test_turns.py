@@ -0,0 +1,219 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+os.chdir(ROOT_DIR)
+os.environ["FG_LLM_BACKEND"] = "fake"
+os.environ["FG_DISABLE_LOCAL_RECOVERY"] = "1"
+os.environ["DATABASE_URL"] = ""
+
+from circuit_breaker import get_circuit_stats  # noqa: E402
+from conversation_memory import ConversationMemory  # noqa: E402
+from game_logic import TurnContext, start_turn_pipeline  # noqa: E402
+from llm_backend import FakeProvider, set_llm_provider  # noqa: E402
+from model_router import get_model_route_stats  # noqa: E402
+from prompt_budget import summarize_prompt_sizes  # noqa: E402
+from rate_limit import get_rate_limit_stats  # noqa: E402
+from stream_hedging import get_stream_hedging_stats  # noqa: E402
+from structured_output import get_structured_output_stats  # noqa: E402
+
+FOUNDER_LINES = (
+    "We sell scheduling software to dental clinics and have 40 paying customers.",
+    "Our CAC is $300 and payback is four months on the $99 plan.",
+    "Two ex-Stripe engineers built the core; the moat is our integrations.",
+    "We grew 18% month over month for the last six months.",
+    "If a big player copies us we win on onboarding speed and support.",
+)
+MAX_LEVEL = 5
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def _new_session_results():
+    return {"turn_s": [], "first_token_s": [], "rejudged": 0, "errors": [], "backend_stats": {}}
+
+
+def _run_pipeline_session(session_id, turns):
+    """Mirrors the turn flow in views/game.py without Streamlit."""
+    results = _new_session_results()
+    memory = ConversationMemory()
+    chat_history = []
+    current_level = 1
+    hp = 100
+
+    for turn in range(turns):
+        user_input = f"{FOUNDER_LINES[(session_id + turn) % len(FOUNDER_LINES)]} (session {session_id})"
+        chat_history.append({"role": "user", "content": user_input})
+        started = time.perf_counter()
+        try:
+            pipeline = start_turn_pipeline(
+                TurnContext(
+                    user_input=user_input,
+                    current_level=current_level,
+                    chat_history=chat_history,
+                    startup_theme="General SaaS",
+                    conversation_memory=memory,
+                )
+            )
+            streamed_reply = "".join(pipeline.stream_reply()).strip()
+            judgment = pipeline.finalize(streamed_reply)
+        except Exception as e:
+            results["errors"].append(f"session {session_id} turn {turn}: {e}")
+            continue
+
+        chat_history.append({"role": "ai", "content": streamed_reply})
+        memory.schedule_fold(chat_history)
+        hp += int(judgment.get("damage", 0) or 0)
+        results["turn_s"].append(time.perf_counter() - started)
+        results["first_token_s"].append(pipeline.timings.get("first_token_s") or 0.0)
+        results["rejudged"] += 1 if pipeline.timings.get("rejudge_s") else 0
+
+        if judgment.get("level_passed") and current_level < MAX_LEVEL:
+            memory.close_level(current_level, chat_history)
+            current_level += 1
+            chat_history = []
+        if hp <= 0:
+            hp = 100
+            current_level = 1
+            chat_history = []
+            memory = ConversationMemory()
+    return results
+
+
+def _run_view_session(session_id, turns, fake_options):
+    """
+    Drives views/game.py itself through Streamlit's AppTest, one chat input per rerun.
+    AppTest keeps a process-global runtime, so each view session runs in its own process.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    provider = FakeProvider(**fake_options)
+    set_llm_provider(provider)
+    results = _new_session_results()
+
+    def _render():
+        import streamlit as st
+
+        from session_utils import ensure_session_state
+        from views.game import render_game_view
+
+        ensure_session_state()
+        st.session_state.db_ready = False
+        st.session_state.db_error = "load-test"
+        render_game_view()
+
+    app_test = AppTest.from_function(_render, default_timeout=120)
+    app_test.run()
+    for turn in range(turns):
+        if not app_test.chat_input:
+            break
+        started = time.perf_counter()
+        app_test.chat_input[0].set_value(FOUNDER_LINES[(session_id + turn) % len(FOUNDER_LINES)]).run()
+        if len(app_test.exception) > 0:
+            results["errors"].append(f"session {session_id} turn {turn}: {app_test.exception[0].message}")
+            break
+        results["turn_s"].append(time.perf_counter() - started)
+        timing_entry = app_test.session_state["turn_timing_log"][-1]
+        results["first_token_s"].append(timing_entry.get("first_token_s") or 0.0)
+        results["rejudged"] += 1 if timing_entry.get("rejudge_s") else 0
+
+    results["backend_stats"] = dict(provider.stats)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test of the turn pipeline on the fake LLM backend.")
+    parser.add_argument("--sessions", type=int, default=50, help="Concurrent simulated players.")
+    parser.add_argument("--turns", type=int, default=6, help="Turns per player.")
+    parser.add_argument("--mode", choices=("pipeline", "view"), default="pipeline")
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--tokens-per-sec", type=float, default=80)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--quota-rate", type=float, default=0.0)
+    parser.add_argument("--interrupt-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="Fraction of calls with a first-token stall.")
+    parser.add_argument("--stall-ms", type=float, default=5000)
+    parser.add_argument("--seed", default="0")
+    args = parser.parse_args()
+
+    fake_options = {
+        "latency_ms": args.latency_ms,
+        "tokens_per_sec": args.tokens_per_sec,
+        "error_rate": args.error_rate,
+        "quota_rate": args.quota_rate,
+        "interrupt_rate": args.interrupt_rate,
+        "stall_rate": args.stall_rate,
+        "stall_ms": args.stall_ms,
+        "seed": args.seed,
+    }
+
+    started = time.perf_counter()
+    if args.mode == "view":
+        with ProcessPoolExecutor(max_workers=args.sessions) as executor:
+            futures = [
+                executor.submit(_run_view_session, session_id, args.turns, fake_options)
+                for session_id in range(args.sessions)
+            ]
+    else:
+        provider = FakeProvider(**fake_options)
+        set_llm_provider(provider)
+        with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+            futures = [
+                executor.submit(_run_pipeline_session, session_id, args.turns)
+                for session_id in range(args.sessions)
+            ]
+    wall_s = time.perf_counter() - started
+
+    results = _new_session_results()
+    for future in futures:
+        session_results = future.result()
+        for key in ("turn_s", "first_token_s", "errors"):
+            results[key].extend(session_results[key])
+        results["rejudged"] += session_results["rejudged"]
+        for stat, value in session_results["backend_stats"].items():
+            results["backend_stats"][stat] = results["backend_stats"].get(stat, 0) + value
+    if args.mode == "pipeline":
+        results["backend_stats"] = dict(provider.stats)
+
+    turn_s = results["turn_s"]
+    first_token_s = results["first_token_s"]
+    print(f"Mode: {args.mode}, sessions: {args.sessions}, turns/session: {args.turns}")
+    print(f"Completed turns: {len(turn_s)} in {wall_s:.2f}s ({len(turn_s) / max(wall_s, 1e-9):.1f} turns/s)")
+    print(
+        "Turn latency p50/p95/p99: "
+        f"{_percentile(turn_s, 50):.3f}s / {_percentile(turn_s, 95):.3f}s / {_percentile(turn_s, 99):.3f}s"
+    )
+    print(
+        "First token p50/p95/p99: "
+        f"{_percentile(first_token_s, 50):.3f}s / {_percentile(first_token_s, 95):.3f}s / "
+        f"{_percentile(first_token_s, 99):.3f}s"
+    )
+    print(f"Re-judged turns: {results['rejudged']}")
+    print(f"Fake backend stats: {results['backend_stats']}")
+    if args.mode == "pipeline":
+        print(f"Rate limiter: {get_rate_limit_stats()}")
+        print(f"Circuit breaker: {get_circuit_stats()}")
+        print(f"Prompt sizes: {summarize_prompt_sizes()}")
+        print(f"Structured output: {get_structured_output_stats()}")
+        print(f"Stream hedging: {get_stream_hedging_stats()}")
+        print(f"Model routes: {get_model_route_stats()}")
+    if results["errors"]:
+        print(f"Errors ({len(results['errors'])}):")
+        for error in results["errors"][:10]:
+            print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+os.chdir(ROOT_DIR)
+load_dotenv()
+
+from circuit_breaker import get_circuit_breaker  # noqa: E402
+from database import DatabaseConnectionError, iter_runs_for_post_mortem, update_run_post_mortems  # noqa: E402
+from game_logic import get_post_mortem_analysis, initialize_ai, is_fallback_post_mortem  # noqa: E402
+from prompt_budget import estimate_tokens, get_prompt_token_total  # noqa: E402
+from rate_limit import get_rate_limit_stats  # noqa: E402
+
+DEFAULT_CHECKPOINT_PATH = ROOT_DIR / ".fg_post_mortem_regen.json"
+PROGRESS_EVERY_RUNS = 25
+CIRCUIT_POLL_SECONDS = 5
+OUTAGE_ATTEMPTS_PER_RUN = 3
+
+
+def _load_checkpoint(path):
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            checkpoint = json.load(handle)
+    except FileNotFoundError:
+        return {"last_id": 0, "regenerated": 0, "failed_ids": []}
+    checkpoint.setdefault("regenerated", 0)
+    checkpoint.setdefault("failed_ids", [])
+    return checkpoint
+
+
+def _save_checkpoint(path, checkpoint):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as handle:
+        json.dump(checkpoint, handle, indent=2)
+    os.replace(temp_path, path)
+
+
+def _wait_for_backend():
+    """Blocks while the breaker is open, so an outage pauses the job instead of failing every run."""
+    breaker = get_circuit_breaker()
+    if breaker.is_closed():
+        return
+    print(f"Model backend circuit is {breaker.state}; pausing until it closes.")
+    while not breaker.is_closed():
+        time.sleep(CIRCUIT_POLL_SECONDS)
+
+
+def _regenerate_one(run):
+    """
+    Returns (run_id, status, report). Only "regenerated" results are written back.
+    A default report produced while the breaker was open is retried once it closes.
+    """
+    transcript = run.get("transcript") or []
+    if isinstance(transcript, str):
+        transcript = json.loads(transcript)
+    if not any(msg.get("role") == "user" for msg in transcript):
+        return run["id"], "skipped", None
+
+    for _ in range(OUTAGE_ATTEMPTS_PER_RUN):
+        _wait_for_backend()
+        # The deck text is not stored with runs, so regenerated reports use the transcript only.
+        try:
+            report = get_post_mortem_analysis(transcript, run["theme"], run["outcome"])
+        except Exception as e:
+            print(f"REGEN ERROR (run {run['id']}): {e}")
+            return run["id"], "failed", None
+        if not is_fallback_post_mortem(report):
+            return run["id"], "regenerated", report
+        if get_circuit_breaker().is_closed():
+            break
+    return run["id"], "failed", None
+
+
+class _Progress:
+    """
+    Contiguous checkpoint watermark plus throughput counters.
+    Failed runs are recorded in failed_ids for --retry-failed; a retry pass leaves the watermark alone.
+    """
+
+    def __init__(self, checkpoint, advance_watermark=True):
+        self.checkpoint = checkpoint
+        self.advance_watermark = advance_watermark
+        self.started = time.perf_counter()
+        self.in_order = deque()
+        self.settled = set()
+        self.pending_writes = []
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._prompt_tokens_seen = get_prompt_token_total("post_mortem")
+        self.finished = 0
+        self.next_report_at = PROGRESS_EVERY_RUNS
+
+    def submitted(self, run_id):
+        self.in_order.append(run_id)
+
+    def finished_run(self, run_id, status, report):
+        self.finished += 1
+        prompt_tokens = get_prompt_token_total("post_mortem")
+        self.input_tokens += prompt_tokens - self._prompt_tokens_seen
+        self._prompt_tokens_seen = prompt_tokens
+        if status == "regenerated":
+            self.output_tokens += estimate_tokens(json.dumps(report))
+            self.pending_writes.append((run_id, report))
+            return
+        if status == "failed" and run_id not in self.checkpoint["failed_ids"]:
+            self.checkpoint["failed_ids"].append(run_id)
+        self.settled.add(run_id)
+
+    def flush(self, dry_run):
+        """Writes buffered reports in one transaction, then advances the watermark."""
+        writes, self.pending_writes = self.pending_writes, []
+        if writes and not dry_run:
+            updated, error = update_run_post_mortems(writes)
+            if error:
+                print(f"REGEN WRITE ERROR ({len(writes)} runs): {error}")
+                failed_ids = self.checkpoint["failed_ids"]
+                failed_ids.extend(run_id for run_id, _ in writes if run_id not in failed_ids)
+            else:
+                self.checkpoint["regenerated"] += updated
+                written = {run_id for run_id, _ in writes}
+                self.checkpoint["failed_ids"] = [
+                    run_id for run_id in self.checkpoint["failed_ids"] if run_id not in written
+                ]
+        self.settled.update(run_id for run_id, _ in writes)
+
+        while self.in_order and self.in_order[0] in self.settled:
+            run_id = self.in_order.popleft()
+            self.settled.discard(run_id)
+            if self.advance_watermark:
+                self.checkpoint["last_id"] = run_id
+
+    def rates(self):
+        minutes = max(time.perf_counter() - self.started, 1e-9) / 60.0
+        return self.finished / minutes, (self.input_tokens + self.output_tokens) / minutes
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Regenerate stored runs.post_mortem rows after prompt or scoring changes."
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent post-mortem generations.")
+    parser.add_argument("--batch-size", type=int, default=25, help="Reports written per transaction.")
+    parser.add_argument("--fetch-size", type=int, default=200, help="Rows per server-side cursor fetch.")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many runs.")
+    parser.add_argument("--checkpoint", default=str(DEFAULT_CHECKPOINT_PATH))
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start from the first run.")
+    parser.add_argument("--dry-run", action="store_true", help="Generate but do not write or checkpoint.")
+    parser.add_argument(
+        "--retry-failed", action="store_true", help="Only re-run the checkpoint's failed runs (watermark unchanged)."
+    )
+    args = parser.parse_args()
+
+    if not initialize_ai():
+        print("Model backend is not configured (GEMINI_API_KEY or FG_LLM_BACKEND=fake).")
+        return 1
+
+    checkpoint = {"last_id": 0, "regenerated": 0, "failed_ids": []}
+    if not args.restart:
+        checkpoint = _load_checkpoint(args.checkpoint)
+    if args.retry_failed:
+        if not checkpoint["failed_ids"]:
+            print("No failed runs recorded in the checkpoint.")
+            return 0
+        print(f"Retrying {len(checkpoint['failed_ids'])} failed runs.")
+    elif checkpoint["last_id"]:
+        print(f"Resuming after run id {checkpoint['last_id']}.")
+
+    progress = _Progress(checkpoint, advance_watermark=not args.retry_failed)
+    max_in_flight = max(1, args.workers) * 2
+    in_flight = set()
+
+    def _drain(return_when):
+        done, _ = wait(in_flight, return_when=return_when)
+        for future in done:
+            in_flight.discard(future)
+            progress.finished_run(*future.result())
+        if len(progress.pending_writes) >= args.batch_size or return_when != FIRST_COMPLETED:
+            progress.flush(args.dry_run)
+            if not args.dry_run:
+                _save_checkpoint(args.checkpoint, checkpoint)
+        if progress.finished >= progress.next_report_at:
+            progress.next_report_at += PROGRESS_EVERY_RUNS
+            runs_per_min, tokens_per_min = progress.rates()
+            print(
+                f"Processed {progress.finished} runs (last safe id {checkpoint['last_id']}): "
+                f"{runs_per_min:.1f} runs/min, {tokens_per_min:,.0f} tokens/min"
+            )
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+            try:
+                if args.retry_failed:
+                    runs = iter_runs_for_post_mortem(0, args.fetch_size, args.limit, list(checkpoint["failed_ids"]))
+                else:
+                    runs = iter_runs_for_post_mortem(checkpoint["last_id"], args.fetch_size, args.limit)
+                for run in runs:
+                    progress.submitted(run["id"])
+                    in_flight.add(executor.submit(_regenerate_one, run))
+                    if len(in_flight) >= max_in_flight:
+                        _drain(FIRST_COMPLETED)
+            except KeyboardInterrupt:
+                print("Interrupted; finishing in-flight runs before saving the checkpoint.")
+            finally:
+                if in_flight:
+                    _drain(ALL_COMPLETED)
+                progress.flush(args.dry_run)
+                if not args.dry_run:
+                    _save_checkpoint(args.checkpoint, checkpoint)
+    except DatabaseConnectionError as exc:
+        print(f"Database unavailable: {exc}")
+        return 1
+
+    runs_per_min, tokens_per_min = progress.rates()
+    print(f"Done: {progress.finished} runs processed, {checkpoint['regenerated']} regenerated in total.")
+    print(f"Throughput: {runs_per_min:.1f} runs/min, {tokens_per_min:,.0f} tokens/min")
+    print(f"Rate limiter: {get_rate_limit_stats()}")
+    if checkpoint["failed_ids"]:
+        print(f"Kept stored post-mortems for {len(checkpoint['failed_ids'])} runs: {checkpoint['failed_ids'][:20]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
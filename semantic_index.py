@@ -0,0 +1,250 @@
+import math
+import os
+import re
+import zlib
+from collections import Counter
+from functools import lru_cache
+
+from deck_index import RETRIEVAL_STOPWORDS, top_indices
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SEMANTIC_DIM = 1024
+SEMANTIC_NGRAM_SIZES = (3, 4, 5)
+SEMANTIC_TOKEN_RE = re.compile(r"[a-z0-9]+")
+SEMANTIC_MIN_SIMILARITY = 0.1
+SEMANTIC_WEIGHT = 0.5
+LEXICAL_SATURATION = 10.0
+SEMANTIC_IVF_MIN_CHUNKS = 2048
+SEMANTIC_EMBED_BLOCK = 256
+SEMANTIC_IVF_ITERATIONS = 8
+SEMANTIC_IVF_PROBE_FRACTION = 0.1
+RETRIEVAL_MODES = ("hybrid", "lexical", "semantic")
+# Short function words the lexical stopword list leaves to its 3-letter minimum.
+SEMANTIC_STOPWORDS = RETRIEVAL_STOPWORDS | {
+    "and", "are", "but", "can", "did", "does", "for", "had", "has", "how", "its", "much", "not",
+    "our", "out", "the", "was", "were", "who", "why", "will", "you",
+}
+# Hashed n-grams only catch spelling variants (churn / churned); deck acronyms need spelling out.
+SEMANTIC_ALIASES = {
+    "arr": "annual recurring revenue",
+    "mrr": "monthly recurring revenue",
+    "cac": "customer acquisition cost",
+    "ltv": "lifetime value",
+    "clv": "customer lifetime value",
+    "nrr": "net revenue retention",
+    "grr": "gross revenue retention",
+    "gmv": "gross merchandise value",
+    "tam": "total addressable market",
+    "sam": "serviceable addressable market",
+    "som": "serviceable obtainable market",
+    "mau": "monthly active users",
+    "dau": "daily active users",
+    "kpi": "key performance indicator",
+    "roi": "return on investment",
+    "ebitda": "earnings profit",
+    "cogs": "cost of goods sold",
+    "yoy": "year over year growth",
+    "mom": "month over month growth",
+    "b2b": "business customers enterprise",
+    "b2c": "consumer customers",
+    "saas": "software subscription",
+    "ip": "intellectual property patents",
+    "nps": "net promoter score customer satisfaction",
+}
+
+
+def retrieval_mode():
+    """FG_DECK_RETRIEVAL: hybrid (default), lexical or semantic. Semantic modes need numpy."""
+    mode = os.getenv("FG_DECK_RETRIEVAL", "").strip().lower() or "hybrid"
+    if mode not in RETRIEVAL_MODES:
+        mode = "hybrid"
+    if np is None:
+        return "lexical"
+    return mode
+
+
+def semantic_tokens(text):
+    tokens = []
+    for token in SEMANTIC_TOKEN_RE.findall((text or "").lower()):
+        alias = SEMANTIC_ALIASES.get(token)
+        if alias:
+            tokens.extend(alias.split())
+        elif len(token) >= 3 and token not in SEMANTIC_STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def _stable_hash(text):
+    """crc32 rather than hash(): embeddings must not change with PYTHONHASHSEED between processes."""
+    return zlib.crc32(text.encode("utf-8"))
+
+
+@lru_cache(maxsize=65536)
+def _word_features(word):
+    """Signed hash buckets for a word and its boundary-marked character n-grams (fastText style)."""
+    marked = f"<{word}>"
+    grams = [marked]
+    for size in SEMANTIC_NGRAM_SIZES:
+        grams.extend(marked[start: start + size] for start in range(max(0, len(marked) - size + 1)))
+    hashes = np.array([_stable_hash(gram) for gram in grams], dtype=np.int64)
+    buckets = hashes % SEMANTIC_DIM
+    signs = np.where((hashes // SEMANTIC_DIM) % 2 == 0, 1.0, -1.0) / math.sqrt(len(grams))
+    return buckets, signs
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class SemanticIndex:
+    """
+    Offline semantic index over one deck's chunks.
+    - each chunk is a sum of hashed character n-gram vectors weighted by log-tf x idf,
+      stored as an L2-normalized float32 matrix (cosine = dot product)
+    - small decks are searched brute force; from SEMANTIC_IVF_MIN_CHUNKS chunks an IVF index
+      (spherical k-means lists) limits each query to the closest SEMANTIC_IVF_PROBE_FRACTION of lists
+    """
+
+    def __init__(self, chunks):
+        self.chunks = tuple(chunks)
+        chunk_counts = [Counter(semantic_tokens(chunk)) for chunk in self.chunks]
+        document_frequency = Counter(word for counts in chunk_counts for word in counts)
+        chunk_count = len(self.chunks)
+        self.idf = {
+            word: math.log((chunk_count + 1) / (frequency + 0.5)) for word, frequency in document_frequency.items()
+        }
+        # Words in every chunk get ~0 weight; words the deck never uses weigh like the rarest ones.
+        self.default_idf = math.log((chunk_count + 1) / 0.5)
+
+        self.embeddings = self._embed_chunks(chunk_counts)
+        self.centroids = None
+        self.row_chunks = None
+        self.list_offsets = None
+        if chunk_count >= SEMANTIC_IVF_MIN_CHUNKS:
+            self._build_ivf()
+
+    def _embed_chunks(self, chunk_counts):
+        """
+        Expands (chunk, word, weight) postings into hashed features with array ops and sums them per
+        chunk with bincount, SEMANTIC_EMBED_BLOCK chunks at a time to bound the scratch arrays.
+        """
+        vocabulary = list(self.idf)
+        word_ids = {word: word_id for word_id, word in enumerate(vocabulary)}
+        features = [_word_features(word) for word in vocabulary]
+        feature_counts = np.array([len(buckets) for buckets, _ in features], dtype=np.int64)
+        feature_ptr = np.concatenate(([0], np.cumsum(feature_counts)))
+        all_buckets = np.concatenate([buckets for buckets, _ in features]) if features else np.zeros(0, np.int64)
+        all_signs = np.concatenate([signs for _, signs in features]) if features else np.zeros(0)
+
+        embeddings = np.zeros((len(chunk_counts), SEMANTIC_DIM), dtype=np.float32)
+        for block_start in range(0, len(chunk_counts), SEMANTIC_EMBED_BLOCK):
+            block = chunk_counts[block_start: block_start + SEMANTIC_EMBED_BLOCK]
+            rows, ids, weights = [], [], []
+            for row, counts in enumerate(block):
+                for word, frequency in counts.items():
+                    rows.append(row)
+                    ids.append(word_ids[word])
+                    weights.append((1.0 + math.log(frequency)) * self.idf[word])
+            if not rows:
+                continue
+            ids = np.array(ids, dtype=np.int64)
+            per_posting = feature_counts[ids]
+            posting = np.repeat(np.arange(len(ids)), per_posting)
+            within = np.arange(posting.size) - np.repeat(np.cumsum(per_posting) - per_posting, per_posting)
+            feature = feature_ptr[ids][posting] + within
+            flat_index = np.array(rows, dtype=np.int64)[posting] * SEMANTIC_DIM + all_buckets[feature]
+            flat_weight = np.array(weights)[posting] * all_signs[feature]
+            dense = np.bincount(flat_index, weights=flat_weight, minlength=len(block) * SEMANTIC_DIM)
+            embeddings[block_start: block_start + len(block)] = dense.reshape(len(block), SEMANTIC_DIM)
+        return _normalize_rows(embeddings)
+
+    def _build_ivf(self):
+        """
+        Spherical k-means with sqrt(n) lists, seeded deterministically so rebuilds match.
+        Rows are then regrouped by list so probing a list reads one contiguous slice.
+        """
+        chunk_count = len(self.chunks)
+        list_count = max(2, int(math.sqrt(chunk_count)))
+        rng = np.random.default_rng(0)
+        centroids = self.embeddings[rng.choice(chunk_count, size=list_count, replace=False)]
+        members = np.zeros((list_count, chunk_count), dtype=np.float32)
+        for _ in range(SEMANTIC_IVF_ITERATIONS):
+            assignment = np.argmax(self.embeddings @ centroids.T, axis=1)
+            members[:] = 0.0
+            members[assignment, np.arange(chunk_count)] = 1.0
+            sums = members @ self.embeddings
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = _normalize_rows(sums).astype(np.float32)
+        assignment = np.argmax(self.embeddings @ centroids.T, axis=1)
+
+        self.row_chunks = np.argsort(assignment, kind="stable")
+        self.embeddings = np.ascontiguousarray(self.embeddings[self.row_chunks])
+        self.list_offsets = np.concatenate(([0], np.cumsum(np.bincount(assignment, minlength=list_count))))
+        self.centroids = centroids
+
+    def embed_query(self, text):
+        counts = Counter(semantic_tokens(text))
+        vector = np.zeros(SEMANTIC_DIM)
+        for word, frequency in counts.items():
+            buckets, signs = _word_features(word)
+            np.add.at(vector, buckets, signs * ((1.0 + math.log(frequency)) * self.idf.get(word, self.default_idf)))
+        norm = np.linalg.norm(vector)
+        return (vector / norm).astype(np.float32) if norm else None
+
+    def similarities(self, text, exact=False):
+        """
+        Cosine similarity of every chunk to text; chunks outside the probed IVF lists score 0.
+        Returns None when the text has no usable tokens. exact=True skips the IVF probe.
+        """
+        query = self.embed_query(text)
+        if query is None or not self.chunks:
+            return None
+        if self.centroids is None:
+            return self.embeddings @ query
+
+        scores = np.zeros(len(self.chunks), dtype=np.float32)
+        if exact:
+            scores[self.row_chunks] = self.embeddings @ query
+            return scores
+        probe_count = max(1, math.ceil(len(self.centroids) * SEMANTIC_IVF_PROBE_FRACTION))
+        for list_index in np.argsort(-(self.centroids @ query))[:probe_count]:
+            start, end = self.list_offsets[list_index], self.list_offsets[list_index + 1]
+            scores[self.row_chunks[start:end]] = self.embeddings[start:end] @ query
+        return scores
+
+
+def fuse_scores(lexical_scores, semantic_scores, semantic_weight=SEMANTIC_WEIGHT):
+    """
+    Hybrid score: saturated BM25 (score / (score + LEXICAL_SATURATION)) blended with cosine similarity.
+    Saturating instead of max-normalizing keeps a single weak keyword hit from outranking a strong paraphrase.
+    Similarities under SEMANTIC_MIN_SIMILARITY count as no match; chunks matching neither are -inf.
+    """
+    fused = None
+    if lexical_scores is not None:
+        lexical = np.where(np.isfinite(lexical_scores), lexical_scores, 0.0)
+        fused = (1.0 - semantic_weight) * lexical / (lexical + LEXICAL_SATURATION)
+    if semantic_scores is not None:
+        semantic = np.where(semantic_scores >= SEMANTIC_MIN_SIMILARITY, semantic_scores, 0.0)
+        fused = semantic_weight * semantic if fused is None else fused + semantic_weight * semantic
+    if fused is None:
+        return None
+    return np.where(fused > 0, fused, -np.inf)
+
+
+def hybrid_top_chunks(deck_index, semantic_index, query_tokens, query_text, top_k, mode="hybrid"):
+    """Top chunks by fused lexical + semantic score (or semantic only); empty when nothing matches."""
+    semantic_scores = semantic_index.similarities(query_text)
+    if mode == "semantic":
+        fused = fuse_scores(None, semantic_scores, semantic_weight=1.0)
+    else:
+        fused = fuse_scores(deck_index.score_vector(query_tokens), semantic_scores)
+    if fused is None:
+        return []
+    return [deck_index.chunks[chunk_index] for chunk_index in top_indices(fused, top_k)]
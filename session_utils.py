@@ -44,6 +44,9 @@ SESSION_DEFAULTS = {
     "voice_last_audio_hash": "",
     "voice_audio_nonce": 0,
     "turn_damage_log": [],
+    "turn_timing_log": [],
+    "conversation_memory": None,
+    "post_mortem_tracker": None,
     "max_level_reached": 1,
     "victory_audio_played": False,
     "previous_hp_for_ui": 100,
@@ -92,6 +95,9 @@ def reset_run():
     st.session_state.voice_last_audio_hash = ""
     st.session_state.voice_audio_nonce = 0
     st.session_state.turn_damage_log = []
+    st.session_state.turn_timing_log = []
+    st.session_state.conversation_memory = None
+    st.session_state.post_mortem_tracker = None
     st.session_state.max_level_reached = 1
     st.session_state.victory_audio_played = False
     st.session_state.previous_hp_for_ui = st.session_state.current_hp
@@ -0,0 +1,186 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+HEDGE_PERCENTILE = 95
+HEDGE_DEFAULT_DELAY_SECONDS = 2.0
+HEDGE_MIN_DELAY_SECONDS = 0.75
+HEDGE_MAX_DELAY_SECONDS = 6.0
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MAX_RATE = 0.1
+TTFT_WINDOW = 500
+
+
+def _env_float(name, default_value):
+    try:
+        return max(0.0, float(os.getenv(name, "") or default_value))
+    except ValueError:
+        return default_value
+
+
+def _hedging_enabled():
+    return os.getenv("FG_STREAM_HEDGE", "").strip() != "0"
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class TTFTTracker:
+    """
+    Rolling time-to-first-token samples and hedge counters for one stream task.
+    The hedge delay is the configured TTFT percentile (clamped), so roughly
+    (100 - percentile)% of streams get a second request.
+    """
+
+    def __init__(self, percentile=None, fixed_delay_seconds=None, max_hedge_rate=None):
+        self.percentile = percentile or _env_float("FG_STREAM_HEDGE_PERCENTILE", HEDGE_PERCENTILE)
+        self.fixed_delay_seconds = fixed_delay_seconds or _env_float("FG_STREAM_HEDGE_DELAY_SECONDS", 0.0)
+        self.max_hedge_rate = max_hedge_rate or _env_float("FG_STREAM_HEDGE_MAX_RATE", HEDGE_MAX_RATE)
+        self._samples = deque(maxlen=TTFT_WINDOW)
+        self._lock = threading.Lock()
+        self.stats = {"streams": 0, "hedged": 0, "hedge_wins": 0, "hedge_skipped": 0}
+
+    def record_ttft(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def hedge_delay(self):
+        if self.fixed_delay_seconds:
+            return self.fixed_delay_seconds
+        with self._lock:
+            if len(self._samples) < HEDGE_MIN_SAMPLES:
+                return HEDGE_DEFAULT_DELAY_SECONDS
+            threshold = _percentile(sorted(self._samples), self.percentile)
+        return min(HEDGE_MAX_DELAY_SECONDS, max(HEDGE_MIN_DELAY_SECONDS, threshold))
+
+    def start_stream(self):
+        with self._lock:
+            self.stats["streams"] += 1
+
+    def allow_hedge(self):
+        """Caps hedges to max_hedge_rate of streams so a slow backend is not hit twice as hard."""
+        with self._lock:
+            if self.stats["hedged"] + 1 > self.max_hedge_rate * max(self.stats["streams"], 1):
+                self.stats["hedge_skipped"] += 1
+                return False
+            self.stats["hedged"] += 1
+            return True
+
+    def record_hedge_win(self):
+        with self._lock:
+            self.stats["hedge_wins"] += 1
+
+    def get_stats(self):
+        with self._lock:
+            ordered = sorted(self._samples)
+            stats = dict(self.stats)
+        stats["hedge_rate"] = round(stats["hedged"] / stats["streams"], 3) if stats["streams"] else 0.0
+        for pct in (50, 95, 99):
+            value = _percentile(ordered, pct)
+            stats[f"ttft_p{pct}_s"] = round(value, 3) if value is not None else None
+        stats["hedge_delay_s"] = round(self.hedge_delay(), 3)
+        return stats
+
+
+async def _close_stream(task, stream):
+    """Cancels a pending first-token read and closes its stream (releasing the client lease)."""
+    if task is not None and not task.done():
+        task.cancel()
+    if task is not None:
+        await asyncio.gather(task, return_exceptions=True)
+    try:
+        await stream.aclose()
+    except Exception:
+        pass
+
+
+async def _first_item(stream, acquire=None):
+    if acquire is not None:
+        await acquire()
+    return await stream.__anext__()
+
+
+async def hedged_stream(open_stream, tracker, acquire_hedge=None, can_hedge=None):
+    """
+    Streams tokens from open_stream() (a fresh async iterator per call).
+    - if no first token arrives within tracker.hedge_delay(), an identical second request is opened
+    - whichever produces a first token first is streamed; the other is cancelled and closed
+    - if one request fails before its first token, the other keeps going; errors surface only when both fail
+    The caller acquires the primary's send slot before calling, so queueing does not count as TTFT.
+    acquire_hedge: awaitable factory run before the second request (rate limiter slot).
+    can_hedge: optional callable that vetoes the second request (e.g. breaker not closed).
+    """
+    tracker.start_stream()
+    started = time.perf_counter()
+    primary = open_stream()
+    contenders = {asyncio.ensure_future(_first_item(primary)): (primary, False)}
+    first_error = None
+    hedge_launched = not _hedging_enabled()
+    winner = None
+
+    try:
+        while contenders and winner is None:
+            timeout = None
+            if not hedge_launched:
+                timeout = max(0.0, tracker.hedge_delay() - (time.perf_counter() - started))
+            done, _ = await asyncio.wait(contenders, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                hedge_launched = True
+                if (can_hedge is None or can_hedge()) and tracker.allow_hedge():
+                    hedge = open_stream()
+                    contenders[asyncio.ensure_future(_first_item(hedge, acquire_hedge))] = (hedge, True)
+                continue
+
+            for task in done:
+                stream, is_hedge = contenders.pop(task)
+                error = task.exception()
+                if error is None or isinstance(error, StopAsyncIteration):
+                    if winner is None:
+                        winner = (task, stream, is_hedge)
+                        continue
+                elif first_error is None:
+                    first_error = error
+                await _close_stream(None, stream)
+    finally:
+        for task, (stream, _) in list(contenders.items()):
+            await _close_stream(task, stream)
+
+    if winner is None:
+        raise first_error
+
+    task, stream, is_hedge = winner
+    if isinstance(task.exception(), StopAsyncIteration):
+        return
+    tracker.record_ttft(time.perf_counter() - started)
+    if is_hedge:
+        tracker.record_hedge_win()
+
+    try:
+        yield task.result()
+        async for item in stream:
+            yield item
+    finally:
+        await _close_stream(None, stream)
+
+
+_TRACKER = None
+_TRACKER_LOCK = threading.Lock()
+
+
+def get_stream_tracker():
+    global _TRACKER
+    if _TRACKER is None:
+        with _TRACKER_LOCK:
+            if _TRACKER is None:
+                _TRACKER = TTFTTracker()
+    return _TRACKER
+
+
+def get_stream_hedging_stats():
+    return get_stream_tracker().get_stats()
@@ -0,0 +1,48 @@
+import os
+import threading
+
+STRUCTURED_MIME_TYPE = "application/json"
+SCHEMA_ERROR_MARKERS = ("schema", "response_mime_type", "responsemimetype")
+
+_UNSUPPORTED_MODELS = set()
+_LOCK = threading.Lock()
+_STATS = {"structured_calls": 0, "plain_calls": 0, "schema_rejections": 0}
+
+
+def _structured_output_enabled():
+    return os.getenv("FG_STRUCTURED_OUTPUT", "").strip() != "0"
+
+
+def structured_output_fields(model, schema):
+    """
+    Config fields asking the model for JSON that matches schema (a JSON Schema dict).
+    Empty when disabled via FG_STRUCTURED_OUTPUT=0 or after the model rejected a schema,
+    so callers fall back to prompt-only JSON and local parsing.
+    """
+    with _LOCK:
+        if not _structured_output_enabled() or model in _UNSUPPORTED_MODELS:
+            _STATS["plain_calls"] += 1
+            return {}
+        _STATS["structured_calls"] += 1
+    return {"response_mime_type": STRUCTURED_MIME_TYPE, "response_json_schema": schema}
+
+
+def is_schema_rejection(error):
+    """A 400 complaining about the response schema / mime type (not worth retrying as-is)."""
+    code = getattr(error, "code", None)
+    error_str = str(error).lower()
+    if code != 400 and not error_str.startswith("400"):
+        return False
+    return any(marker in error_str for marker in SCHEMA_ERROR_MARKERS)
+
+
+def mark_structured_output_unsupported(model, error):
+    with _LOCK:
+        _UNSUPPORTED_MODELS.add(model)
+        _STATS["schema_rejections"] += 1
+    print(f"STRUCTURED OUTPUT DISABLED ({model}): {str(error)[:200]}")
+
+
+def get_structured_output_stats():
+    with _LOCK:
+        return dict(_STATS, unsupported_models=sorted(_UNSUPPORTED_MODELS))
@@ -1,17 +1,23 @@
 import hashlib
-import io
 import time
 
 import streamlit as st
 import streamlit.components.v1 as components
 
+from audio_preprocess import preprocess_voice_clip
+from circuit_breaker import get_circuit_stats
+from conversation_memory import ConversationMemory
 from database import save_run_result
+from deck_ingest import get_extract_stats
+from deck_store import get_deck_store_stats
 from feedback_fx import play_hidden_sound, trigger_haptic_feedback
 from game_logic import (
+    TurnContext,
     get_post_mortem_analysis,
-    get_turn_judgment,
-    stream_investor_reply,
-    transcribe_pitch_audio,
+    ingest_pitch_deck,
+    load_pitch_deck,
+    start_turn_pipeline,
+    stream_pitch_transcript,
 )
 from local_recovery import (
     clear_active_run_snapshot,
@@ -20,6 +26,9 @@ from local_recovery import (
     try_restore_active_run_once,
 )
 from personas import LEVELS, THEMES
+from post_mortem_tracker import PostMortemTracker
+from rate_limit import get_rate_limit_stats
+from response_cache import get_response_cache_stats, get_transcript_cache_stats
 from session_utils import reset_run
 from ui_helpers import compute_vc_valuation, format_currency, load_leaderboards, render_post_mortem_report
 
@@ -39,30 +48,13 @@ PERKS = {
 }
 
 
-def extract_pitch_deck_text(pdf_bytes):
-    """
-    Extracts text from an uploaded PDF.
-    Returns: (text, page_count)
-    """
-    try:
-        from pypdf import PdfReader
-    except ImportError as exc:
-        raise RuntimeError("pypdf is not installed. Add `pypdf` to requirements and install it.") from exc
-
-    reader = PdfReader(io.BytesIO(pdf_bytes))
-    page_text = []
-    for page in reader.pages:
-        page_text.append((page.extract_text() or "").strip())
-
-    combined = "\n\n".join(page_text).strip()
-    if not combined:
-        raise ValueError("No readable text found in this PDF.")
-
-    max_chars = 120_000
-    if len(combined) > max_chars:
-        combined = combined[:max_chars]
+def _deck_progress_reporter(progress_bar):
+    def report(pages_done, page_count):
+        progress_bar.progress(
+            pages_done / max(page_count, 1), text=f"Extracting deck text: page {pages_done}/{page_count}"
+        )
 
-    return combined, len(reader.pages)
+    return report
 
 
 def clear_pitch_deck_state(clear_error=True):
@@ -263,7 +255,7 @@ def _render_whatsapp_mic_bridge():
 
 
 def _handle_voice_auto_send(audio_file):
-    """Process recorded audio → transcribe → auto-send as user input."""
+    """Process released audio → trim/downsample → transcribe segments (partials shown as they land) → auto-send."""
     audio_bytes = audio_file.getvalue() if audio_file else b""
     if not audio_bytes:
         return
@@ -274,12 +266,28 @@ def _handle_voice_auto_send(audio_file):
 
     st.session_state.voice_last_audio_hash = digest
     audio_type = getattr(audio_file, "type", None) or "audio/wav"
-    with st.spinner("Transcribing audio..."):
-        transcript = transcribe_pitch_audio(audio_bytes, audio_type)
+    clip = preprocess_voice_clip(audio_bytes, audio_type)
+    if clip["processed"]:
+        print(
+            f"AUDIO PREPROCESS: {clip['original_bytes']} -> {clip['processed_bytes']} bytes "
+            f"({clip['original_seconds']}s -> {clip['speech_seconds']}s, {clip['elapsed_ms']}ms)"
+        )
+
+    transcript = ""
+    if clip["has_speech"]:
+        partial_slot = st.empty()
+        with st.spinner("Transcribing audio..."):
+            for transcript in stream_pitch_transcript(clip["audio_bytes"], clip["mime_type"], clip["segments"]):
+                partial_slot.caption(f"🎙️ {transcript}")
+        partial_slot.empty()
 
     st.session_state.voice_audio_nonce = int(st.session_state.voice_audio_nonce) + 1
 
-    if transcript:
+    if not clip["has_speech"]:
+        st.session_state.voice_recording = False
+        st.session_state.voice_mic_locked = False
+        st.toast("No speech detected. Try again.")
+    elif transcript:
         st.session_state.pending_voice_text = transcript
         st.session_state.voice_recording = False
         st.session_state.voice_mic_locked = False
@@ -450,18 +458,51 @@ def apply_damage_with_perks(raw_damage):
     return effective_damage, notes
 
 
+def get_conversation_memory():
+    """Per-session rolling history memory; rebuilt lazily after restores or restarts."""
+    if st.session_state.conversation_memory is None:
+        st.session_state.conversation_memory = ConversationMemory()
+    return st.session_state.conversation_memory
+
+
+def get_post_mortem_tracker():
+    """Per-session incremental post-mortem; rebuilt lazily like the conversation memory."""
+    if st.session_state.post_mortem_tracker is None:
+        st.session_state.post_mortem_tracker = PostMortemTracker()
+    return st.session_state.post_mortem_tracker
+
+
 def get_or_generate_post_mortem(outcome):
     if (
         st.session_state.post_mortem_report is None
         or st.session_state.post_mortem_outcome != outcome
     ):
+        with st.spinner("Merging your post-mortem analytics..."):
+            merged_report = get_post_mortem_tracker().final_report(
+                outcome,
+                st.session_state.current_level,
+                st.session_state.chat_history,
+                st.session_state.startup_theme,
+                st.session_state.pitch_deck_text,
+            )
+        if merged_report is not None:
+            st.session_state.post_mortem_report = merged_report
+            st.session_state.post_mortem_outcome = outcome
+            return merged_report
+
         transcript = st.session_state.full_chat_history or st.session_state.chat_history
+        summarized_transcript = get_conversation_memory().render_for_post_mortem(
+            st.session_state.full_chat_history,
+            st.session_state.chat_history,
+            current_level=st.session_state.current_level,
+        )
         with st.spinner("Generating your post-mortem analytics..."):
             st.session_state.post_mortem_report = get_post_mortem_analysis(
                 transcript,
                 st.session_state.startup_theme,
                 outcome,
                 st.session_state.pitch_deck_text,
+                transcript_text=summarized_transcript,
             )
         st.session_state.post_mortem_outcome = outcome
     return st.session_state.post_mortem_report
@@ -553,19 +594,25 @@ def render_sidebar():
             uploaded_bytes = uploaded_deck.getvalue()
             uploaded_hash = hashlib.sha256(uploaded_bytes).hexdigest()
             if uploaded_hash != st.session_state.pitch_deck_hash:
-                with st.spinner("Extracting deck text..."):
-                    try:
-                        deck_text, page_count = extract_pitch_deck_text(uploaded_bytes)
-                        st.session_state.pitch_deck_text = deck_text
-                        st.session_state.pitch_deck_filename = uploaded_deck.name
-                        st.session_state.pitch_deck_hash = uploaded_hash
-                        st.session_state.pitch_deck_pages = page_count
-                        st.session_state.pitch_deck_error = None
-                        st.session_state.post_mortem_report = None
-                    except Exception as exc:
-                        clear_pitch_deck_state(clear_error=False)
-                        st.session_state.pitch_deck_hash = uploaded_hash
-                        st.session_state.pitch_deck_error = str(exc)
+                progress_bar = st.progress(0.0, text="Extracting deck text...")
+                try:
+                    deck = load_pitch_deck(uploaded_hash)
+                    if deck is None:
+                        deck = ingest_pitch_deck(
+                            uploaded_hash, uploaded_bytes, on_progress=_deck_progress_reporter(progress_bar)
+                        )
+                    st.session_state.pitch_deck_text = deck["text"]
+                    st.session_state.pitch_deck_filename = uploaded_deck.name
+                    st.session_state.pitch_deck_hash = uploaded_hash
+                    st.session_state.pitch_deck_pages = deck["page_count"]
+                    st.session_state.pitch_deck_error = None
+                    st.session_state.post_mortem_report = None
+                except Exception as exc:
+                    clear_pitch_deck_state(clear_error=False)
+                    st.session_state.pitch_deck_hash = uploaded_hash
+                    st.session_state.pitch_deck_error = str(exc)
+                finally:
+                    progress_bar.empty()
 
         if st.session_state.pitch_deck_error:
             st.warning(f"Deck parsing issue: {st.session_state.pitch_deck_error}")
@@ -612,6 +659,50 @@ def render_sidebar():
                 st.rerun()
         if st.session_state.local_storage_notice:
             st.caption(f"Recovery: {st.session_state.local_storage_notice}")
+        if st.session_state.turn_timing_log:
+            last_timing = st.session_state.turn_timing_log[-1]
+            st.caption(
+                f"Last turn: {last_timing.get('total_s', 0):.2f}s "
+                f"(judgment overlap saved {last_timing.get('saved_s', 0):.2f}s)"
+            )
+        cache_stats = get_response_cache_stats()
+        cache_hits = cache_stats.get("memory_hits", 0) + cache_stats.get("disk_hits", 0)
+        if cache_hits or cache_stats.get("misses"):
+            st.caption(
+                f"Response cache: {cache_hits} hits / {cache_stats['misses']} misses "
+                f"({cache_stats['hit_rate']:.0%} hit rate)"
+            )
+        transcript_stats = get_transcript_cache_stats()
+        transcript_hits = transcript_stats.get("memory_hits", 0) + transcript_stats.get("disk_hits", 0)
+        if transcript_hits:
+            st.caption(
+                f"Transcript cache: {transcript_hits} hits / {transcript_stats['misses']} misses "
+                f"({transcript_stats['hit_rate']:.0%} hit rate)"
+            )
+        deck_stats = get_deck_store_stats()
+        deck_hits = deck_stats["memory_hits"] + deck_stats["disk_hits"]
+        if deck_hits:
+            st.caption(f"Deck store: {deck_hits} hits / {deck_stats['misses']} misses ({deck_stats['records']} decks)")
+        extract_stats = get_extract_stats()
+        if extract_stats["decks"]:
+            st.caption(
+                f"Deck extraction: {extract_stats['last_pages_per_sec']} pages/s "
+                f"({extract_stats['last_mode']}, {extract_stats['page_cache_hits']} cached pages)"
+            )
+        circuit_stats = get_circuit_stats()
+        if circuit_stats["state"] == "closed":
+            st.caption("Model backend: healthy")
+        else:
+            st.warning(
+                f"Model backend degraded ({circuit_stats['state'].replace('_', '-')}): investors reply with "
+                "offline lines and deal no damage until it recovers."
+            )
+        limiter_stats = get_rate_limit_stats()
+        if limiter_stats["throttled"] or limiter_stats["queued"]:
+            st.caption(
+                f"Model traffic: {limiter_stats['queued']} queued, {limiter_stats['throttled']} throttled, "
+                f"{limiter_stats['retries']} retries"
+            )
 
         st.divider()
 
@@ -792,31 +883,32 @@ def render_game_view():
     st.session_state.full_chat_history.append(user_msg)
     st.chat_message("user").write(user_input)
 
+    turn_context = TurnContext(
+        user_input=user_input,
+        current_level=st.session_state.current_level,
+        chat_history=st.session_state.chat_history,
+        startup_theme=st.session_state.startup_theme,
+        pitch_deck_text=st.session_state.pitch_deck_text,
+        conversation_memory=get_conversation_memory(),
+    )
+    turn_pipeline = start_turn_pipeline(turn_context)
     with st.chat_message("assistant"):
-        streamed_reply = st.write_stream(
-            stream_investor_reply(
-                user_input=user_input,
-                current_level=st.session_state.current_level,
-                chat_history=st.session_state.chat_history,
-                startup_theme=st.session_state.startup_theme,
-                pitch_deck_text=st.session_state.pitch_deck_text,
-            )
-        )
+        streamed_reply = st.write_stream(turn_pipeline.stream_reply())
     streamed_reply = (streamed_reply or "").strip()
     if not streamed_reply:
         streamed_reply = "*(The investor is silent. Please try again.)*"
 
     ai_msg = {"role": "ai", "content": streamed_reply}
-    judgment_history = st.session_state.chat_history + [ai_msg]
 
     with st.spinner("Finalizing round mechanics..."):
-        judgment = get_turn_judgment(
-            user_input=user_input,
-            current_level=st.session_state.current_level,
-            chat_history=judgment_history,
-            startup_theme=st.session_state.startup_theme,
-            pitch_deck_text=st.session_state.pitch_deck_text,
-        )
+        judgment = turn_pipeline.finalize(streamed_reply)
+    st.session_state.turn_timing_log.append(
+        {
+            "turn": len(st.session_state.turn_timing_log) + 1,
+            "level": int(st.session_state.current_level),
+            **turn_pipeline.timings,
+        }
+    )
 
     damage = judgment.get("damage", 0)
     passed = judgment.get("level_passed", False)
@@ -851,7 +943,16 @@ def render_game_view():
 
     st.session_state.chat_history.append(ai_msg)
     st.session_state.full_chat_history.append(ai_msg)
+    get_conversation_memory().schedule_fold(st.session_state.chat_history)
     save_snapshot_with_notice()
+    if not passed:
+        get_post_mortem_tracker().maybe_speculate(
+            st.session_state.current_level,
+            st.session_state.chat_history,
+            st.session_state.current_hp,
+            st.session_state.startup_theme,
+            st.session_state.pitch_deck_text,
+        )
 
     if st.session_state.current_hp <= 0:
         st.session_state.current_hp = 0
@@ -859,6 +960,16 @@ def render_game_view():
         st.rerun()
 
     if passed:
+        get_conversation_memory().close_level(
+            st.session_state.current_level,
+            st.session_state.chat_history,
+        )
+        get_post_mortem_tracker().close_level(
+            st.session_state.current_level,
+            st.session_state.chat_history,
+            st.session_state.startup_theme,
+            st.session_state.pitch_deck_text,
+        )
         if st.session_state.current_level >= 5:
             st.session_state.victory = True
             st.rerun()